@@ -2,12 +2,26 @@ import discord
 from discord.ext import commands
 from discord.ui import Button, View
 import os
+import json
 import logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+import shlex
+import shutil
+import signal
 import subprocess
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import datetime
 from dotenv import load_dotenv
 import asyncio
 from aiohttp import web
+from config.config import Config, PROJECT_ROOT
+from utils.report import render_report, MEDIA_DIR
+from utils.pytest_progress import PytestProgress
+from utils.health_probe import HealthProbe
+from utils.history import sync_history
+from utils.gcs_uploader import ArtifactUploader, get_storage_client
 
 # Load environment variables
 load_dotenv()
@@ -20,6 +34,377 @@ intents.message_content = True
 
 bot = commands.Bot(command_prefix='/', intents=intents)
 
+REPORTS_BUCKET = "qa-allure-automation-chattigo-reports"
+
+# Report generation and uploads run here so they never block the Discord event loop
+# (heartbeats) nor the aiohttp health check used by Cloud Run.
+POSTPROCESS_EXECUTOR = ThreadPoolExecutor(max_workers=int(os.getenv("POSTPROCESS_WORKERS", 4)), thread_name_prefix="postprocess")
+
+# Content-hashed screenshots are shared by every report of an environment/profile
+# ({env}/{profile}/media/), so identical images are stored once; reports live at
+# {env}/{profile}/{timestamp}/report/index.html and link them relatively
+SHARED_MEDIA_URL = f"../../{MEDIA_DIR}"
+
+def upload_report(report_file, environment, profile, asset_dirs=(), extra_files=(), media_dir=None):
+    """
+    Publishes the HTML report with the files it links (each dir of `asset_dirs` under
+    report/<dir name>/, `media_dir` in the shared media folder) and `extra_files` (e.g.
+    report.json) next to it, and returns the report's public URL. Blocking: run it in the executor.
+    """
+    timestamp = datetime.now().strftime("%Y-%m-%d %H-%M-%S")
+    prefix = f"{environment}/{profile}/{timestamp}/report"
+
+    uploader = ArtifactUploader(REPORTS_BUCKET)
+    files = []
+    for asset_dir in asset_dirs:
+        if os.path.isdir(asset_dir):
+            files += uploader.dir_files(asset_dir, f"{prefix}/{os.path.basename(asset_dir)}")
+    if media_dir and os.path.isdir(media_dir):
+        # Never change once written, so browsers may cache them forever
+        files += uploader.dir_files(media_dir, f"{environment}/{profile}/{MEDIA_DIR}", immutable=True)
+    files += [(path, f"{prefix}/{os.path.basename(path)}", False) for path in extra_files if os.path.exists(path)]
+    uploader.upload_many(files)
+    # The report goes last, so it never links files that are not there yet
+    uploader.upload_file(report_file, f"{prefix}/index.html")
+    stats = uploader.stats
+    logging.info(
+        "Reporte publicado: %d archivos subidos, %d sin cambios, %d bytes enviados (%d ahorrados), %d reintentos",
+        stats.uploaded, stats.skipped, stats.bytes_sent, stats.bytes_saved, stats.retries,
+    )
+    return uploader.url(f"{prefix}/index.html")
+
+def fetch_history(run):
+    """Downloads the environment's history database (scheduling hints for pytest). Blocking; None if missing."""
+    from google.api_core.exceptions import NotFound
+
+    local_path = os.path.join(run.workdir, "history.sqlite")
+    try:
+        get_storage_client().bucket(REPORTS_BUCKET).blob(f"history/{run.environment}.sqlite").download_to_filename(local_path)
+    except NotFound:
+        if os.path.exists(local_path):
+            os.remove(local_path)
+        return None
+    return local_path
+
+def record_history(run, json_report_file):
+    """Adds the run to its environment's history database in GCS and returns the trend analysis. Blocking."""
+    with open(json_report_file) as f:
+        report = json.load(f)
+    bucket = get_storage_client().bucket(REPORTS_BUCKET)
+    return sync_history(
+        bucket, f"history/{run.environment}.sqlite", os.path.join(run.workdir, "history.sqlite"),
+        run.run_id, run.environment, run.profile, report,
+    )
+
+async def update_progress(message, text):
+    """Edits the run's progress message; progress updates must never break the run."""
+    if message is None:
+        return
+    try:
+        await message.edit(content=text)
+    except discord.HTTPException as e:
+        logging.warning("No se pudo actualizar el mensaje de progreso: %s", e)
+
+async def send_embed(interaction, embed):
+    """Sends a result embed, falling back to the channel when the interaction token expired."""
+    try:
+        await interaction.followup.send(embed=embed)
+    except discord.HTTPException as e:
+        # 50027: Invalid Webhook Token
+        # 10062: Unknown Interaction
+        if e.code == 50027 or e.code == 10062:
+            logging.warning(f"Interaction error {e.code}. Sending to channel instead.")
+            channel = bot.get_channel(interaction.channel_id)
+            if channel:
+               await channel.send(f"<@{interaction.user.id}>", embed=embed)
+            else:
+                logging.error("Could not find channel to send fallback message.")
+        else:
+            raise e
+
+# Increased timeout to 1800s (30 min) to accommodate growing test suite
+PYTEST_TIMEOUT = 1800
+# Fail-fast: stop the run after this many tests could not log in (0 disables it)
+MAX_LOGIN_FAILURES = int(os.getenv("MAX_LOGIN_FAILURES", 3))
+# Environment checks while a run executes: probe every N seconds (0 disables them)
+# and cancel the run after M consecutive failed probes
+HEALTH_PROBE_INTERVAL = float(os.getenv("HEALTH_PROBE_INTERVAL", 60))
+HEALTH_PROBE_MAX_FAILURES = int(os.getenv("HEALTH_PROBE_MAX_FAILURES", 2))
+# Seconds pytest gets after SIGINT to stop its workers and write the partial report
+CANCEL_GRACE_SECONDS = 30
+# Minimum seconds between two edits of the live progress message (Discord rate limits edits)
+PROGRESS_UPDATE_INTERVAL = float(os.getenv("PROGRESS_UPDATE_INTERVAL", 5))
+
+async def send_status(interaction, text, view=None):
+    """
+    Sends a message that can be edited for the whole run. Followup (webhook) messages
+    stop being editable when the interaction token expires after 15 minutes, so the
+    message is edited through the channel with the bot token when possible.
+    """
+    if view is not None:
+        message = await interaction.followup.send(text, view=view, wait=True)
+    else:
+        message = await interaction.followup.send(text, wait=True)
+    channel = bot.get_channel(interaction.channel_id)
+    return channel.get_partial_message(message.id) if channel else message
+
+def format_duration(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}m {seconds:02d}s" if minutes else f"{seconds}s"
+
+def format_progress(run, progress, finished=False):
+    """Live status of a run: bar, counts, elapsed time, ETA and the latest failures."""
+    done = min(progress.done, progress.total) if progress.total else progress.done
+    bar_length = 15
+    filled_length = int(bar_length * done // progress.total) if progress.total else 0
+    bar = '🟩' * filled_length + '⬜' * (bar_length - filled_length)
+    counts = progress.counts
+
+    lines = [
+        f"{'🏁' if finished else '🧪'} **{run.profile}** en **{run.environment}** (`{run.run_id}`)",
+        f"[{bar}] {done}/{progress.total or '?'} · ✅ {counts['passed']} · ❌ {counts['failed']} · ⏭️ {counts['skipped']}",
+    ]
+    timing = f"⏱️ {format_duration(progress.elapsed)}"
+    eta = progress.eta()
+    if not finished and eta is not None:
+        timing += f" · ETA ~{format_duration(eta)}"
+    lines.append(timing)
+    if progress.failures:
+        lines.append("Fallos:")
+        lines.extend(f"• `{nodeid.split('::', 1)[-1]}`" for nodeid in progress.failures[-5:])
+        if len(progress.failures) > 5:
+            lines.append(f"… y {len(progress.failures) - 5} más")
+    return "\n".join(lines)
+
+async def stream_pytest(process, progress):
+    """Feeds the pytest output to progress line by line and returns the exit code."""
+    while True:
+        line = await process.stdout.readline()
+        if not line:
+            break
+        failures_before = len(progress.failures)
+        progress.feed(line.decode(errors="replace"))
+        if len(progress.failures) > failures_before:
+            logging.warning("Test fallido: %s", progress.failures[-1])
+    return await process.wait()
+
+async def publish_progress(message, run, progress):
+    """Edits the run message with the live progress, at most every PROGRESS_UPDATE_INTERVAL seconds."""
+    last_text = None
+    while True:
+        await asyncio.sleep(PROGRESS_UPDATE_INTERVAL)
+        text = format_progress(run, progress)
+        if text != last_text:
+            await update_progress(message, text)
+            last_text = text
+
+async def terminate_process_group(process):
+    """
+    Stops a pytest run started with start_new_session=True. SIGINT goes to pytest
+    itself, which shuts its xdist workers down and still writes the JSON report;
+    if it does not exit in time the whole process group gets SIGTERM, then SIGKILL.
+    """
+    steps = ((signal.SIGINT, CANCEL_GRACE_SECONDS), (signal.SIGTERM, 10), (signal.SIGKILL, None))
+    for sig, grace in steps:
+        if process.returncode is not None:
+            return
+        try:
+            if sig == signal.SIGINT:
+                process.send_signal(sig)
+            else:
+                os.killpg(process.pid, sig)
+        except ProcessLookupError:
+            return
+        if grace is None:
+            return
+        try:
+            await asyncio.wait_for(process.wait(), timeout=grace)
+        except asyncio.TimeoutError:
+            logging.warning("pytest (pid %s) sigue vivo tras %s, escalando", process.pid, sig.name)
+
+def kill_process_group(process):
+    """Kills whatever is left of a finished run's process group (orphaned workers or browsers)."""
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+# The local mock console never runs next to the bot, keep it out of /auto's status line
+health_probe = HealthProbe({env: url for env, url in Config.ENVIRONMENTS.items() if env != "mock"})
+
+async def watch_environment(run):
+    """Cancels the run when the environment stops answering for HEALTH_PROBE_MAX_FAILURES probes in a row."""
+    failures = 0
+    while True:
+        await asyncio.sleep(HEALTH_PROBE_INTERVAL)
+        health = await health_probe.check(run.environment, use_cache=False)
+        if health.ok:
+            failures = 0
+            continue
+        failures += 1
+        logging.warning("Chequeo de salud fallido (%s/%s): %s", failures, HEALTH_PROBE_MAX_FAILURES, health.verdict)
+        if failures >= HEALTH_PROBE_MAX_FAILURES:
+            await run.cancel(f"el ambiente {run.environment} no responde")
+            return
+
+# Every run works in its own directory so concurrent runs never share report.json,
+# index.html, screenshots/ or the pytest-html/allure output.
+RUNS_DIR = os.path.join(PROJECT_ROOT, "runs")
+# Rough footprint of one xdist worker (pytest + Chromium), used to size the run limit
+BROWSER_MEMORY_MB = int(os.getenv("BROWSER_MEMORY_MB", 700))
+
+def pytest_workers():
+    # One xdist worker per provisioned agent account (each worker leases its own account)
+    return int(os.getenv("PYTEST_WORKERS", len(Config.USERS)))
+
+def available_memory_mb():
+    """Memory this instance may use: the cgroup limit on Cloud Run, MemAvailable otherwise."""
+    for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        try:
+            with open(path) as f:
+                value = f.read().strip()
+            if value != "max" and int(value) < 1 << 60:
+                return int(value) // (1024 * 1024)
+        except (OSError, ValueError):
+            continue
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    return None
+
+def default_max_concurrent_runs(workers):
+    """How many pytest runs fit at once: CPUs, memory and agent accounts each cap the number."""
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+    limits = [cpus // workers, len(Config.USERS) // workers]
+    memory = available_memory_mb()
+    if memory:
+        limits.append(memory // (workers * BROWSER_MEMORY_MB))
+    return max(1, min(limits))
+
+class ScheduledRun:
+    """One pytest execution for an environment/profile, shared by every user who requested it."""
+
+    def __init__(self, environment, profile):
+        self.run_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        self.environment = environment
+        self.profile = profile
+        self.workdir = os.path.join(RUNS_DIR, self.run_id)
+        # Resolves to the result embed (or None if the run produced no result)
+        self.result = asyncio.get_running_loop().create_future()
+        self.process = None
+        self.cancel_reason = None
+
+    async def cancel(self, reason):
+        """Stops the pytest process; the tests finished so far are still reported."""
+        if self.cancel_reason or self.process is None or self.process.returncode is not None:
+            return False
+        self.cancel_reason = reason
+        logging.warning("Cancelando ejecución %s: %s", self.run_id, reason)
+        await terminate_process_group(self.process)
+        return True
+
+class CancelRunView(View):
+    """'Cancelar' button attached to the progress message while the run executes."""
+
+    def __init__(self, run):
+        super().__init__(timeout=None)
+        self.run = run
+
+    @discord.ui.button(label="Cancelar", style=discord.ButtonStyle.danger, emoji="🛑")
+    async def cancel_button(self, interaction: discord.Interaction, button: Button):
+        logging.info("Cancelación de %s solicitada por %s", self.run.run_id, interaction.user)
+        button.disabled = True
+        await interaction.response.edit_message(view=self)
+        await interaction.followup.send(f"🛑 Cancelando `{self.run.run_id}`... se publicará el reporte parcial.")
+        await self.run.cancel(f"cancelada por {interaction.user.display_name}")
+
+class RunScheduler:
+    """
+    FIFO queue of /auto executions with at most max_concurrent running at once.
+
+    A request for an environment/profile that is already queued or running is
+    coalesced into that run instead of starting another pytest process.
+    """
+
+    def __init__(self, max_concurrent):
+        self.max_concurrent = max_concurrent
+        self._queue = []
+        self._running = set()
+        self._by_key = {}
+        self._changed = asyncio.Condition()
+
+    @property
+    def running(self):
+        return len(self._running)
+
+    def submit(self, environment, profile):
+        """Returns (run, created); created is False when joining an existing run."""
+        run = self._by_key.get((environment, profile))
+        if run:
+            return run, False
+        run = ScheduledRun(environment, profile)
+        self._by_key[(environment, profile)] = run
+        self._queue.append(run)
+        return run, True
+
+    def position(self, run):
+        """1-based queue position, 0 once the run is executing."""
+        return self._queue.index(run) + 1 if run in self._queue else 0
+
+    def can_start(self, run):
+        return bool(self._queue) and self._queue[0] is run and len(self._running) < self.max_concurrent
+
+    def _forget(self, run):
+        if run in self._queue:
+            self._queue.remove(run)
+        self._running.discard(run)
+        if self._by_key.get((run.environment, run.profile)) is run:
+            del self._by_key[(run.environment, run.profile)]
+
+    @asynccontextmanager
+    async def slot(self, run):
+        """Waits for the run's turn and holds one concurrency slot while it executes."""
+        async with self._changed:
+            try:
+                await self._changed.wait_for(lambda: self.can_start(run))
+            except BaseException:
+                self._forget(run)
+                self._changed.notify_all()
+                raise
+            self._queue.remove(run)
+            self._running.add(run)
+            # With free slots left, the next run in the queue may start as well
+            self._changed.notify_all()
+        try:
+            yield
+        finally:
+            async with self._changed:
+                self._forget(run)
+                self._changed.notify_all()
+
+MAX_CONCURRENT_RUNS = int(os.getenv("MAX_CONCURRENT_RUNS", 0)) or default_max_concurrent_runs(pytest_workers())
+logging.info("Ejecuciones concurrentes permitidas: %s", MAX_CONCURRENT_RUNS)
+_scheduler = None
+
+def get_scheduler():
+    # Created on first use so its asyncio primitives belong to the bot's running loop
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = RunScheduler(MAX_CONCURRENT_RUNS)
+    return _scheduler
+
+async def remove_view(message):
+    if message is None:
+        return
+    try:
+        await message.edit(view=None)
+    except discord.HTTPException as e:
+        logging.warning("No se pudo quitar el botón de cancelación: %s", e)
+
 async def health_check(request):
     return web.Response(text="OK", status=200)
 
@@ -55,362 +440,181 @@ class ProfileView(View):
         if not interaction.response.is_done():
             await interaction.response.defer(ephemeral=False)
         logging.info("Botón de perfil %s presionado en ambiente %s", profile, self.environment)
-        await interaction.followup.send(f"🚀 Iniciando pruebas para perfil **{profile}** en **{self.environment}**. Esto puede tardar unos segundos...", ephemeral=False)
-        logging.info("Running pytest for profile %s in environment %s", profile, self.environment)
-        
+
+        # Pre-flight: do not launch browsers against an environment that is down
+        health = await health_probe.check(self.environment)
+        if not health.ok:
+            logging.warning("Ejecución %s/%s descartada: %s", self.environment, profile, health.verdict)
+            await interaction.followup.send(f"🔴 {health.verdict}\nNo se lanzaron las pruebas; reintenta cuando el ambiente responda.")
+            return
+
+        scheduler = get_scheduler()
+        run, created = scheduler.submit(self.environment, profile)
+        if not created:
+            position = scheduler.position(run)
+            state = f"en cola (posición {position})" if position else "en curso"
+            logging.info("Solicitud %s/%s unida a la ejecución %s", self.environment, profile, run.run_id)
+            await interaction.followup.send(
+                f"🔁 Ya hay una ejecución de **{profile}** en **{self.environment}** {state} (`{run.run_id}`). "
+                "Te enviaré el mismo resultado cuando termine."
+            )
+            embed = await asyncio.shield(run.result)
+            if embed:
+                await send_embed(interaction, embed)
+            else:
+                await interaction.followup.send(f"⚠️ La ejecución `{run.run_id}` terminó sin resultados.")
+            return
+
+        if not scheduler.can_start(run):
+            await interaction.followup.send(
+                f"⏳ Ejecución `{run.run_id}` en cola: posición {scheduler.position(run)} "
+                f"({scheduler.running}/{scheduler.max_concurrent} en curso)."
+            )
+
+        embed = None
+        try:
+            async with scheduler.slot(run):
+                embed = await self.execute_run(interaction, run)
+            if embed:
+                await send_embed(interaction, embed)
+        finally:
+            if not run.result.done():
+                run.result.set_result(embed)
+            shutil.rmtree(run.workdir, ignore_errors=True)
+
+    async def execute_run(self, interaction: discord.Interaction, run: ScheduledRun):
+        """Runs pytest for the run inside its own working directory and returns the result embed."""
+        profile = run.profile
+        progress_message = None
+        try:
+            progress_message = await send_status(
+                interaction,
+                f"🚀 Iniciando pruebas para perfil **{profile}** en **{self.environment}** (`{run.run_id}`). Esto puede tardar unos segundos...",
+                view=CancelRunView(run),
+            )
+        except discord.HTTPException as e:
+            logging.warning("No se pudo enviar el mensaje de progreso: %s", e)
+        logging.info("Running pytest for profile %s in environment %s (run %s)", profile, self.environment, run.run_id)
+
         # Build the pytest command
-        # Generate JSON report for custom HTML generation
-        json_report_file = "report.json"
-        
-        # Clean previous results
-        if os.path.exists(json_report_file):
-            os.remove(json_report_file)
-            
-        command = f"python3 -m pytest -n 2 --dist=load tests/{profile} --env={self.environment} --json-report --json-report-file={json_report_file}"
+        # Generate JSON report for custom HTML generation. Relative paths (report.json,
+        # screenshots/, traces/, report.html, allure-results) all resolve inside the run directory.
+        os.makedirs(run.workdir, exist_ok=True)
+        json_report_file = os.path.join(run.workdir, "report.json")
+        tests_dir = os.path.join(PROJECT_ROOT, "tests", profile)
+
+        workers = pytest_workers()
+        command = f"python3 -m pytest -v -n {workers} --dist=load {tests_dir} --env={self.environment} --json-report --json-report-file={json_report_file} --max-login-failures={MAX_LOGIN_FAILURES}"
+
+        # Past durations let xdist start the longest tests first (plain load scheduling without them)
+        try:
+            history_file = await asyncio.get_running_loop().run_in_executor(POSTPROCESS_EXECUTOR, fetch_history, run)
+            if history_file:
+                command += f" --duration-history={history_file}"
+        except Exception as e:
+            logging.warning("No se pudo descargar el histórico de duraciones: %s", e)
         logging.info("Ejecutando comando de pruebas: %s", command)
-        
+
+        # The run directory is the cwd, so the project must be importable explicitly
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [PROJECT_ROOT, env.get("PYTHONPATH")]))
+
         try:
-            # Use asyncio.create_subprocess_shell for non-blocking execution
-            process = await asyncio.create_subprocess_shell(
-                command,
+            # Use asyncio.create_subprocess_exec for non-blocking execution.
+            # stderr is merged so tracebacks end up in the bounded output tail; the new
+            # session gives the run its own process group so it can be cancelled as a whole.
+            process = await asyncio.create_subprocess_exec(
+                *shlex.split(command),
                 stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                cwd=os.getcwd()
+                stderr=asyncio.subprocess.STDOUT,
+                cwd=run.workdir,
+                env=env,
+                limit=1024 * 1024,
+                start_new_session=True,
             )
-            
+            run.process = process
+
+            progress = PytestProgress()
+            background = [asyncio.create_task(publish_progress(progress_message, run, progress))]
+            if HEALTH_PROBE_INTERVAL > 0:
+                background.append(asyncio.create_task(watch_environment(run)))
+            stream = asyncio.create_task(stream_pytest(process, progress))
             try:
-                # Wait for the process with a timeout
-                # Increased timeout to 1800s (30 min) to accommodate growing test suite
-                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=1800)
-                stdout = stdout.decode()
-                stderr = stderr.decode()
-                returncode = process.returncode
-                
+                try:
+                    returncode = await asyncio.wait_for(asyncio.shield(stream), timeout=PYTEST_TIMEOUT)
+                except asyncio.TimeoutError:
+                    logging.error("Timeout al ejecutar pytest")
+                    await interaction.followup.send("⚠️ Timeout al ejecutar las pruebas. Por favor, verifica que los tests no requieran interacción manual.")
+                    await run.cancel(f"timeout de {PYTEST_TIMEOUT // 60} minutos")
+                    returncode = await stream
+                finally:
+                    for task in background:
+                        task.cancel()
+                    # Drop the Cancelar button, the process is gone
+                    await remove_view(progress_message)
+
+                output_tail = "\n".join(progress.tail)
                 logging.info("Resultado de pytest: returncode=%s", returncode)
                 if returncode != 0:
-                    logging.error("Validating pytest failure. STDERR: %s", stderr)
-                    logging.error("Validating pytest output. STDOUT: %s", stdout)
+                    logging.error("Validating pytest failure. Output tail:\n%s", output_tail)
                 else:
-                    logging.info("Pytest finished successfully. STDOUT: %s", stdout)
-                
+                    logging.info("Pytest finished successfully. Output tail:\n%s", output_tail)
+
                 # Initialize stats
                 passed = 0
                 failed = 0
                 total = 0
-                duration = 0
 
-                # Generate Custom HTML Report
-                report_file = "index.html"
+                loop = asyncio.get_running_loop()
+                progress_text = format_progress(run, progress, finished=True)
+                stop_reason = run.cancel_reason or progress.interrupted
+                if stop_reason:
+                    progress_text += f"\n🛑 Ejecución detenida: {stop_reason}"
+                await update_progress(progress_message, progress_text)
+
+                # Update the duration history (skipped for stopped runs, their suite duration is partial)
+                history = None
+                try:
+                    if os.path.exists(json_report_file) and not stop_reason:
+                        await update_progress(progress_message, f"{progress_text}\n📈 Actualizando histórico...")
+                        history = await loop.run_in_executor(POSTPROCESS_EXECUTOR, record_history, run, json_report_file)
+                except Exception as e:
+                    logging.error("Error actualizando histórico: %s", e)
+
+                # Generate Custom HTML Report (off the event loop)
+                report_file = os.path.join(run.workdir, "index.html")
                 try:
-                    import json
-                    from datetime import datetime
-                    
                     if os.path.exists(json_report_file):
-                        with open(json_report_file, 'r') as f:
-                            data = json.load(f)
-                        
-                        passed = data['summary'].get('passed', 0)
-                        failed = data['summary'].get('failed', 0)
-                        total = data['summary'].get('total', 0)
-                        
-                        # Calculate total duration as the sum of all test durations (setup + call + teardown)
-                        # This ensures it matches exactly what the user sees in the list
-                        for test in data['tests']:
-                            test_duration = test.get('call', {}).get('duration', 0) + \
-                                          test.get('setup', {}).get('duration', 0) + \
-                                          test.get('teardown', {}).get('duration', 0)
-                            duration += test_duration
-                            # Store it in the test object for later use in the loop
-                            test['full_duration'] = test_duration
-                        
-                        # Generate HTML content
-                        html_content = f"""
-                        <!DOCTYPE html>
-                        <html lang="es">
-                        <head>
-                            <meta charset="UTF-8">
-                            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-                            <title>Reporte de Pruebas - {profile.capitalize()} [{self.environment}]</title>
-                            <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
-                            <style>
-                                body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; background-color: #1e1e1e; color: #e0e0e0; margin: 0; padding: 20px; }}
-                                .container {{ max-width: 1200px; margin: 0 auto; background-color: #2d2d2d; padding: 30px; border-radius: 10px; box-shadow: 0 4px 15px rgba(0,0,0,0.5); display: flex; flex-wrap: wrap; gap: 30px; }}
-                                h1 {{ width: 100%; text-align: center; color: #ffffff; margin-bottom: 20px; border-bottom: 2px solid #444; padding-bottom: 10px; }}
-                                
-                                .left-panel {{ flex: 1; min-width: 300px; display: flex; flex-direction: column; align-items: center; }}
-                                .right-panel {{ flex: 2; min-width: 400px; }}
-                                
-                                .chart-container {{ width: 100%; max-width: 400px; height: 300px; position: relative; margin-bottom: 20px; }}
-                                .stats {{ width: 100%; font-size: 1.1em; background: #333; padding: 20px; border-radius: 8px; box-sizing: border-box; }}
-                                .stat-item {{ margin: 10px 0; display: flex; justify-content: space-between; }}
-                                .stat-value {{ font-weight: bold; }}
-                                .passed {{ color: #4caf50; }}
-                                .failed {{ color: #f44336; }}
-                                
-                                .test-list {{ height: 600px; overflow-y: auto; padding-right: 10px; }}
-                                .test-list::-webkit-scrollbar {{ width: 8px; }}
-                                .test-list::-webkit-scrollbar-track {{ background: #333; }}
-                                .test-list::-webkit-scrollbar-thumb {{ background: #555; border-radius: 4px; }}
-                                .test-list::-webkit-scrollbar-thumb:hover {{ background: #777; }}
-                                
-                                .test-item {{ background-color: #333; padding: 12px; margin-bottom: 8px; border-radius: 5px; border-left: 5px solid #777; transition: transform 0.2s; cursor: pointer; }}
-                                .test-item:hover {{ background-color: #3a3a3a; }}
-                                .test-item.passed {{ border-left-color: #4caf50; }}
-                                .test-item.failed {{ border-left-color: #f44336; }}
-                                .test-header {{ display: flex; justify-content: space-between; align-items: center; }}
-                                .test-name {{ font-weight: bold; font-size: 1em; }}
-                                .test-duration {{ font-size: 0.85em; color: #aaa; }}
-                                .error-details {{ background-color: #1e1e1e; padding: 10px; margin-top: 10px; border-radius: 4px; font-family: monospace; font-size: 0.9em; color: #ff8a80; white-space: pre-wrap; display: none; }}
-                                .footer {{ width: 100%; text-align: center; margin-top: 20px; color: #777; font-size: 0.8em; }}
-                            </style>
-                        </head>
-                        <body>
-                            <div class="container">
-                                <h1>Reporte de Ejecución: {profile.capitalize()} [{self.environment}]</h1>
-                                
-                                <div class="left-panel">
-                                    <div class="chart-container">
-                                        <canvas id="resultsChart"></canvas>
-                                    </div>
-                                    <div class="stats">
-                                        <div class="stat-item"><span>Total:</span> <span class="stat-value">{total}</span></div>
-                                        <div class="stat-item"><span class="passed">Pasados:</span> <span class="stat-value passed">{passed}</span></div>
-                                        <div class="stat-item"><span class="failed">Fallados:</span> <span class="stat-value failed">{failed}</span></div>
-                                        <div class="stat-item"><span>Duración Total:</span> <span class="stat-value">{duration:.2f}s</span></div>
-                                    </div>
-                                </div>
-                                
-                                <div class="right-panel">
-                                    <h2>Detalle de Pruebas ({total})</h2>
-                                    <div class="test-list">
-                        """
-                        
-                        # Advanced Grouping: File -> Class -> Test
-                        grouped_tests = {}
-                        for test in data['tests']:
-                            nodeid = test['nodeid']
-                            parts = nodeid.split("::")
-                            file_path = parts[0]
-                            class_name = parts[1] if len(parts) > 2 else "Sin Clase"
-                            test_name = parts[-1]
-                            
-                            if file_path not in grouped_tests:
-                                grouped_tests[file_path] = {}
-                            if class_name not in grouped_tests[file_path]:
-                                grouped_tests[file_path][class_name] = []
-                            
-                            # Store test data with extracted name
-                            # Translate test names if mapping exists
-                            test_name_mapping = {
-                                "test_valid_login": "Login del Agente exitoso",
-                                "test_logout_agente": "Cierre de sesión del Agente",
-                                "test_agent_status_timer": "Contador de estado Online",
-                                "test_agent_status_break": "Activacion de estado descanso",
-                                "test_receive_email": "recibo de mail -agente",
-                                "test_chat_closure": "Cierre chat mail",
-                                "test_outbound_bienvenida_rapida": "bienvenida_rapida",
-                                "test_outbound_document": "qa_documento",
-                                "test_outbound_image": "qa_imagen",
-                                "test_outbound_document_url": "qa_documento_url",
-                                "test_outbound_image_url": "qa_imagen_url",
-                                "test_outbound_video_url": "qa_video_url",
-                                "test_outbound_qa_header_boton": "qa_header_boton",
-                                "test_outbound_qa_asterisco_inicio": "qa_asterisco_inicio",
-                                "test_outbound_qa_plantilla_portugues": "qa_plantilla_portugues",
-                                "test_outbound_qa_plantila_ingles": "qa_plantila_ingles",
-                                "test_outbound_qa_boton_llamar": "qa_boton_llamar"
-                            }
-                            
-                            test['short_name'] = test_name_mapping.get(test_name, test_name)
-                            grouped_tests[file_path][class_name].append(test)
-                            
-                        for file_path, classes in grouped_tests.items():
-                            test_counter = 1
-                            
-                            # Custom file name mapping
-                            file_name_mapping = {
-                                "tests/agente/test_inbound_email.py": "Chat - Mail",
-                                "tests/agente/test_outbound_agente.py": "Outbound - Envio HSM",
-                                "tests/agente/test_agent_status.py": "Agente"
-                            }
-                            
-                            display_name = file_name_mapping.get(file_path)
-                            
-                            if not display_name:
-                                # Format file path to friendly name
-                                # e.g., tests/agente/test_login_agente.py -> Login
-                                display_name = file_path.split("/")[-1] # test_login_agente.py
-                                display_name = display_name.replace("test_", "").replace(".py", "") # login_agente
-                                # Remove common suffixes if present (optional, based on pattern)
-                                if "_" in display_name:
-                                    display_name = display_name.split("_")[0] # login
-                                display_name = display_name.capitalize() # Login
-                            
-                            html_content += f"""
-                            <details style="margin-bottom: 15px; border: 1px solid #444; border-radius: 5px; overflow: hidden;">
-                                <summary style="background: #252525; padding: 10px; cursor: pointer; font-weight: bold; color: #ddd;">📂 {display_name}</summary>
-                                <div style="padding: 10px; background: #2d2d2d;">
-                            """
-                            
-                            for class_name, tests in classes.items():
-                                if class_name != "Sin Clase":
-                                    html_content += f"""
-                                    <details style="margin-bottom: 10px; margin-left: 10px; border-left: 2px solid #555;">
-                                        <summary style="padding: 5px 10px; cursor: pointer; font-weight: bold; color: #aaa;">📦 {class_name}</summary>
-                                        <div style="padding-left: 15px;">
-                                    """
-                                else:
-                                    html_content += '<div style="margin-left: 10px;">'
-
-                                for test in tests:
-                                    status = test['outcome']
-                                    nodeid = test['nodeid']
-                                    name = test['short_name']
-                                    # Use the pre-calculated full duration
-                                    duration_test = test.get('full_duration', 0)
-                                    
-                                    # Logs
-                                    logs = ""
-                                    if 'log' in test.get('call', {}):
-                                        logs = test['call']['log']
-                                    
-                                        # Error message
-                                    error_msg = ""
-                                    if status == 'failed':
-                                        error_msg = test['call'].get('longrepr', 'Error desconocido')
-                                        
-                                    # Screenshot (Now for ALL tests)
-                                    screenshot_html = ""
-                                    safe_name = nodeid.replace("::", "_").replace("/", "_").replace(".py", "")
-                                    screenshot_path = f"screenshots/{safe_name}.png"
-                                    if os.path.exists(screenshot_path):
-                                        import base64
-                                        with open(screenshot_path, "rb") as image_file:
-                                            encoded_string = base64.b64encode(image_file.read()).decode('utf-8')
-                                            screenshot_html = f'''
-                                            <details style="margin-top: 5px; border: 1px solid #444; border-radius: 4px; padding: 5px;">
-                                                <summary style="cursor: pointer; color: #aaa;">📸 Captura de Pantalla</summary>
-                                                <div style="margin-top: 10px; text-align: center;">
-                                                    <img src="data:image/png;base64,{encoded_string}" style="max-width: 100%; border: 1px solid #555; border-radius: 4px;">
-                                                </div>
-                                            </details>
-                                            '''
-                                    
-                                    html_content += f"""
-                                            <div class="test-item {status}">
-                                                <div class="test-header" onclick="this.parentElement.querySelector('.details-container').style.display = this.parentElement.querySelector('.details-container').style.display === 'block' ? 'none' : 'block'">
-                                                    <span class="test-name">#{test_counter} {name}</span>
-                                                    <span class="test-duration">{duration_test:.2f}s</span>
-                                                </div>
-                                                <div class="details-container" style="display: none; margin-top: 10px;">
-                                                    {f'<div style="color: #ff8a80; margin-bottom: 10px; padding: 10px; background: #2a1a1a; border-radius: 4px;"><strong>Error:</strong><br>{error_msg}</div>' if error_msg else ''}
-                                                    
-                                                    {f'''
-                                                    <details style="margin-top: 5px; border: 1px solid #444; border-radius: 4px; padding: 5px;">
-                                                        <summary style="cursor: pointer; color: #aaa;">📄 Logs de Ejecución</summary>
-                                                        <pre style="background: #111; padding: 10px; overflow-x: auto; color: #ccc; margin-top: 5px; white-space: pre-wrap;">{logs}</pre>
-                                                    </details>
-                                                    ''' if logs else '<div style="color: #555; font-style: italic; margin-top: 5px;">No logs captured</div>'}
-                                                    
-                                                    {screenshot_html}
-                                                </div>
-                                            </div>
-                                    """
-                                    test_counter += 1
-                                
-                                if class_name != "Sin Clase":
-                                    html_content += "</div></details>"
-                                else:
-                                    html_content += "</div>"
-                            
-                            html_content += "</div></details>"
-                        
-                        html_content += f"""
-                                    </div>
-                                </div>
-                                <div class="footer">Generado el {datetime.now().strftime("%d/%m/%Y %H:%M:%S")}</div>
-                            </div>
-                            
-                            <script>
-                                const ctx = document.getElementById('resultsChart').getContext('2d');
-                                
-                                // Plugin to draw text in center
-                                const centerTextPlugin = {{
-                                    id: 'centerText',
-                                    beforeDraw: function(chart) {{
-                                        var width = chart.chartArea.width,
-                                            height = chart.chartArea.height,
-                                            ctx = chart.ctx;
-                                            
-                                        ctx.restore();
-                                        var fontSize = (height / 114).toFixed(2);
-                                        ctx.font = fontSize + "em sans-serif";
-                                        ctx.textBaseline = "middle";
-                                        ctx.fillStyle = "#ffffff";
-                                        
-                                        var text = "{total}",
-                                            textX = Math.round((width - ctx.measureText(text).width) / 2) + chart.chartArea.left,
-                                            textY = (height / 2) + chart.chartArea.top;
-                                            
-                                        ctx.fillText(text, textX, textY);
-                                        ctx.save();
-                                    }}
-                                }};
-                                
-                                new Chart(ctx, {{
-                                    type: 'doughnut',
-                                    data: {{
-                                        labels: ['Pasados', 'Fallados'],
-                                        datasets: [{{
-                                            data: [{passed}, {failed}],
-                                            backgroundColor: ['#4caf50', '#f44336'],
-                                            borderWidth: 0
-                                        }}]
-                                    }},
-                                    options: {{
-                                        responsive: true,
-                                        maintainAspectRatio: false,
-                                        plugins: {{
-                                            legend: {{ position: 'bottom', labels: {{ color: '#fff' }} }}
-                                        }}
-                                    }},
-                                    plugins: [centerTextPlugin]
-                                }});
-                            </script>
-                        </body>
-                        </html>
-                        """
-                        
-                        with open(report_file, "w") as f:
-                            f.write(html_content)
+                        await update_progress(progress_message, f"{progress_text}\n📊 Generando reporte HTML...")
+                        summary = await loop.run_in_executor(
+                            POSTPROCESS_EXECUTOR, render_report, json_report_file, report_file, profile, self.environment,
+                            os.path.join(run.workdir, "screenshots"), history, os.path.join(run.workdir, "traces"),
+                            SHARED_MEDIA_URL,
+                        )
+                        passed = summary["passed"]
+                        failed = summary["failed"]
+                        total = summary["total"]
                         logging.info("Reporte HTML personalizado generado exitosamente.")
 
                 except Exception as e:
                     logging.error("Error generando reporte HTML: %s", e)
 
-                # Upload report to GCS
+                # Upload report to GCS (off the event loop)
                 report_url = "https://console.cloud.google.com/run" # Fallback
                 try:
-                    from google.cloud import storage
-                    from datetime import datetime
-                    
                     if os.path.exists(report_file):
-                        bucket_name = "qa-allure-automation-chattigo-reports"
-                        timestamp = datetime.now().strftime("%Y-%m-%d %H-%M-%S")
-                        destination_blob_name = f"{self.environment}/{profile}/{timestamp}/report/index.html"
-                        
-                        storage_client = storage.Client()
-                        bucket = storage_client.bucket(bucket_name)
-                        blob = bucket.blob(destination_blob_name)
-                        blob.upload_from_filename(report_file)
-                        
-                        # User requested specific format:
-                        report_url = f"https://storage.googleapis.com/{bucket_name}/{destination_blob_name.replace(' ', '%20')}"
+                        await update_progress(progress_message, f"{progress_text}\n☁️ Subiendo reporte...")
+                        report_url = await loop.run_in_executor(
+                            POSTPROCESS_EXECUTOR, upload_report, report_file, self.environment, profile,
+                            [os.path.join(run.workdir, "traces")], [json_report_file], os.path.join(run.workdir, MEDIA_DIR)
+                        )
                         logging.info("Reporte subido a: %s", report_url)
                 except Exception as e:
                     logging.error("Error subiendo reporte a GCS: %s", e)
                     await interaction.followup.send(f"⚠️ Error subiendo reporte a GCS: {e}")
 
+                await update_progress(progress_message, f"{progress_text}\n✅ Resultados procesados.")
+
                 # Build embed with results
                 # Use stats from JSON report (already calculated above)
                 
@@ -432,46 +636,33 @@ class ProfileView(View):
                 bar = '🟩' * filled_length + '⬜' * (bar_length - filled_length)
                 
                 # Build formatted embed matching user request
+                description = f"El cohete ha llegado a destino! 🪐 Click [acá]({report_url}) para ver el Reporte!\n-\nPasados : {passed}\nFallados : {failed}\nTotal : {total}\n[{bar}]"
+                if history and history.get("regressions"):
+                    description += f"\n🐢 Regresiones de duración: {history['regressions']}"
+                if stop_reason:
+                    description += f"\n🛑 Reporte parcial, ejecución detenida: {stop_reason}"
                 embed = discord.Embed(
                     title=f"[{profile}][{self.environment}]: {percentage} % -",
-                    description=f"El cohete ha llegado a destino! 🪐 Click [acá]({report_url}) para ver el Reporte!\n-\nPasados : {passed}\nFallados : {failed}\nTotal : {total}\n[{bar}]",
+                    description=description,
                     color=0x00ff00 if returncode == 0 else 0xff0000,
                 )
                 
                 # Add timestamp footer
-                from datetime import datetime
                 embed.set_footer(text=datetime.now().strftime("%d/%m/%y, %H:%M"))
                 
-                # Send message without error details or screenshots (as requested)
-                try:
-                    await interaction.followup.send(embed=embed)
-                except discord.HTTPException as e:
-                    # 50027: Invalid Webhook Token
-                    # 10062: Unknown Interaction
-                    if e.code == 50027 or e.code == 10062: 
-                        logging.warning(f"Interaction error {e.code}. Sending to channel instead.")
-                        channel = bot.get_channel(interaction.channel_id)
-                        if channel:
-                           await channel.send(f"<@{interaction.user.id}>", embed=embed)
-                        else:
-                            logging.error("Could not find channel to send fallback message.")
-                    else:
-                        raise e
-                
-            except asyncio.TimeoutError:
-                try:
-                    process.kill()
-                except:
-                    pass
-                logging.error("Timeout al ejecutar pytest")
-                await interaction.followup.send("⚠️ Timeout al ejecutar las pruebas. Por favor, verifica que los tests no requieran interacción manual.")
-                
+                return embed
+
+            finally:
+                # Never leave workers or browsers of a cancelled run behind
+                kill_process_group(process)
+
         except Exception as e:
             logging.error("Error al ejecutar pytest: %s", e, exc_info=True)
             try:
                 await interaction.followup.send(f"⚠️ Error al ejecutar el comando: {e}")
             except:
                 pass
+        return None
 
 class EnvironmentView(View):
     def __init__(self):
@@ -534,7 +725,17 @@ async def auto(interaction: discord.Interaction):
     if not interaction.response.is_done():
         await interaction.response.defer(ephemeral=False)
     view = EnvironmentView()
-    await interaction.followup.send("Selecciona el ambiente para las pruebas:", view=view)
+    message = await interaction.followup.send("Selecciona el ambiente para las pruebas:", view=view, wait=True)
+
+    # Probe every environment in parallel and show their status next to the buttons
+    try:
+        results = await health_probe.check_all()
+        status = " · ".join(
+            f"{'🟢' if health.ok else '🔴'} {environment}" for environment, health in results.items()
+        )
+        await message.edit(content=f"Selecciona el ambiente para las pruebas:\n{status}")
+    except Exception as e:
+        logging.warning("No se pudo obtener el estado de los ambientes: %s", e)
 
 @bot.tree.command(name="ping", description="Verifica si el bot está vivo")
 async def ping(interaction: discord.Interaction):
@@ -1,14 +1,46 @@
 import os
+import json
+import tempfile
+from urllib.parse import urljoin
 from dotenv import load_dotenv
 
 load_dotenv()
 
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_USERS = [
+    {"email": "agente@auto.com", "password": "Admin1234."},
+    {"email": "agente_1@auto.com", "password": "Admin1234."}
+]
+
+def load_users() -> list:
+    """
+    Agent accounts for parallel execution, from AGENT_ACCOUNTS_FILE (JSON list of
+    {"email", "password"}), AGENT_ACCOUNTS (same JSON inline, or
+    "email:password,email:password") or the default list.
+    """
+    accounts_file = os.getenv("AGENT_ACCOUNTS_FILE")
+    if accounts_file:
+        with open(accounts_file) as f:
+            return json.load(f)
+    accounts = os.getenv("AGENT_ACCOUNTS", "").strip()
+    if accounts.startswith("["):
+        return json.loads(accounts)
+    if accounts:
+        return [
+            {"email": email.strip(), "password": password}
+            for email, _, password in (item.partition(":") for item in accounts.split(","))
+        ]
+    return DEFAULT_USERS
+
 class Config:
     ENVIRONMENTS = {
         "pantera": "https://qa-pantera.chattigo.com/login/pages/login",
         "bugs": "https://qa-bugs.chattigo.com/login/pages/login",
         "support-bugs": "https://qa-support-bugs.chattigo.com/login/pages/login",
-        "leones": "https://qa-leones.chattigo.com/login/pages/login"
+        "leones": "https://qa-leones.chattigo.com/login/pages/login",
+        # Local stand-in of the agent console (python -m utils.mock_console)
+        "mock": os.getenv("MOCK_CONSOLE_URL", "http://127.0.0.1:8765/login/pages/login"),
     }
     
     # Default to pantera if not set
@@ -17,13 +49,74 @@ class Config:
     PASSWORD = os.getenv("PASSWORD", "Admin1234.")
     
     # List of available users for parallel execution
-    USERS = [
-        {"email": "agente@auto.com", "password": "Admin1234."},
-        {"email": "agente_1@auto.com", "password": "Admin1234."}
-    ]
+    USERS = load_users()
+    # Cross-process account leases (shared by every worker and run on this host)
+    ACCOUNT_LEASE_FILE = os.getenv("ACCOUNT_LEASE_FILE", os.path.join(tempfile.gettempdir(), "chattigo-account-leases.json"))
+    ACCOUNT_LEASE_TIMEOUT = int(os.getenv("ACCOUNT_LEASE_TIMEOUT", 900))
     TIMEOUT = int(os.getenv("TIMEOUT", 10000))
     HEADLESS = os.getenv("HEADLESS", "False").lower() == "true"
 
+    # Step timeout policy (ms) for the event-driven waits in the page objects.
+    # STEP_TIMEOUT_SCALE stretches every budget at once (e.g. 1.5 on Cloud Run).
+    STEP_TIMEOUTS = {
+        "ui": 10000,          # dropdowns, menus and modals opening/closing
+        "section": 20000,     # next section of a form rendering after a save
+        "navigation": 20000,  # page/route changes
+        "upload": 30000,      # file upload round-trips
+        "send": 30000,        # backend acknowledgement of an outbound send
+    }
+    STEP_TIMEOUT_SCALE = float(os.getenv("STEP_TIMEOUT_SCALE", 1))
+
+    @classmethod
+    def step_timeout(cls, kind: str) -> int:
+        return int(cls.STEP_TIMEOUTS.get(kind, cls.TIMEOUT) * cls.STEP_TIMEOUT_SCALE)
+
+    # Request that acknowledges an outbound send (regex on the URL of a POST/PUT fetch/XHR),
+    # timed from the ENVIAR OUTBOUND click; templates whose p50 is OUTBOUND_SLOW_THRESHOLD
+    # above the median of the run are flagged as slow. The default is the mock console's
+    # endpoint: for the QA consoles, set it to the URL logged when no response matches
+    OUTBOUND_SEND_URL_PATTERN = os.getenv("OUTBOUND_SEND_URL_PATTERN", r"/api/outbound/send(?:[?#]|$)")
+    OUTBOUND_SLOW_THRESHOLD = float(os.getenv("OUTBOUND_SLOW_THRESHOLD", 0.5))
+
+    # Relaunch the shared worker browser after N tests (0 = never)
+    BROWSER_RECYCLE_AFTER = int(os.getenv("BROWSER_RECYCLE_AFTER", 0))
+
+    # Network routing on every test context: tracker blocking and an on-disk cache of
+    # immutable static assets shared by all workers (and runs) on the host
+    BLOCK_TRACKERS = os.getenv("BLOCK_TRACKERS", "True").lower() == "true"
+    BLOCKED_DOMAINS = [
+        domain.strip() for domain in os.getenv(
+            "BLOCKED_DOMAINS",
+            "google-analytics.com,googletagmanager.com,doubleclick.net,hotjar.com,hotjar.io,"
+            "clarity.ms,facebook.net,connect.facebook.com,segment.io,mixpanel.com,stripe.network,m.stripe.com"
+        ).split(",") if domain.strip()
+    ]
+    ASSET_CACHE_ENABLED = os.getenv("ASSET_CACHE_ENABLED", "True").lower() == "true"
+    ASSET_CACHE_DIR = os.getenv("ASSET_CACHE_DIR", os.path.join(tempfile.gettempdir(), "chattigo-asset-cache"))
+
+    # Authenticated storage-state cache (one UI login per user and environment)
+    AUTH_CACHE_DIR = os.getenv("AUTH_CACHE_DIR", os.path.join(PROJECT_ROOT, ".auth"))
+    AUTH_CACHE_TTL = int(os.getenv("AUTH_CACHE_TTL", 1800))
+    DASHBOARD_PATH = os.getenv("DASHBOARD_PATH", "/dashboard/agent")
+
+    @classmethod
+    def dashboard_url(cls) -> str:
+        return urljoin(cls.BASE_URL, cls.DASHBOARD_PATH)
+
+    # Pre-flight environment health probe: paths checked on every environment origin
+    # (comma-separated HEALTH_PROBE_PATHS), per-request timeout and how long a verdict is reused
+    HEALTH_PROBE_PATHS = [
+        path.strip() for path in os.getenv("HEALTH_PROBE_PATHS", "/login/pages/login,/dashboard/agent").split(",") if path.strip()
+    ]
+    HEALTH_PROBE_TIMEOUT = float(os.getenv("HEALTH_PROBE_TIMEOUT", 10))
+    HEALTH_PROBE_TTL = int(os.getenv("HEALTH_PROBE_TTL", 60))
+    HEALTH_CACHE_DIR = os.getenv("HEALTH_CACHE_DIR", os.path.join(tempfile.gettempdir(), "chattigo-health"))
+
+    # Playwright traces kept for failed tests (see --tracing): "zstd" recompresses them
+    # when the optional zstandard package is installed, "none" keeps the plain zip
+    TRACE_COMPRESSION = os.getenv("TRACE_COMPRESSION", "zstd").lower()
+    TRACE_ZSTD_LEVEL = int(os.getenv("TRACE_ZSTD_LEVEL", 10))
+
     class TestData:
         VIDEO_URL = "https://cdn.pixabay.com/video/2024/12/17/247208_large.mp4"
         PDF_URL = "https://web.seducoahuila.gob.mx/biblioweb/upload/Frankenstein%20o%20el%20moderno%20Prometeo-libro.pdf"
@@ -1,79 +1,88 @@
+import time
+import weakref
+from contextlib import contextmanager
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 from pages.base_page import BasePage
+from pages.selectors import AgentDashboardSelectors
 
-class AgentDashboardPage(BasePage):
-    POPUP_ENTENDIDO_BUTTON = "ch-ui-widget-generic-modal button:has-text('Entendido')" # Specific selector from codegen
-    CHATS_HEADER = "text='Chats del agente'"
-
-    NAV_BAR = "nav"
-    TOGGLE_BUTTON = "xpath=/html/body/app-root/app-pages/app-main-dashboard/div[1]/nav/button"
-    LOGOUT_BUTTON = "text='Cerrar Sesión'"
-    
-    # Status and Timer Selectors
-    # Status and Timer Selectors
-    STATUS_BUTTON = "xpath=/html/body/app-root/app-pages/app-main-dashboard/div[1]/app-agent-console/agent-console/div[1]/div[1]/div[1]/session-control/div/div[1]/div[2]/state-selector/button"
-    SESSION_TIMER = "xpath=/html/body/app-root/app-pages/app-main-dashboard/div[1]/app-agent-console/agent-console/div[1]/div[1]/div[1]/session-control/div/div[2]/div[1]/span[2]/timer-count/span"
-    PAUSE_TIMER = "xpath=/html/body/app-root/app-pages/app-main-dashboard/div[1]/app-agent-console/agent-console/div[1]/div[1]/div[1]/session-control/div/div[2]/div[2]/span[2]/timer-count/span"
-    STATUS_SUCCESS_MESSAGE = "xpath=/html/body/app-root/app-pages/app-main-dashboard/div[1]/app-agent-console/agent-console/ch-ui-alerts/div/ch-ui-snackbar/div"
-    STATUS_SUCCESS_CLOSE_BUTTON = "xpath=/html/body/app-root/app-pages/app-main-dashboard/div[1]/app-agent-console/agent-console/ch-ui-alerts/div/ch-ui-snackbar/div/div[2]/button/span"
-
-    def handle_popup(self):
+class AgentDashboardPage(AgentDashboardSelectors, BasePage):
+    # Strategies that dismissed a popup in this process ('none' when the dashboard
+    # was interactive first). Drained per test by conftest into the JSON report.
+    popup_matches = []
+    _handler_locators = weakref.WeakKeyDictionary()
+
+    def _popup_locator(self):
+        """Single locator matching any of the popup strategies."""
+        combined = None
+        for _, selector in self.POPUP_STRATEGIES:
+            locator = self.page.locator(selector)
+            combined = locator if combined is None else combined.or_(locator)
+        return combined
+
+    def _dismiss_popup(self, source: str) -> bool:
+        for name, selector in self.POPUP_STRATEGIES:
+            button = self.page.locator(selector).first
+            if not button.is_visible():
+                continue
+            self.logger.info(f"Popup found via {name} ({source}). Clicking...")
+            AgentDashboardPage.popup_matches.append(name)
+            button.click(force=True)
+            button.wait_for(state="hidden", timeout=5000)
+            self.logger.info("Popup closed successfully.")
+            return True
+        return False
+
+    def _install_popup_handler(self):
+        # Playwright runs the handler before any action whenever the popup is visible,
+        # so it is dismissed at any point of the test, not only right after login.
+        if self.page in self._handler_locators:
+            return
+        locator = self._popup_locator()
+        self.page.add_locator_handler(locator, lambda: self._dismiss_popup("locator handler"))
+        self._handler_locators[self.page] = locator
+
+    @classmethod
+    @contextmanager
+    def popup_handler_paused(cls, page):
+        """Suspends the popup handler, e.g. while a flow expects its own 'Entendido' modal."""
+        locator = cls._handler_locators.pop(page, None)
+        if locator is not None:
+            page.remove_locator_handler(locator)
+        try:
+            yield
+        finally:
+            if locator is not None:
+                AgentDashboardPage(page)._install_popup_handler()
+
+    @classmethod
+    def drain_popup_matches(cls) -> list:
+        matches = list(cls.popup_matches)
+        cls.popup_matches.clear()
+        return matches
+
+    def handle_popup(self, timeout=10000):
         """
-        Checks if the 'Entendido' popup is visible and clicks it.
-        Uses a polling loop to handle variable appearance times (especially for agente_1).
+        Dismisses the 'Entendido' popup.
+        Races every popup strategy against the dashboard being interactive in a single
+        wait, so it returns as soon as either is visible instead of polling for a fixed time.
+        A locator handler stays registered to dismiss the popup if it appears later.
         """
-        self.logger.info("Starting popup handling loop (10s)...")
-        start_time = time.time()
-        timeout = 10
-        
-        while time.time() - start_time < timeout:
-             found_button = None
-             
-             # Strategy 1: Specific Modal Selector (Most precise)
-             try:
-                 btn = self.page.get_by_role("button", name="Entendido")
-                 if btn.is_visible():
-                     found_button = btn
-                     self.logger.info("Popup found via role 'button' name 'Entendido'")
-             except:
-                 pass
-     
-             # Strategy 2: User provided XPath (Fallback) - "Entendido" Button
-             if not found_button:
-                 try:
-                     xpath_ok = "/html/body/app-root/app-pages/app-main-dashboard/ch-ui-widget-generic-modal/div/div[2]/div/div[2]/div/div[1]/button"
-                     btn = self.page.locator(xpath_ok)
-                     if btn.is_visible():
-                         found_button = btn
-                         self.logger.info("Popup found via user provided XPath (OK button)")
-                 except:
-                     pass
-     
-             # Strategy 3: User provided XPath (Fallback) - "Close" (X) Button
-             if not found_button:
-                 try:
-                     xpath_close = "/html/body/app-root/app-pages/app-main-dashboard/ch-ui-widget-generic-modal/div/div[2]/button/span"
-                     btn = self.page.locator(xpath_close)
-                     if btn.is_visible():
-                         found_button = btn
-                         self.logger.info("Popup found via user provided XPath (Close button)")
-                 except:
-                     pass
-             
-             # Action
-             if found_button:
-                 try:
-                     self.logger.info("Clicking popup button...")
-                     found_button.click(force=True)
-                     found_button.wait_for(state="hidden", timeout=5000)
-                     self.logger.info("Popup closed successfully.")
-                     return # Exit loop if closed
-                 except Exception as e:
-                     self.logger.warning(f"Failed to click popup: {e}. Retrying...")
-             
-             # Wait a bit before next check
-             self.page.wait_for_timeout(500)
-             
-        self.logger.info("Popup detection loop ended. No popup found or closed.")
+        with self.step("handle_popup"):
+            self._install_popup_handler()
+            popup = self._popup_locator()
+            dashboard_ready = self.page.locator(self.STATUS_BUTTON).or_(self.page.locator(self.CHATS_HEADER))
+
+            start_time = time.perf_counter()
+            try:
+                popup.or_(dashboard_ready).first.wait_for(state="visible", timeout=timeout)
+            except PlaywrightTimeoutError:
+                self.logger.info(f"Neither popup nor dashboard visible after {timeout / 1000:.0f}s.")
+                return
+
+            if popup.first.is_visible() and self._dismiss_popup("handle_popup"):
+                return
+            AgentDashboardPage.popup_matches.append("none")
+            self.logger.info(f"Dashboard interactive after {time.perf_counter() - start_time:.2f}s, no popup shown.")
 
     def is_chats_header_visible(self) -> bool:
         # Wait for the header to be visible
@@ -104,7 +113,7 @@ class AgentDashboardPage(BasePage):
         
         # Wait for dropdown/options to appear. Assuming standard behavior.
         # Using text matching for the option.
-        option_selector = f"button:has-text('{status_name}')" 
+        option_selector = self.STATUS_OPTION.format(status_name)
         # Note: If options are not buttons, we might need a more generic selector like "li" or "div".
         # But usually in these apps they are buttons or list items.
         # Let's try to find it.
@@ -184,7 +193,7 @@ class AgentDashboardPage(BasePage):
         
         # 1. Click 'Finalizar' button
         self.logger.info("Clicking 'Finalizar' button...")
-        self.page.get_by_role("button", name="Finalizar").click()
+        self.page.get_by_role("button", name=self.FINALIZE_BUTTON_NAME).click()
         
         # 2. Select reason from the list
         self.logger.info(f"Selecting reason: {reason}")
@@ -194,6 +203,6 @@ class AgentDashboardPage(BasePage):
         
         # 3. Confirm 'Finalizar chat'
         self.logger.info("Confirming 'Finalizar chat'...")
-        self.page.locator("a").filter(has_text="Finalizar chat").click()
+        self.page.locator("a").filter(has_text=self.FINALIZE_CONFIRM_TEXT).click()
         
         self.logger.info("Chat finalized successfully.")
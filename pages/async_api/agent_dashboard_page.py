@@ -0,0 +1,142 @@
+import time
+import weakref
+from contextlib import asynccontextmanager
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from pages.async_api.base_page import BasePage
+from pages.selectors import AgentDashboardSelectors
+
+
+class AgentDashboardPage(AgentDashboardSelectors, BasePage):
+    _handler_locators = weakref.WeakKeyDictionary()
+
+    def __init__(self, page, steps: list = None):
+        super().__init__(page, steps)
+        # Popup strategies that matched on this page ('none' when the dashboard was interactive first)
+        self.popup_matches = []
+
+    def _popup_locator(self):
+        """Single locator matching any of the popup strategies."""
+        combined = None
+        for _, selector in self.POPUP_STRATEGIES:
+            locator = self.page.locator(selector)
+            combined = locator if combined is None else combined.or_(locator)
+        return combined
+
+    async def _dismiss_popup(self, source: str) -> bool:
+        for name, selector in self.POPUP_STRATEGIES:
+            button = self.page.locator(selector).first
+            if not await button.is_visible():
+                continue
+            self.logger.info(f"Popup found via {name} ({source}). Clicking...")
+            self.popup_matches.append(name)
+            await button.click(force=True)
+            await button.wait_for(state="hidden", timeout=5000)
+            return True
+        return False
+
+    async def _install_popup_handler(self):
+        if self.page in self._handler_locators:
+            return
+        locator = self._popup_locator()
+        await self.page.add_locator_handler(locator, lambda: self._dismiss_popup("locator handler"))
+        self._handler_locators[self.page] = locator
+
+    @classmethod
+    @asynccontextmanager
+    async def popup_handler_paused(cls, page):
+        """Suspends the popup handler, e.g. while a flow expects its own 'Entendido' modal."""
+        locator = cls._handler_locators.pop(page, None)
+        if locator is not None:
+            await page.remove_locator_handler(locator)
+        try:
+            yield
+        finally:
+            if locator is not None:
+                await AgentDashboardPage(page)._install_popup_handler()
+
+    async def handle_popup(self, timeout=10000):
+        """
+        Dismisses the 'Entendido' popup, racing it against the dashboard being interactive.
+        A locator handler stays registered to dismiss the popup if it appears later.
+        """
+        async with self.step("handle_popup"):
+            await self._install_popup_handler()
+            popup = self._popup_locator()
+            dashboard_ready = self.page.locator(self.STATUS_BUTTON).or_(self.page.locator(self.CHATS_HEADER))
+
+            start_time = time.perf_counter()
+            try:
+                await popup.or_(dashboard_ready).first.wait_for(state="visible", timeout=timeout)
+            except PlaywrightTimeoutError:
+                self.logger.info(f"Neither popup nor dashboard visible after {timeout / 1000:.0f}s.")
+                return
+
+            if await popup.first.is_visible() and await self._dismiss_popup("handle_popup"):
+                return
+            self.popup_matches.append("none")
+            self.logger.info(f"Dashboard interactive after {time.perf_counter() - start_time:.2f}s, no popup shown.")
+
+    async def is_chats_header_visible(self) -> bool:
+        try:
+            await self.page.wait_for_selector(self.CHATS_HEADER, state="visible", timeout=10000)
+            return True
+        except PlaywrightTimeoutError:
+            return False
+
+    async def get_status_text(self) -> str:
+        await self.page.wait_for_selector(self.STATUS_BUTTON, state="visible", timeout=10000)
+        return (await self.page.inner_text(self.STATUS_BUTTON)).strip()
+
+    async def set_status(self, status_name: str):
+        """Sets the agent status (e.g. 'Descanso', 'Online')."""
+        async with self.step("set_status"):
+            self.logger.info(f"Setting status to: {status_name}")
+            await self.page.wait_for_selector(self.STATUS_BUTTON, state="visible", timeout=10000)
+            await self.page.wait_for_timeout(500)
+            await self.click(self.STATUS_BUTTON, force=True)
+
+            option_selector = self.STATUS_OPTION.format(status_name)
+            await self.page.wait_for_selector(option_selector, state="visible", timeout=5000)
+            await self.click(option_selector)
+            # Sleeping here only parks this session's coroutine, the other agents keep running
+            await self.page.wait_for_timeout(2000)
+
+    async def is_timer_visible(self) -> bool:
+        return await self.page.is_visible(self.SESSION_TIMER)
+
+    async def get_timer_value(self) -> str:
+        await self.page.wait_for_selector(self.SESSION_TIMER, state="visible", timeout=10000)
+        return (await self.page.inner_text(self.SESSION_TIMER)).strip()
+
+    async def get_pause_timer_value(self) -> str:
+        if await self.page.is_visible(self.PAUSE_TIMER):
+            return (await self.page.inner_text(self.PAUSE_TIMER)).strip()
+        return "00:00:00"
+
+    async def verify_status_message(self) -> bool:
+        """Verifies the status update success message appears and closes it."""
+        try:
+            await self.page.wait_for_selector(self.STATUS_SUCCESS_MESSAGE, state="visible", timeout=10000)
+            if await self.page.is_visible(self.STATUS_SUCCESS_CLOSE_BUTTON):
+                await self.page.wait_for_timeout(500)
+                await self.click(self.STATUS_SUCCESS_CLOSE_BUTTON, force=True)
+                await self.page.wait_for_selector(self.STATUS_SUCCESS_MESSAGE, state="hidden", timeout=5000)
+            return True
+        except Exception as e:
+            self.logger.error(f"Status message verification failed: {e}")
+            return False
+
+    async def logout(self):
+        """Performs the logout action by expanding the side menu."""
+        async with self.step("logout"):
+            await self.page.hover(self.NAV_BAR)
+            await self.click(self.TOGGLE_BUTTON)
+            await self.page.wait_for_selector(self.LOGOUT_BUTTON, state="visible", timeout=5000)
+            await self.click(self.LOGOUT_BUTTON)
+
+    async def finalize_chat(self, reason: str = "Cierre"):
+        """Finalizes the open chat with the given closing reason."""
+        async with self.step("finalize_chat"):
+            await self.page.get_by_role("button", name=self.FINALIZE_BUTTON_NAME).click()
+            await self.page.get_by_role("listitem").filter(has_text=reason).click()
+            await self.page.locator("a").filter(has_text=self.FINALIZE_CONFIRM_TEXT).click()
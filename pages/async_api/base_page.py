@@ -0,0 +1,55 @@
+import time
+from contextlib import asynccontextmanager
+from playwright.async_api import Page
+from config.config import Config
+from utils.logger import get_logger
+
+
+class BasePage:
+    """
+    asyncio twin of pages.base_page.BasePage, for many agent sessions on one event loop.
+
+    Steps are not recorded on the process-wide timing recorder (its single timeline
+    would interleave every concurrent session); they are appended to `steps`, a list
+    the page objects of one session can share, in the span format aggregate_steps() reads.
+    """
+
+    def __init__(self, page: Page, steps: list = None):
+        self.page = page
+        self.logger = get_logger(self.__class__.__name__)
+        self.steps = steps if steps is not None else []
+
+    @asynccontextmanager
+    async def step(self, name: str):
+        """Times a named page step, logs the wall-clock it needed and adds it to `steps`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            self.steps.append({"name": name, "kind": "step", "duration": round(duration, 4)})
+            self.logger.info(f"[step] {name} took {duration:.2f}s")
+
+    def timeout_for(self, kind: str) -> int:
+        """Timeout (ms) for a kind of wait, from the central policy in Config.STEP_TIMEOUTS."""
+        return Config.step_timeout(kind)
+
+    async def navigate(self, url: str):
+        self.logger.info(f"Navigating to {url}")
+        await self.page.goto(url)
+
+    async def click(self, selector: str, **kwargs):
+        self.logger.info(f"Clicking element: {selector}")
+        await self.page.click(selector, **kwargs)
+
+    async def fill(self, selector: str, text: str):
+        self.logger.info(f"Filling element {selector} with text: {text}")
+        await self.page.fill(selector, text)
+
+    async def get_text(self, selector: str) -> str:
+        self.logger.info(f"Getting text from element: {selector}")
+        return await self.page.inner_text(selector)
+
+    async def is_visible(self, selector: str) -> bool:
+        self.logger.info(f"Checking visibility of element: {selector}")
+        return await self.page.is_visible(selector)
@@ -0,0 +1,56 @@
+import re
+from pages.async_api.base_page import BasePage
+from pages.login_page import LoginFailedError
+from pages.selectors import LoginSelectors
+
+
+class LoginPage(LoginSelectors, BasePage):
+    async def login(self, username, password, retries=3):
+        async with self.step("login"):
+            for attempt in range(1, retries + 1):
+                try:
+                    self.logger.info(f"Starting login process for {username} (Attempt {attempt}/{retries})")
+                    if "dashboard" in self.page.url:
+                        self.logger.info("Already on dashboard.")
+                        return
+
+                    await self.page.wait_for_selector(self.USERNAME_INPUT, state="visible", timeout=10000)
+                    await self.fill(self.USERNAME_INPUT, username)
+                    await self.page.wait_for_selector(self.PASSWORD_INPUT, state="visible", timeout=10000)
+                    await self.fill(self.PASSWORD_INPUT, password)
+                    await self.click(self.LOGIN_BUTTON)
+
+                    try:
+                        await self.page.wait_for_url(re.compile(".*dashboard"), timeout=30000)
+                        self.logger.info(f"Login successful for {username} on attempt {attempt}")
+                        return
+                    except Exception:
+                        if await self.page.is_visible(self.ERROR_MESSAGE):
+                            self.logger.warning("Login failed: Incorrect credentials message displayed.")
+                        else:
+                            self.logger.warning("Login failed: Navigation to dashboard timed out.")
+                        raise Exception("Login verification failed")
+
+                except Exception as e:
+                    self.logger.warning(f"Login attempt {attempt} for {username} failed: {e}")
+                    if attempt == retries:
+                        raise LoginFailedError(f"Login failed after {retries} attempts: {e}") from e
+                    await self.page.reload()
+                    await self.page.wait_for_load_state("networkidle")
+
+    async def has_active_session(self, timeout=15000) -> bool:
+        """
+        Waits until either the dashboard or the login form is rendered.
+        Returns True when the page landed on the dashboard (e.g. restored session).
+        """
+        dashboard = self.page.locator(self.DASHBOARD_ROOT)
+        login_form = self.page.locator(self.USERNAME_INPUT)
+        try:
+            await dashboard.or_(login_form).first.wait_for(state="visible", timeout=timeout)
+        except Exception:
+            self.logger.warning("Neither dashboard nor login form rendered in time.")
+            return False
+        return "dashboard" in self.page.url and await dashboard.first.is_visible()
+
+    async def get_error_message(self):
+        return await self.get_text(self.ERROR_MESSAGE)
@@ -0,0 +1,76 @@
+import time
+from playwright.async_api import Page
+from pages.async_api.outbound_page import OutboundPage
+from pages.outbound_flow import DEFAULT_CONTACT_LIST, OutboundVariant
+from utils.logger import get_logger
+
+
+class OutboundSendFlow:
+    """asyncio twin of pages.outbound_flow.OutboundSendFlow (same reset and recovery rules)."""
+
+    def __init__(self, page: Page, campaign: str = "Campaña automation", channel: str = "5215639549198",
+                 contact_list: str = DEFAULT_CONTACT_LIST, agent: str = "Yo", steps: list = None):
+        self.page = page
+        self.outbound_page = OutboundPage(page, steps)
+        self.logger = get_logger(self.__class__.__name__)
+        self.campaign = campaign
+        self.channel = channel
+        self.contact_list = contact_list
+        self.agent = agent
+        self._form_url = None
+        self._needs_navigation = True
+        self.metrics = []
+
+    def drain_metrics(self) -> list:
+        """Returns the send records accumulated since the previous call and resets them."""
+        metrics, self.metrics = self.metrics, []
+        return metrics
+
+    async def reset(self):
+        """Leaves the page on an empty Enviar Outbound form."""
+        if self._needs_navigation or self._form_url is None:
+            await self.outbound_page.navigate_to_outbound()
+            self._form_url = self.page.url
+            self._needs_navigation = False
+            return
+
+        self.logger.info("Resetting outbound form")
+        await self.page.goto(self._form_url)
+        try:
+            await self.page.locator(self.outbound_page.CAMPAIGN_DROPDOWN).wait_for(
+                state="visible", timeout=self.outbound_page.timeout_for("navigation")
+            )
+        except Exception:
+            self.logger.warning("Outbound form not restored by reload, navigating through the menu")
+            await self.outbound_page.navigate_to_outbound()
+
+    async def send(self, variant: OutboundVariant):
+        self.logger.info(f"Sending outbound variant: {variant.id}")
+        record = {"template": variant.template, "attachment": variant.attachment, "ok": False, "steps": {}}
+        self.metrics.append(record)
+        start = time.perf_counter()
+
+        async def timed(name, action, *args, **kwargs):
+            step_start = time.perf_counter()
+            result = await action(*args, **kwargs)
+            record["steps"][name] = round(time.perf_counter() - step_start, 4)
+            return result
+
+        try:
+            await timed("reset", self.reset)
+            await timed("select_campaign", self.outbound_page.select_campaign, self.campaign)
+            await timed("select_channel", self.outbound_page.select_channel, self.channel)
+            await timed("upload_contact_list", self.outbound_page.upload_contact_list, self.contact_list)
+            await timed(
+                "select_template", self.outbound_page.select_template,
+                variant.template, attachment_path=variant.attachment_path, attachment_url=variant.attachment_url,
+            )
+            await timed("select_agent", self.outbound_page.select_agent, self.agent)
+            record.update(await timed("send_outbound", self.outbound_page.send_outbound))
+            record["ok"] = True
+        except Exception as e:
+            record["error"] = type(e).__name__
+            self._needs_navigation = True
+            raise
+        finally:
+            record["total"] = round(time.perf_counter() - start, 4)
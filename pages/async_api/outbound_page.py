@@ -0,0 +1,174 @@
+import os
+import time
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from pages.async_api.agent_dashboard_page import AgentDashboardPage
+from pages.async_api.base_page import BasePage
+from pages.outbound_page import OutboundPage as SyncOutboundPage
+from pages.selectors import OutboundSelectors
+
+
+class OutboundPage(OutboundSelectors, BasePage):
+    # Same network matching and timing as the sync page
+    _is_upload_response = staticmethod(SyncOutboundPage._is_upload_response)
+    _is_send_response = staticmethod(SyncOutboundPage._is_send_response)
+    _record_send_responses = staticmethod(SyncOutboundPage._record_send_responses)
+    _send_response = staticmethod(SyncOutboundPage._send_response)
+    _send_timings = staticmethod(SyncOutboundPage._send_timings)
+
+    def _dropdown_button(self, index: int = 0):
+        buttons = self.page.get_by_role("button", name=self.DROPDOWN_BUTTON_NAME)
+        return buttons.last if index == -1 else buttons.nth(index)
+
+    async def navigate_to_outbound(self):
+        self.logger.info("Navigating to Outbound > Enviar Outbound")
+        async with self.step("navigate_to_outbound"):
+            await self.page.wait_for_selector(self.NAV_BAR, state="visible", timeout=self.timeout_for("navigation"))
+            await self.page.hover(self.NAV_BAR)
+            await self.click(self.TOGGLE_BUTTON, force=True)
+            await self.page.locator(self.OUTBOUND_MENU).first.wait_for(state="visible", timeout=self.timeout_for("ui"))
+            await self.click(self.OUTBOUND_MENU)
+            await self.click(self.SEND_OUTBOUND_SUBMENU)
+            await self.page.locator(self.CAMPAIGN_DROPDOWN).wait_for(state="visible", timeout=self.timeout_for("navigation"))
+
+    async def select_campaign(self, campaign_name: str):
+        self.logger.info(f"Selecting campaign: {campaign_name}")
+        async with self.step("select_campaign"):
+            await self.click(self.CAMPAIGN_DROPDOWN)
+            await self.click(self.option_selector(campaign_name, "p"))
+            # The campaign is applied once its button stops showing the 'Seleccionar' placeholder
+            await self.page.locator(self.CAMPAIGN_DROPDOWN).wait_for(state="hidden", timeout=self.timeout_for("ui"))
+
+    async def select_channel(self, channel_name: str):
+        self.logger.info(f"Selecting channel: {channel_name}")
+        async with self.step("select_channel"):
+            channel_dropdown = self.page.locator(self.CHANNEL_DROPDOWN).first
+            await channel_dropdown.wait_for(state="visible", timeout=self.timeout_for("section"))
+            await channel_dropdown.click(force=True)
+
+            option = self.page.get_by_role("paragraph").filter(has_text=channel_name)
+            await option.wait_for(state="visible", timeout=self.timeout_for("section"))
+            await option.click()
+            # The channel is applied once the contact list section is available
+            await self.page.wait_for_selector(self.ATTACH_CONTACTS_BUTTON, state="visible", timeout=self.timeout_for("section"))
+
+    async def upload_contact_list(self, file_path: str):
+        self.logger.info(f"Uploading contact list from: {file_path}")
+        async with self.step("upload_contact_list"):
+            await self.click(self.ATTACH_CONTACTS_BUTTON)
+            async with self.page.expect_file_chooser(timeout=self.timeout_for("ui")) as chooser_info:
+                await self.click(self.SELECT_FILE_TEXT)
+            file_chooser = await chooser_info.value
+
+            # The list is uploaded either when the file is chosen or when the modal is saved
+            modal_save = self.page.locator(f"{self.DIALOG} button").filter(has_text=self.SAVE_TEXT)
+            try:
+                async with self.page.expect_response(self._is_upload_response, timeout=self.timeout_for("upload")) as response_info:
+                    await file_chooser.set_files(file_path)
+                    await modal_save.click(timeout=self.timeout_for("upload"))
+                self.logger.info(f"Contact list upload answered with HTTP {(await response_info.value).status}")
+            except PlaywrightTimeoutError:
+                self.logger.warning("No upload response observed for the contact list, continuing.")
+
+            await self.page.locator(self.DIALOG).first.wait_for(state="hidden", timeout=self.timeout_for("ui"))
+            await self.page.locator(self.SECTIONS).get_by_text(self.SAVE_TEXT).click()
+            # Section saved once the template dropdown is rendered
+            await self._dropdown_button().wait_for(state="visible", timeout=self.timeout_for("section"))
+
+    async def select_template(self, template_name: str, attachment_path: str = None, attachment_url: str = None):
+        self.logger.info(f"Selecting template: {template_name}")
+        async with self.step("select_template"):
+            await self.page.keyboard.press("PageDown")
+            template_dropdown = self._dropdown_button()
+            await template_dropdown.wait_for(state="visible", timeout=self.timeout_for("section"))
+            await template_dropdown.click(force=True)
+
+            search = self.page.locator(self.TEMPLATE_SEARCH_INPUT)
+            await search.wait_for(state="visible", timeout=self.timeout_for("ui"))
+            await search.clear()
+            # Typed key by key so the frontend filter triggers
+            await search.press_sequentially(self.template_search_term(template_name), delay=100)
+
+            template_selector = self.option_selector(template_name)
+            await self.page.wait_for_selector(template_selector, state="visible", timeout=self.timeout_for("ui"))
+            await self.click(template_selector, force=True)
+
+            template_save = self.page.locator("a").filter(has_text=self.SAVE_TEXT)
+            await template_save.first.wait_for(state="visible", timeout=self.timeout_for("ui"))
+
+            if attachment_path:
+                if not os.path.exists(attachment_path):
+                    raise FileNotFoundError(f"Attachment file not found at: {attachment_path}")
+                async with self.page.expect_file_chooser(timeout=self.timeout_for("ui")) as chooser_info:
+                    await self.page.get_by_role("button", name=self.ATTACH_FILE_BUTTON_NAME).click(force=True)
+                file_chooser = await chooser_info.value
+                try:
+                    async with self.page.expect_response(self._is_upload_response, timeout=self.timeout_for("upload")) as response_info:
+                        await file_chooser.set_files(attachment_path)
+                    self.logger.info(f"Attachment upload answered with HTTP {(await response_info.value).status}")
+                except PlaywrightTimeoutError:
+                    self.logger.warning("No upload response observed for the attachment, continuing.")
+
+            if attachment_url:
+                await self.page.get_by_text(self.ATTACHMENT_URL_TEXT).click(force=True)
+                url_input = self.page.get_by_role("textbox").last
+                await url_input.wait_for(state="visible", timeout=self.timeout_for("ui"))
+                await url_input.fill(attachment_url)
+
+            await template_save.click()
+            # The section closed (and the agent one can render) once the search input is gone
+            await search.wait_for(state="hidden", timeout=self.timeout_for("ui"))
+
+    async def select_agent(self, agent_option: str = "Yo"):
+        self.logger.info(f"Selecting agent: {agent_option}")
+        async with self.step("select_agent"):
+            await self.page.keyboard.press("PageDown")
+            agent_dropdown = self._dropdown_button(-1)
+            option = self.page.get_by_role("button", name=agent_option)
+
+            await agent_dropdown.wait_for(state="visible", timeout=self.timeout_for("section"))
+            await agent_dropdown.click(force=True)
+            try:
+                await option.wait_for(state="visible", timeout=self.timeout_for("ui"))
+            except PlaywrightTimeoutError:
+                self.logger.warning("Agent option not visible, retrying dropdown click...")
+                await agent_dropdown.click(force=True)
+                await option.wait_for(state="visible", timeout=self.timeout_for("ui"))
+            await option.click(force=True)
+
+            await self.page.locator(self.SECTIONS).get_by_text(self.SAVE_TEXT).click()
+            # Wizard complete once the send button is available
+            await self.page.get_by_role("button", name=self.SEND_BUTTON_NAME).wait_for(
+                state="visible", timeout=self.timeout_for("section")
+            )
+
+    async def send_outbound(self) -> dict:
+        """Sends the outbound and returns its timings, as the sync OutboundPage.send_outbound."""
+        self.logger.info("Sending Outbound")
+        timings = {"status": None, "ack": None, "ttfb": None, "confirmed": None}
+        seen = []
+        on_response = self._record_send_responses(seen)
+        # The success modal also has an 'Entendido' button: keep the dashboard popup
+        # handler from dismissing it before the send is confirmed.
+        async with self.step("send_outbound"), AgentDashboardPage.popup_handler_paused(self.page):
+            success_button = self.page.get_by_role("button", name=self.SUCCESS_BUTTON_NAME)
+            self.page.on("response", on_response)
+            try:
+                clicked_at = time.time()
+                await self.page.get_by_role("button", name=self.SEND_BUTTON_NAME).click()
+                await success_button.wait_for(state="visible", timeout=self.timeout_for("send"))
+                timings["confirmed"] = round(time.time() - clicked_at, 4)
+            finally:
+                self.page.remove_listener("response", on_response)
+
+            response, received_at = self._send_response(seen, self.logger)
+            if response:
+                await response.finished()
+                timings.update(self._send_timings(response, clicked_at, received_at))
+            else:
+                timings["ack"] = timings["confirmed"]
+            await success_button.click()
+            try:
+                await self.page.get_by_role("button", name=self.TOAST_CLOSE_BUTTON_NAME).click(timeout=3000)
+            except PlaywrightTimeoutError:
+                pass
+        return timings
@@ -1,27 +1,50 @@
+import time
+from contextlib import contextmanager
 from playwright.sync_api import Page, Locator
+from config.config import Config
 from utils.logger import get_logger
+from utils.timing import recorder
 
 class BasePage:
     def __init__(self, page: Page):
         self.page = page
         self.logger = get_logger(self.__class__.__name__)
 
+    @contextmanager
+    def step(self, name: str):
+        """Times a named page step, logs the wall-clock it needed and adds it to the test timeline."""
+        start = time.perf_counter()
+        try:
+            with recorder.span(name, kind="step"):
+                yield
+        finally:
+            self.logger.info(f"[step] {name} took {time.perf_counter() - start:.2f}s")
+
+    def timeout_for(self, kind: str) -> int:
+        """Timeout (ms) for a kind of wait, from the central policy in Config.STEP_TIMEOUTS."""
+        return Config.step_timeout(kind)
+
     def navigate(self, url: str):
         self.logger.info(f"Navigating to {url}")
-        self.page.goto(url)
+        with recorder.span(f"goto {url}"):
+            self.page.goto(url)
 
     def click(self, selector: str, **kwargs):
         self.logger.info(f"Clicking element: {selector}")
-        self.page.click(selector, **kwargs)
+        with recorder.span(f"click {selector}"):
+            self.page.click(selector, **kwargs)
 
     def fill(self, selector: str, text: str):
         self.logger.info(f"Filling element {selector} with text: {text}")
-        self.page.fill(selector, text)
+        with recorder.span(f"fill {selector}"):
+            self.page.fill(selector, text)
 
     def get_text(self, selector: str) -> str:
         self.logger.info(f"Getting text from element: {selector}")
-        return self.page.inner_text(selector)
+        with recorder.span(f"get_text {selector}"):
+            return self.page.inner_text(selector)
 
     def is_visible(self, selector: str) -> bool:
         self.logger.info(f"Checking visibility of element: {selector}")
-        return self.page.is_visible(selector)
+        with recorder.span(f"is_visible {selector}"):
+            return self.page.is_visible(selector)
@@ -0,0 +1,112 @@
+import os
+import time
+from dataclasses import dataclass
+from playwright.sync_api import Page
+from config.config import PROJECT_ROOT
+from pages.outbound_page import OutboundPage
+from utils.logger import get_logger
+
+UTILS_DIR = os.path.join(PROJECT_ROOT, "utils")
+DEFAULT_CONTACT_LIST = os.path.join(UTILS_DIR, "Plantilla_HSM.xlsx")
+
+
+@dataclass(frozen=True)
+class OutboundVariant:
+    """One HSM template to send, optionally with a file or URL attachment."""
+    template: str
+    attachment_path: str = None
+    attachment_url: str = None
+
+    @property
+    def id(self) -> str:
+        return self.template
+
+    @property
+    def attachment(self) -> str:
+        """Attachment type, the other axis (besides the template) send latency is grouped by."""
+        if self.attachment_path:
+            return "file"
+        return "url" if self.attachment_url else "none"
+
+
+class OutboundSendFlow:
+    """
+    Runs the Enviar Outbound wizard for many template variants on a single
+    authenticated page.
+
+    Login, popup handling and the sidebar navigation happen once. Between
+    variants the form is reset by reloading the Enviar Outbound route; after a
+    failed variant the flow navigates through the menu again so the next one
+    starts from a clean state.
+
+    Every send leaves a record in `metrics` (time per wizard step plus the
+    send_outbound network timings), collected by conftest with drain_metrics().
+    """
+
+    def __init__(self, page: Page, campaign: str = "Campaña automation", channel: str = "5215639549198",
+                 contact_list: str = DEFAULT_CONTACT_LIST, agent: str = "Yo"):
+        self.page = page
+        self.outbound_page = OutboundPage(page)
+        self.logger = get_logger(self.__class__.__name__)
+        self.campaign = campaign
+        self.channel = channel
+        self.contact_list = contact_list
+        self.agent = agent
+        self._form_url = None
+        self._needs_navigation = True
+        self.metrics = []
+
+    def drain_metrics(self) -> list:
+        """Returns the send records accumulated since the previous call and resets them."""
+        metrics, self.metrics = self.metrics, []
+        return metrics
+
+    def reset(self):
+        """Leaves the page on an empty Enviar Outbound form."""
+        if self._needs_navigation or self._form_url is None:
+            self.outbound_page.navigate_to_outbound()
+            self._form_url = self.page.url
+            self._needs_navigation = False
+            return
+
+        self.logger.info("Resetting outbound form")
+        self.page.goto(self._form_url)
+        try:
+            self.page.locator(self.outbound_page.CAMPAIGN_DROPDOWN).wait_for(
+                state="visible", timeout=self.outbound_page.timeout_for("navigation")
+            )
+        except Exception:
+            # The route did not restore the form (e.g. SPA redirect), use the menu instead
+            self.logger.warning("Outbound form not restored by reload, navigating through the menu")
+            self.outbound_page.navigate_to_outbound()
+
+    def send(self, variant: OutboundVariant):
+        self.logger.info(f"Sending outbound variant: {variant.id}")
+        record = {"template": variant.template, "attachment": variant.attachment, "ok": False, "steps": {}}
+        self.metrics.append(record)
+        start = time.perf_counter()
+
+        def timed(name, action, *args, **kwargs):
+            step_start = time.perf_counter()
+            result = action(*args, **kwargs)
+            record["steps"][name] = round(time.perf_counter() - step_start, 4)
+            return result
+
+        try:
+            timed("reset", self.reset)
+            timed("select_campaign", self.outbound_page.select_campaign, self.campaign)
+            timed("select_channel", self.outbound_page.select_channel, self.channel)
+            timed("upload_contact_list", self.outbound_page.upload_contact_list, self.contact_list)
+            timed(
+                "select_template", self.outbound_page.select_template,
+                variant.template, attachment_path=variant.attachment_path, attachment_url=variant.attachment_url,
+            )
+            timed("select_agent", self.outbound_page.select_agent, self.agent)
+            record.update(timed("send_outbound", self.outbound_page.send_outbound))
+            record["ok"] = True
+        except Exception as e:
+            record["error"] = type(e).__name__
+            self._needs_navigation = True
+            raise
+        finally:
+            record["total"] = round(time.perf_counter() - start, 4)
@@ -0,0 +1,91 @@
+"""
+Selectors of the agent console, shared by the sync page objects (pages/*.py)
+and their asyncio counterparts (pages/async_api/). Page classes inherit the
+selector class of their page, so a selector fix lands in both modes at once.
+"""
+
+DASHBOARD_XPATH = "xpath=/html/body/app-root/app-pages/app-main-dashboard"
+SESSION_CONTROL_XPATH = (
+    f"{DASHBOARD_XPATH}/div[1]/app-agent-console/agent-console/div[1]/div[1]/div[1]/session-control/div"
+)
+ALERTS_XPATH = f"{DASHBOARD_XPATH}/div[1]/app-agent-console/agent-console/ch-ui-alerts/div/ch-ui-snackbar/div"
+POPUP_XPATH = f"{DASHBOARD_XPATH}/ch-ui-widget-generic-modal/div/div[2]"
+
+
+class LoginSelectors:
+    USERNAME_INPUT = "input[placeholder='Usuario']"
+    PASSWORD_INPUT = "input[placeholder='Contraseña']"
+    LOGIN_BUTTON = "#loginButton"
+    # Selector for "Session already active" popup if it exists, or just generic error
+    ERROR_MESSAGE = "text='Login incorrecto, intente de nuevo.'"
+    DASHBOARD_ROOT = "app-main-dashboard"
+
+
+class AgentDashboardSelectors:
+    POPUP_ENTENDIDO_BUTTON = "ch-ui-widget-generic-modal button:has-text('Entendido')" # Specific selector from codegen
+    CHATS_HEADER = "text='Chats del agente'"
+
+    NAV_BAR = "nav"
+    TOGGLE_BUTTON = f"{DASHBOARD_XPATH}/div[1]/nav/button"
+    LOGOUT_BUTTON = "text='Cerrar Sesión'"
+
+    # Status and Timer Selectors
+    STATUS_BUTTON = f"{SESSION_CONTROL_XPATH}/div[1]/div[2]/state-selector/button"
+    STATUS_OPTION = "button:has-text('{}')"
+    SESSION_TIMER = f"{SESSION_CONTROL_XPATH}/div[2]/div[1]/span[2]/timer-count/span"
+    PAUSE_TIMER = f"{SESSION_CONTROL_XPATH}/div[2]/div[2]/span[2]/timer-count/span"
+    STATUS_SUCCESS_MESSAGE = ALERTS_XPATH
+    STATUS_SUCCESS_CLOSE_BUTTON = f"{ALERTS_XPATH}/div[2]/button/span"
+
+    # Candidate locators for the 'Entendido' popup, most precise first
+    POPUP_STRATEGIES = (
+        ("role_button_entendido", 'role=button[name="Entendido"]'),
+        ("xpath_ok_button", f"{POPUP_XPATH}/div/div[2]/div/div[1]/button"),
+        ("xpath_close_button", f"{POPUP_XPATH}/button/span"),
+    )
+
+    CHAT_CARD = "chat-card"
+    FINALIZE_BUTTON_NAME = "Finalizar"
+    FINALIZE_CONFIRM_TEXT = "Finalizar chat"
+
+
+class OutboundSelectors:
+    OUTBOUND_MENU = "text=Outbound"
+    SEND_OUTBOUND_SUBMENU = "text=Enviar Outbound"
+    NAV_BAR = AgentDashboardSelectors.NAV_BAR
+    TOGGLE_BUTTON = AgentDashboardSelectors.TOGGLE_BUTTON
+    CAMPAIGN_DROPDOWN = "#campaign button:has-text('Seleccionar')"
+    CAMPAIGN_OPTION = "p:has-text('PruebasQA Hija 1')"
+    CHANNEL_DROPDOWN = "button:has-text('Seleccionar')"
+    ATTACH_CONTACTS_BUTTON = "button:has-text('Adjuntar lista de contactos')"
+    SELECT_FILE_TEXT = "text=Selecciona un archivo"
+    SAVE_BUTTON = "button:has-text('Guardar')"
+    TEMPLATE_DROPDOWN = "button:has-text('Seleccionar...')"
+    TEMPLATE_SEARCH_INPUT = "input[placeholder='Buscar...']"
+    TEMPLATE_OPTION = "button:has-text('bienvenida_rapida_hija1 -')"
+
+    # Role names and texts of the wizard (get_by_role / get_by_text)
+    DIALOG = "div[role='dialog']"
+    SECTIONS = "#scrollbar"
+    SAVE_TEXT = "Guardar"
+    DROPDOWN_BUTTON_NAME = "Seleccionar..."
+    ATTACH_FILE_BUTTON_NAME = "Adjunta un archivo"
+    ATTACHMENT_URL_TEXT = "escribe una URL"
+    SEND_BUTTON_NAME = "ENVIAR OUTBOUND"
+    SUCCESS_BUTTON_NAME = "Entendido"
+    TOAST_CLOSE_BUTTON_NAME = "Cerrar"
+
+    @staticmethod
+    def option_selector(name: str, tag: str = "button") -> str:
+        return f"{tag}:has-text('{name}')"
+
+    @staticmethod
+    def template_search_term(template_name: str) -> str:
+        """Text typed in the template search box, short enough for the frontend filter to match."""
+        if "documento_url" in template_name:
+            return "docu"
+        if "imagen_url" in template_name:
+            return "qa_imagen_url"
+        if "video_url" in template_name:
+            return "qa_video_url"
+        return "bien" if "bienvenida" in template_name else "qa"
@@ -1,14 +1,10 @@
 import pytest
 import time
-from config.config import Config
-from pages.login_page import LoginPage
-from pages.agent_dashboard_page import AgentDashboardPage
 from utils.email_sender import EmailSender
 from playwright.sync_api import expect
-import re
 
 @pytest.mark.email
-def test_receive_email(page):
+def test_receive_email(dashboard_page):
     # 1. Send Email
     email_sender = EmailSender()
     subject = f"Test Automation Email {time.time()}"
@@ -20,23 +16,8 @@ def test_receive_email(page):
     # Commented out to prevent failure if creds are missing during initial run
     # User needs to configure env vars first
     
-    # 2. Login
-    login_page = LoginPage(page)
-    dashboard_page = AgentDashboardPage(page)
-    
-    login_page.navigate(Config.BASE_URL)
-    login_page.login(Config.USERNAME, Config.PASSWORD)
-    
-    # Verify Dashboard & Handle Popup (matching test_agent_status.py)
-    try:
-        expect(page).to_have_url(re.compile(".*dashboard/agent"), timeout=30000)
-    except AssertionError:
-        if page.is_visible(login_page.ERROR_MESSAGE):
-            error_text = login_page.get_text(login_page.ERROR_MESSAGE)
-            raise AssertionError(f"Login failed with error: {error_text}")
-        raise
-
-    dashboard_page.handle_popup()
+    # 2. Dashboard already authenticated by the fixture (cached session)
+    page = dashboard_page.page
     
     # 3. Verify Email in Dashboard
     # Emails can take a minute or two to arrive and process.
@@ -69,20 +50,14 @@ def test_receive_email(page):
     print("Email content verified successfully!")
 
 @pytest.mark.email
-def test_chat_closure(page):
+def test_chat_closure(dashboard_page):
     # 1. Instantiate EmailSender to get the sender email address (for filtering)
     email_sender = EmailSender()
     # Note: We do NOT send a new email here. We rely on the email sent by the previous test (test_receive_email)
     # or any existing email from this sender. This makes the tests "complementary".
     
-    # 2. Login
-    login_page = LoginPage(page)
-    dashboard_page = AgentDashboardPage(page)
-    
-    login_page.navigate(Config.BASE_URL)
-    login_page.login(Config.USERNAME, Config.PASSWORD)
-    
-    dashboard_page.handle_popup()
+    # 2. Dashboard already authenticated by the fixture (cached session)
+    page = dashboard_page.page
     
     # 3. Find and Open Chat (Conditional)
     print(f"Checking for chat card from: {email_sender.sender_email}")
@@ -1,32 +1,175 @@
 import pytest
-from playwright.sync_api import sync_playwright
 from config.config import Config
-from pages.login_page import LoginPage
+from pages.login_page import LoginPage, LoginFailedError
+from pages.agent_dashboard_page import AgentDashboardPage
+from pages.outbound_page import OutboundPage
+from pages.outbound_flow import OutboundSendFlow
+from utils.browser_pool import BrowserPool
+from utils.session_cache import SessionCache
+from utils.account_pool import AccountPool
+from utils.health_probe import HealthProbe
+from utils.network_router import NetworkRouter
+from utils.timing import recorder, aggregate_steps
+from utils.duration_scheduler import DurationScheduling, load_durations
+from utils.trace_recorder import TraceRecorder
+from utils.resource_monitor import MONITOR_AVAILABLE, ResourceMonitor
+from utils.outbound_latency import collect_sends, aggregate_sends
+from dataclasses import asdict
 import os
+import warnings
+
+# Per-test user_properties collected from (possibly remote xdist) test reports
+_test_properties = {}
+_browser_isolation = "context"
+_worker_account = None
+_session = None
+_login_failures = 0
+_fail_fast_reason = None
+_environment_health = None
+_network_router = None
+_tracer = None
+_resources = None
+# xdist worker id -> CPU/RSS usage sent back by the worker when it shuts down
+_worker_resources = {}
 
 def pytest_addoption(parser):
-    parser.addoption("--env", action="store", default="pantera", help="Environment to run tests against: pantera, bugs, support-bugs, leones")
+    parser.addoption("--env", action="store", default="pantera", help="Environment to run tests against: pantera, bugs, support-bugs, leones, mock")
+    parser.addoption(
+        "--browser-isolation", action="store", default="context", choices=("process", "context"),
+        help="process: new Chromium per test (strict, for debugging). context: one Chromium per worker, new context per test"
+    )
+    parser.addoption(
+        "--browser-recycle-after", action="store", type=int, default=Config.BROWSER_RECYCLE_AFTER,
+        help="Relaunch the shared browser after N tests (0 = never). Only used with --browser-isolation=context"
+    )
+    parser.addoption(
+        "--max-login-failures", action="store", type=int, default=0,
+        help="Stop the run (keeping the results so far) after N tests failed to log in (0 = never)"
+    )
+    parser.addoption(
+        "--skip-health-check", action="store_true", default=False,
+        help="Do not probe the environment before running; by default every test is skipped when it is down"
+    )
+    parser.addoption(
+        "--duration-history", action="append", default=[],
+        help="History SQLite file, JSON report or directory of JSON reports (repeatable). "
+             "With -n and --dist=load, tests are scheduled longest first using their past durations"
+    )
 
-@pytest.fixture(scope="session", autouse=True)
-def configure_user(worker_id):
+def pytest_configure(config):
+    global _browser_isolation, _tracer, _resources
+    _browser_isolation = config.getoption("--browser-isolation")
+    is_controller = bool(getattr(config.option, "numprocesses", None)) and not hasattr(config, "workerinput")
+    # Nothing to measure on Windows without psutil
+    _resources = ResourceMonitor(children=not is_controller).start() if MONITOR_AVAILABLE else None
+    # --tracing and --screenshot come from pytest-playwright (its page/context fixtures are not used here)
+    tracing = config.getoption("--tracing")
+    _tracer = TraceRecorder(mode=tracing) if tracing != "off" else None
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_make_scheduler(config, log):
+    # Returning None keeps xdist's own scheduler (plain load when there is no history)
+    sources = config.getoption("--duration-history")
+    if config.getvalue("dist") != "load" or not sources:
+        return None
+    durations = load_durations(sources, config.getoption("--env"))
+    if not durations:
+        return None
+    return DurationScheduling(config, log, durations)
+
+def _check_environment(config):
+    """Pre-flight health verdict for --env, probed once per process (cached on disk for a short TTL)."""
+    global _environment_health
+    env = config.getoption("--env")
+    if config.getoption("--skip-health-check") or env not in Config.ENVIRONMENTS:
+        return None
+    if _environment_health is None:
+        _environment_health = HealthProbe().check_sync(env)
+    return _environment_health
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_sessionstart(session):
+    global _session
+    _session = session
+    # Probe on the controller before the xdist workers start, so they reuse the cached verdict
+    if not hasattr(session.config, "workerinput"):
+        _check_environment(session.config)
+
+def pytest_collection_modifyitems(config, items):
+    health = _check_environment(config)
+    if health and not health.ok:
+        # Fail in seconds instead of every test burning its login timeouts
+        skip = pytest.mark.skip(reason=health.verdict)
+        for item in items:
+            # Unit tests (tests/unit) do not touch the environment
+            if "browser_pool" in getattr(item, "fixturenames", ()):
+                item.add_marker(skip)
+
+def pytest_sessionfinish(session):
+    # Workers report their own process tree (driver + Chromium) to the controller
+    if _resources and hasattr(session.config, "workeroutput"):
+        session.config.workeroutput["resources"] = _resources.usage()
+
+def pytest_unconfigure(config):
+    if _resources:
+        _resources.stop()
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    resources = getattr(node, "workeroutput", {}).get("resources")
+    if resources:
+        _worker_resources[node.gateway.id] = resources
+
+def _stop_session(reason):
+    """Stops scheduling new tests; running tests finish and the reports are still written."""
+    global _fail_fast_reason
+    if _fail_fast_reason:
+        return
+    _fail_fast_reason = reason
+    print(f"Fail-fast: {reason}")
+    # Under xdist the controller loop is driven by the DSession plugin, not by the session
+    dsession = _session.config.pluginmanager.getplugin("dsession")
+    if dsession is not None:
+        dsession.shouldstop = reason
+    else:
+        _session.shouldstop = reason
+
+@pytest.fixture(scope="session")
+def account_pool(request):
+    # The same email exists in every environment: runs on different --env do not compete
+    return AccountPool(environment=request.config.getoption("--env"))
+
+@pytest.fixture(scope="session")
+def worker_account(account_pool, worker_id):
     # worker_id is 'master' (not distributed) or 'gw0', 'gw1', etc.
-    if worker_id.startswith("gw"):
-        try:
-            # Extract worker index (e.g., 'gw0' -> 0)
-            worker_index = int(worker_id.replace("gw", ""))
-            
-            # Select user based on index (modulo to wrap around if more workers than users)
-            user = Config.USERS[worker_index % len(Config.USERS)]
-            
-            # Update Config
-            Config.USERNAME = user["email"]
-            Config.PASSWORD = user["password"]
-            
-            print(f"Worker {worker_id} assigned to user: {Config.USERNAME}")
-        except Exception as e:
-            print(f"Error configuring user for worker {worker_id}: {e}")
+    # Each worker leases an exclusive agent account and returns it on teardown.
+    global _worker_account
+    account = account_pool.acquire(holder=worker_id)
+    _worker_account = account
+    print(f"Worker {worker_id} assigned to user: {account['email']}")
+    yield account
+    _worker_account = None
+    account_pool.release(account["email"], worker_id)
+
+@pytest.fixture(scope="function", autouse=True)
+def agent_account(request, account_pool, worker_id):
+    """
+    Agent account for the current test, also exposed as Config.USERNAME/PASSWORD.
+    Tests marked 'shared_account' can run on an account other workers also share,
+    so they do not need this worker to hold an exclusive lease.
+    """
+    shared_holder = None
+    if request.node.get_closest_marker("shared_account") and _worker_account is None:
+        shared_holder = f"{worker_id}:{request.node.nodeid}"
+        account = account_pool.acquire(holder=shared_holder, shared=True)
     else:
-        print(f"Running in master mode (no parallel), using default user: {Config.USERNAME}")
+        account = request.getfixturevalue("worker_account")
+
+    Config.USERNAME = account["email"]
+    Config.PASSWORD = account["password"]
+    yield account
+    if shared_holder:
+        account_pool.release(account["email"], shared_holder)
 
 @pytest.fixture(scope="session", autouse=True)
 def configure_env(request):
@@ -37,17 +180,31 @@ def configure_env(request):
         # Fallback or custom URL handling if needed
         pass
 
+@pytest.fixture(scope="session")
+def browser_pool(request):
+    # One Chromium per worker. In 'process' mode the pool recycles the browser
+    # after every test, which keeps the old strict isolation behaviour.
+    if request.config.getoption("--browser-isolation") == "process":
+        recycle_after = 1
+    else:
+        recycle_after = request.config.getoption("--browser-recycle-after")
+    global _network_router
+    _network_router = NetworkRouter()
+    pool = BrowserPool(recycle_after=recycle_after, router=_network_router, tracer=_tracer)
+    yield pool
+    pool.close()
+    _network_router = None
+
+def _acquire_context(request, browser_pool, **context_options):
+    context = browser_pool.acquire(**context_options)
+    request.node.user_properties.append(("browser_launch", browser_pool.last_launch_duration))
+    return context
+
 @pytest.fixture(scope="function")
-def browser_context():
-    # Strict Isolation: Launch a NEW browser process for EVERY test
-    with sync_playwright() as p:
-        browser = p.chromium.launch(
-            headless=Config.HEADLESS,
-            args=["--no-sandbox", "--disable-dev-shm-usage", "--disable-gpu", "--disable-setuid-sandbox"]
-        )
-        context = browser.new_context(viewport={"width": 1280, "height": 720}, locale="es-ES")
-        yield context
-        browser.close()
+def browser_context(request, browser_pool):
+    context = _acquire_context(request, browser_pool)
+    yield context
+    browser_pool.release(context)
 
 @pytest.fixture(scope="function")
 def page(browser_context):
@@ -59,13 +216,96 @@ def page(browser_context):
 def login_page(page):
     return LoginPage(page)
 
+@pytest.fixture(scope="session")
+def session_cache():
+    return SessionCache()
+
+def _open_authenticated_page(config, browser_pool, session_cache, account):
+    """
+    Opens a page logged in with the given agent account. The session is restored from the
+    storage-state cache; the UI login only runs when there is no valid entry or
+    the restored session was rejected by the app (expired token).
+    Returns (context, page, restored).
+    """
+    env = config.getoption("--env")
+    email, password = account["email"], account["password"]
+    state_path, meta = session_cache.load(env, email)
+    if state_path:
+        context = browser_pool.acquire(storage_state=state_path)
+        session_cache.restore_session_storage(context, meta)
+    else:
+        context = browser_pool.acquire()
+    page = context.new_page()
+    login_page = LoginPage(page)
+
+    restored = False
+    if state_path:
+        login_page.navigate(Config.dashboard_url())
+        restored = login_page.has_active_session()
+        if not restored:
+            print(f"Cached session for {email} rejected, logging in again")
+            session_cache.invalidate(env, email)
+
+    if not restored:
+        login_page.navigate(Config.BASE_URL)
+        login_page.login(email, password)
+        session_cache.save(page, env, email)
+    return context, page, restored
+
+@pytest.fixture(scope="function")
+def authenticated_page(request, browser_pool, session_cache, agent_account):
+    context, page, restored = _open_authenticated_page(request.config, browser_pool, session_cache, agent_account)
+    request.node.user_properties.append(("browser_launch", browser_pool.last_launch_duration))
+    request.node.user_properties.append(("session_restored", restored))
+    yield page
+    page.close()
+    browser_pool.release(context)
+
+@pytest.fixture(scope="function")
+def dashboard_page(authenticated_page):
+    dashboard_page = AgentDashboardPage(authenticated_page)
+    dashboard_page.handle_popup()
+    return dashboard_page
+
+@pytest.fixture(scope="function")
+def outbound_page(dashboard_page):
+    return OutboundPage(dashboard_page.page)
+
+@pytest.fixture(scope="session")
+def outbound_session(request, browser_pool, session_cache, worker_account):
+    # One authenticated page per worker shared by every outbound variant
+    if request.config.getoption("--browser-isolation") == "process":
+        # The pool never recycles a browser under an open context
+        warnings.warn(
+            "--browser-isolation=process does not apply to outbound_flow tests: the shared outbound page "
+            "keeps one Chromium per worker open until the session ends"
+        )
+    context, page, _ = _open_authenticated_page(request.config, browser_pool, session_cache, worker_account)
+    AgentDashboardPage(page).handle_popup()
+    yield OutboundSendFlow(page)
+    page.close()
+    browser_pool.release(context)
+
+@pytest.fixture(scope="function")
+def outbound_flow(outbound_session):
+    if outbound_session.page.is_closed():
+        pytest.fail("Shared outbound page was closed by a previous test")
+    return outbound_session
+
 @pytest.hookimpl(tryfirst=True, hookwrapper=True)
 def pytest_runtest_makereport(item, call):
     outcome = yield
     rep = outcome.get_result()
+
+    if rep.failed and call.excinfo and call.excinfo.errisinstance(LoginFailedError):
+        # Reported with the teardown user properties, see pytest_runtest_logreport
+        item.user_properties.append(("login_failed", True))
     
-    if rep.when == "call":
-        page = item.funcargs.get("page")
+    screenshot = item.config.getoption("--screenshot")
+    if rep.when == "call" and (screenshot == "on" or (screenshot == "only-on-failure" and rep.failed)):
+        page = item.funcargs.get("page") or item.funcargs.get("authenticated_page")
+        if not page and "outbound_flow" in item.funcargs:
+            page = item.funcargs["outbound_flow"].page
         if page:
             # Create a safe filename from nodeid
             safe_name = item.nodeid.replace("::", "_").replace("/", "_").replace(".py", "")
@@ -75,3 +315,109 @@ def pytest_runtest_makereport(item, call):
                 page.screenshot(path=screenshot_path)
             except Exception as e:
                 print(f"Failed to take screenshot: {e}")
+
+    # The trace chunk ends with the test body (or with a setup that prevented it from running)
+    if _tracer and (rep.when == "call" or (rep.when == "setup" and not rep.passed)):
+        traces = _tracer.end_test(failed=rep.failed)
+        if traces:
+            item.user_properties.append(("traces", [(path, os.path.getsize(path)) for path in traces]))
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    # Timeline origin is the start of setup, so fixture work (login, popups) is on it too
+    recorder.start_test(item.nodeid, os.environ.get("PYTEST_XDIST_WORKER", "master"), item.config.getoption("--env"))
+    if _tracer:
+        _tracer.begin_test(item.nodeid)
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_json_runtest_metadata(item, call):
+    # Per-test metadata in the JSON report (relayed from xdist workers with the report)
+    if call.when == "call" and "outbound_flow" in item.funcargs:
+        # Wizard step and send acknowledgement timings of the outbound sent by this test
+        env = item.config.getoption("--env")
+        return {"outbound": [dict(record, env=env) for record in item.funcargs["outbound_flow"].drain_metrics()]}
+    if call.when == "teardown":
+        return {"timeline": recorder.finish_test()}
+    return {}
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_teardown(item):
+    yield
+    # Popup strategies matched during this test, used to prune dead selector fallbacks
+    item.user_properties.append(("popup_matches", AgentDashboardPage.drain_popup_matches()))
+    if _network_router is not None:
+        item.user_properties.append(("network", _network_router.drain_metrics()))
+
+def pytest_runtest_logreport(report):
+    # The teardown report carries every user property recorded during the test.
+    # Under xdist this runs on the controller with the reports sent by the workers.
+    global _login_failures
+    if report.when == "teardown":
+        _test_properties[report.nodeid] = dict(report.user_properties)
+        # Counted once, on the controller (this hook also runs inside every xdist worker)
+        is_worker = hasattr(_session.config, "workerinput")
+        if not is_worker and _test_properties[report.nodeid].get("login_failed"):
+            _login_failures += 1
+            max_login_failures = _session.config.getoption("--max-login-failures")
+            if max_login_failures and _login_failures >= max_login_failures:
+                _stop_session(f"{_login_failures} login failures, environment considered down")
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_json_modifyreport(json_report):
+    launches = [
+        props["browser_launch"] for props in _test_properties.values() if "browser_launch" in props
+    ]
+    paid = [duration for duration in launches if duration > 0]
+    reused = len(launches) - len(paid)
+    average_launch = sum(paid) / len(paid) if paid else 0
+    json_report["browser_pool"] = {
+        "isolation": _browser_isolation,
+        "contexts": len(launches),
+        "launches": len(paid),
+        "launch_seconds": round(sum(paid), 3),
+        "average_launch_seconds": round(average_launch, 3),
+        # Every reused browser would have cost one more cold start in strict mode
+        "launch_seconds_saved": round(reused * average_launch, 3),
+    }
+
+    popup_strategies = {}
+    for props in _test_properties.values():
+        for strategy in props.get("popup_matches", []):
+            popup_strategies[strategy] = popup_strategies.get(strategy, 0) + 1
+    json_report["popup_strategies"] = popup_strategies
+
+    network = {"blocked": 0, "hits": 0, "misses": 0, "stored": 0, "bytes_from_cache": 0}
+    for props in _test_properties.values():
+        for key, value in props.get("network", {}).items():
+            network[key] = network.get(key, 0) + value
+    lookups = network["hits"] + network["misses"]
+    network["hit_ratio"] = round(network["hits"] / lookups, 3) if lookups else 0
+    json_report["network_cache"] = network
+
+    traces = [trace for props in _test_properties.values() for trace in props.get("traces", [])]
+    json_report["traces"] = {
+        "mode": _session.config.getoption("--tracing") if _session else "off",
+        "files": [path for path, _ in traces],
+        "bytes": sum(size for _, size in traces),
+    }
+
+    timelines = [test.get("metadata", {}).get("timeline", {}) for test in json_report.get("tests", [])]
+    json_report["step_timings"] = aggregate_steps(timelines)
+    json_report["outbound_latency"] = aggregate_sends(collect_sends(json_report.get("tests", [])))
+
+    dsession = _session.config.pluginmanager.getplugin("dsession") if _session else None
+    scheduler = getattr(dsession, "sched", None)
+    if isinstance(scheduler, DurationScheduling):
+        json_report["scheduling"] = scheduler.summary()
+    elif scheduler is not None:
+        json_report["scheduling"] = {"strategy": _session.config.getvalue("dist")}
+
+    controller = _resources.usage() if _resources else {}
+    if _worker_resources:
+        json_report["resources"] = {"controller": controller, "workers": dict(sorted(_worker_resources.items()))}
+    else:
+        json_report["resources"] = {"workers": {"master": controller}}
+
+    json_report["fail_fast"] = {"reason": _fail_fast_reason, "login_failures": _login_failures}
+    if _environment_health:
+        json_report["environment_health"] = asdict(_environment_health)
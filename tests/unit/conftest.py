@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(scope="function", autouse=True)
+def agent_account():
+    # Overrides the autouse fixture of tests/conftest.py: unit tests need no agent account lease
+    return None
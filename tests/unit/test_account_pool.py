@@ -0,0 +1,114 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+import pytest
+from utils.account_pool import AccountPool
+
+ACCOUNTS = [
+    {"email": "agent1@mock.local", "password": "x"},
+    {"email": "agent2@mock.local", "password": "x"},
+]
+
+
+@pytest.fixture
+def lease_file(tmp_path):
+    # Stands in for Config.ACCOUNT_LEASE_FILE, so the host's real leases are never touched
+    return str(tmp_path / "leases.json")
+
+
+def _pool(lease_file, accounts=ACCOUNTS, environment="pantera"):
+    return AccountPool(accounts=accounts, lease_file=lease_file, timeout=0, poll_interval=0.01, environment=environment)
+
+
+def _dead_pid() -> int:
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def _write_leases(lease_file, leases: dict):
+    with open(lease_file, "w") as f:
+        json.dump({"leases": leases}, f)
+
+
+def test_exclusive_leases_take_distinct_accounts(lease_file):
+    pool = _pool(lease_file)
+    first = pool.acquire("gw0")
+    second = pool.acquire("gw1")
+    assert first["email"] != second["email"]
+
+    with pytest.raises(TimeoutError):
+        pool.acquire("gw2")
+
+    pool.release(first["email"], "gw0")
+    assert pool.acquire("gw2")["email"] == first["email"]
+
+
+def test_shared_leases_coexist_but_not_with_exclusive(lease_file):
+    pool = _pool(lease_file)
+    exclusive = pool.acquire("gw0")
+    shared = [pool.acquire(f"gw1:test_{index}", shared=True) for index in range(3)]
+    # Every shared holder lands on the account the exclusive lease left free
+    assert {account["email"] for account in shared} == {ACCOUNTS[1]["email"]}
+    assert exclusive["email"] == ACCOUNTS[0]["email"]
+
+    with pytest.raises(TimeoutError):
+        pool.acquire("gw2")
+
+
+def test_leases_of_dead_processes_are_reclaimed(lease_file):
+    host = socket.gethostname()
+    _write_leases(lease_file, {
+        f"pantera:{ACCOUNTS[0]['email']}": [{"holder": "gw0", "mode": "exclusive", "pid": _dead_pid(), "host": host, "since": 0}],
+        f"pantera:{ACCOUNTS[1]['email']}": [{"holder": "gw1", "mode": "exclusive", "pid": os.getpid(), "host": host, "since": 0}],
+    })
+
+    account = _pool(lease_file).acquire("gw2")
+    assert account["email"] == ACCOUNTS[0]["email"]
+
+    with open(lease_file) as f:
+        leases = json.load(f)["leases"]
+    assert [lease["holder"] for lease in leases[f"pantera:{ACCOUNTS[0]['email']}"]] == ["gw2"]
+    assert [lease["holder"] for lease in leases[f"pantera:{ACCOUNTS[1]['email']}"]] == ["gw1"]
+
+
+def test_leases_of_other_hosts_are_trusted(lease_file):
+    _write_leases(lease_file, {
+        f"pantera:{account['email']}": [{"holder": "gw0", "mode": "exclusive", "pid": _dead_pid(), "host": "other-host", "since": 0}]
+        for account in ACCOUNTS
+    })
+
+    with pytest.raises(TimeoutError):
+        _pool(lease_file).acquire("gw1")
+
+
+def test_release_only_drops_the_holder_lease(lease_file):
+    pool = _pool(lease_file, ACCOUNTS[:1])
+    email = ACCOUNTS[0]["email"]
+    for holder in ("gw0:a", "gw0:b"):
+        pool.acquire(holder, shared=True)
+    pool.release(email, "gw0:a")
+
+    with open(lease_file) as f:
+        leases = json.load(f)["leases"]
+    assert [lease["holder"] for lease in leases[f"pantera:{email}"]] == ["gw0:b"]
+
+
+def test_environments_lease_the_same_email_at_once(lease_file):
+    pantera = _pool(lease_file, ACCOUNTS[:1], environment="pantera")
+    bugs = _pool(lease_file, ACCOUNTS[:1], environment="bugs")
+    email = ACCOUNTS[0]["email"]
+
+    assert pantera.acquire("gw0")["email"] == email
+    assert bugs.acquire("gw0")["email"] == email
+    # Each environment's account is still exclusive within that environment
+    with pytest.raises(TimeoutError):
+        pantera.acquire("gw1")
+
+    bugs.release(email, "gw0")
+    with open(lease_file) as f:
+        leases = json.load(f)["leases"]
+    assert [lease["holder"] for lease in leases[f"pantera:{email}"]] == ["gw0"]
+    assert leases[f"bugs:{email}"] == []
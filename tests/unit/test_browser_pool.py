@@ -0,0 +1,72 @@
+from types import SimpleNamespace
+from utils.browser_pool import BrowserPool
+
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+
+    def is_connected(self):
+        return self.connected
+
+    def new_context(self, **options):
+        return FakeContext(self)
+
+    def close(self):
+        self.connected = False
+
+
+class FakeChromium:
+    def __init__(self):
+        self.launched = []
+
+    def launch(self, **options):
+        self.launched.append(FakeBrowser())
+        return self.launched[-1]
+
+
+def _pool(recycle_after: int):
+    pool = BrowserPool(headless=True, recycle_after=recycle_after)
+    chromium = FakeChromium()
+    pool._playwright = SimpleNamespace(chromium=chromium)
+    return pool, chromium
+
+
+def test_process_isolation_launches_a_browser_per_test():
+    pool, chromium = _pool(recycle_after=1)
+    for _ in range(3):
+        pool.release(pool.acquire())
+    assert len(chromium.launched) == 3
+
+
+def test_recycle_waits_for_the_open_contexts():
+    pool, chromium = _pool(recycle_after=1)
+    shared = pool.acquire()
+    pool.release(pool.acquire())
+    # The long-lived context is still open on the first browser
+    assert len(chromium.launched) == 1 and chromium.launched[0].connected
+
+    pool.release(shared)
+    assert not chromium.launched[0].connected
+    pool.acquire()
+    assert len(chromium.launched) == 2
+
+
+def test_contexts_of_a_crashed_browser_do_not_defer_recycling():
+    pool, chromium = _pool(recycle_after=1)
+    pool.acquire()  # long-lived, never released
+    chromium.launched[0].connected = False
+
+    # Relaunched after the crash; the dead context no longer counts as open
+    pool.release(pool.acquire())
+    pool.release(pool.acquire())
+    assert len(chromium.launched) == 3
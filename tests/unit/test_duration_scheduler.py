@@ -0,0 +1,144 @@
+from types import SimpleNamespace
+import pytest
+from utils.duration_scheduler import DurationScheduling, predict_makespan
+
+
+class FakeConfig:
+    """The two options LoadScheduling reads from the pytest config."""
+
+    def __init__(self, workers: int):
+        self.workers = workers
+
+    def getvalue(self, name):
+        assert name == "tx"
+        return [f"{self.workers}*popen"]
+
+    def getoption(self, name):
+        assert name == "maxschedchunk"
+        return None
+
+
+class FakeNode:
+    """Stands in for xdist's WorkerController: records what the scheduler sends it."""
+
+    def __init__(self, name: str):
+        self.gateway = SimpleNamespace(id=name)
+        self.shutting_down = False
+        self.sent = []
+
+    def send_runtest_some(self, indices):
+        self.sent.extend(indices)
+
+    def shutdown(self):
+        self.shutting_down = True
+
+
+def _scheduler(durations: dict, workers: int, collection: list = None):
+    collection = collection or list(durations)
+    scheduler = DurationScheduling(FakeConfig(workers), durations=durations)
+    nodes = [FakeNode(f"gw{index}") for index in range(workers)]
+    for node in nodes:
+        scheduler.add_node(node)
+        scheduler.add_node_collection(node, collection)
+    scheduler.schedule()
+    return scheduler, nodes
+
+
+def _names(scheduler, indices) -> list:
+    return [scheduler.collection[index] for index in indices]
+
+
+def _simulate(scheduler, nodes, durations: dict) -> float:
+    """Runs the tests as the workers would: in the order sent, completing the earliest one first."""
+    clock = {node: 0.0 for node in nodes}
+    done = {node: 0 for node in nodes}
+    while True:
+        running = [node for node in nodes if done[node] < len(node.sent)]
+        if not running:
+            return max(clock.values())
+        node = min(running, key=lambda node: clock[node] + durations[scheduler.collection[node.sent[done[node]]]])
+        index = node.sent[done[node]]
+        clock[node] += durations[scheduler.collection[index]]
+        done[node] += 1
+        scheduler.mark_test_complete(node, index, durations[scheduler.collection[index]])
+
+
+def test_prefill_deals_two_tests_per_worker_in_snake_order():
+    durations = {f"test_{seconds}": seconds for seconds in range(1, 7)}
+    scheduler, (first, second) = _scheduler(durations, workers=2)
+
+    # Longest and shortest of the first batch share a worker
+    assert _names(scheduler, first.sent) == ["test_6", "test_3"]
+    assert _names(scheduler, second.sent) == ["test_5", "test_4"]
+    assert _names(scheduler, scheduler.pending) == ["test_2", "test_1"]
+    assert not first.shutting_down and not second.shutting_down
+
+
+def test_next_test_only_when_a_worker_finishes_one():
+    durations = {f"test_{seconds}": seconds for seconds in range(1, 7)}
+    scheduler, (first, second) = _scheduler(durations, workers=2)
+
+    scheduler.mark_test_complete(second, second.sent[0])
+    assert _names(scheduler, second.sent) == ["test_5", "test_4", "test_2"]
+    assert len(scheduler.node2pending[second]) == 2
+
+    scheduler.mark_test_complete(first, first.sent[0])
+    assert _names(scheduler, first.sent) == ["test_6", "test_3", "test_1"]
+    assert scheduler.pending == []
+
+
+def test_workers_shut_down_when_the_queue_drains():
+    durations = {f"test_{seconds}": seconds for seconds in range(1, 6)}
+    scheduler, (first, second) = _scheduler(durations, workers=2)
+    assert _names(scheduler, scheduler.pending) == ["test_1"]
+
+    scheduler.mark_test_complete(first, first.sent[0])
+    assert not first.shutting_down
+    # Nothing left to hand out: the next worker that finishes a test is told to stop
+    scheduler.mark_test_complete(second, second.sent[0])
+    assert second.shutting_down
+    scheduler.mark_test_complete(first, first.sent[1])
+    assert first.shutting_down
+    assert scheduler.tests_finished
+
+
+def test_fewer_tests_than_two_per_worker():
+    durations = {"test_long": 10, "test_medium": 5, "test_short": 1}
+    scheduler, nodes = _scheduler(durations, workers=3)
+
+    assert [_names(scheduler, node.sent) for node in nodes] == [["test_long"], ["test_medium"], ["test_short"]]
+    assert scheduler.pending == []
+    assert all(node.shutting_down for node in nodes)
+
+
+def test_tests_without_history_are_predicted_at_the_median():
+    durations = {"test_a": 2, "test_b": 4, "test_c": 30}
+    collection = ["test_new", "test_a", "test_b", "test_c"]
+    scheduler, _ = _scheduler(durations, workers=1, collection=collection)
+
+    assert scheduler.predicted["test_new"] == 4
+    # Stable sort: the new test keeps its collection position ahead of the equal test_b
+    assert _names(scheduler, scheduler.node2pending[scheduler.nodes[0]] + scheduler.pending) == [
+        "test_c", "test_new", "test_b", "test_a",
+    ]
+    assert scheduler.summary()["tests_with_history"] == 3
+
+
+def test_predict_makespan():
+    assert predict_makespan([], 2) == 0
+    assert predict_makespan([6, 5, 4, 3, 2, 1], 2) == 11
+    assert predict_makespan([5, 1, 1], 2) == 5
+    assert predict_makespan([3, 2, 1], 1) == 6
+
+
+@pytest.mark.parametrize("workers", [1, 2, 3, 4])
+def test_predicted_makespan_matches_the_dispatch(workers):
+    durations = {f"test_{index}": seconds for index, seconds in enumerate([7, 1, 3, 12, 2, 2, 9, 4, 1, 5, 6, 8, 3])}
+    scheduler, nodes = _scheduler(durations, workers)
+
+    order = sorted(durations.values(), reverse=True)
+    assert _simulate(scheduler, nodes, durations) == predict_makespan(order, workers)
+    assert all(node.shutting_down for node in nodes)
+    summary = scheduler.summary()
+    assert summary["predicted_makespan"] == predict_makespan(order, workers)
+    assert summary["lower_bound"] <= summary["predicted_makespan"]
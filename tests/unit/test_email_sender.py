@@ -0,0 +1,59 @@
+from utils.email_sender import EmailSender
+from utils.smtp_stub import SmtpStub
+
+SENDER = "qa@example.com"
+TO = "qapantera@example.com"
+
+
+def _sender(port, **options) -> EmailSender:
+    return EmailSender("127.0.0.1", port, SENDER, starttls=False, rate_limit=0, **options)
+
+
+def _messages(count: int) -> list:
+    return [(f"Load Test Email {index}", "Sent by the unit tests.", TO) for index in range(count)]
+
+
+def test_batch_reuses_the_pooled_connections():
+    with SmtpStub.on_free_port() as stub, _sender(stub.port, pool_size=4) as sender:
+        results = sender.send_batch(_messages(40))
+
+    assert all(result.ok for result in results)
+    assert len(stub.messages) == 40
+    assert sender.connections_opened <= 4
+    assert stub.connections == sender.connections_opened
+
+
+def test_connections_are_replaced_after_max_per_connection():
+    with SmtpStub.on_free_port() as stub, _sender(stub.port, pool_size=1, max_per_connection=5) as sender:
+        sender.send_batch(_messages(12))
+
+    assert len(stub.messages) == 12
+    assert sender.connections_opened == 3
+
+
+def test_retry_opens_a_new_connection_after_a_server_restart():
+    stub = SmtpStub.on_free_port()
+    port = stub.port
+    with _sender(port, pool_size=4) as sender:
+        with stub:
+            sender.send_batch(_messages(40))
+        opened = sender.connections_opened
+
+        # Every idle pooled connection now points at a server that is gone
+        with SmtpStub(port=port) as restarted:
+            assert sender.send_email("After restart", "Sent by the unit tests.", TO)
+            # The send found a dead idle connection and retried on a new one, not on another dead one
+            assert sender.connections_opened == opened + 1
+            results = sender.send_batch(_messages(8))
+
+    assert all(result.ok for result in results)
+    assert len(restarted.messages) == 9
+
+
+def test_batch_reports_failures_without_raising():
+    # A stub that is never started: nothing listens on its port
+    with _sender(SmtpStub.on_free_port().port, pool_size=2) as sender:
+        results = sender.send_batch(_messages(3))
+
+    assert [result.ok for result in results] == [False, False, False]
+    assert all(result.error for result in results)
@@ -0,0 +1,182 @@
+import base64
+import gzip
+import hashlib
+import os
+import pytest
+from google.api_core.exceptions import Forbidden, ServiceUnavailable
+from google.resumable_media import DataCorruption
+from utils.gcs_uploader import DEDUPE_MIN_BYTES, IMMUTABLE_CACHE_CONTROL, ArtifactUploader
+
+
+class FakeBlob:
+    def __init__(self, bucket, name):
+        self.bucket = bucket
+        self.name = name
+        self.content_encoding = None
+        self.cache_control = None
+        self.content_type = None
+        self.md5_hash = None
+        self.data = None
+
+    def upload_from_string(self, data, content_type=None, checksum=None, retry=None):
+        self.bucket.upload_calls.append(self.name)
+        failures = self.bucket.failures.get(self.name)
+        if failures:
+            raise failures.pop(0)
+        self.data = data
+        self.content_type = content_type
+        # What GCS stores: base64 MD5 of the bytes as sent
+        self.md5_hash = base64.b64encode(hashlib.md5(data).digest()).decode("ascii")
+        self.bucket.stored[self.name] = self
+
+
+class FakeBucket:
+    """In-memory bucket: stored objects, calls made, and errors to raise on the next uploads of a blob."""
+
+    def __init__(self):
+        self.stored = {}
+        self.upload_calls = []
+        self.lookups = []
+        self.failures = {}
+
+    def blob(self, name):
+        return FakeBlob(self, name)
+
+    def get_blob(self, name, retry=None):
+        self.lookups.append(name)
+        return self.stored.get(name)
+
+
+class FakeClient:
+    def __init__(self):
+        self.buckets = {}
+
+    def bucket(self, name):
+        return self.buckets.setdefault(name, FakeBucket())
+
+
+@pytest.fixture
+def client():
+    return FakeClient()
+
+
+def _uploader(client, attempts=3) -> ArtifactUploader:
+    return ArtifactUploader("reports", client=client, workers=4, attempts=attempts, backoff=0)
+
+
+def _file(tmp_path, name, data: bytes) -> str:
+    path = os.path.join(tmp_path, name)
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+
+def test_text_files_are_gzipped_with_content_encoding(client, tmp_path):
+    html = b"<html>" + b"<div class='test'>ok</div>" * 500 + b"</html>"
+    uploader = _uploader(client)
+    assert uploader.upload_file(_file(tmp_path, "index.html", html), "pantera/agente/index.html")
+
+    blob = client.bucket("reports").stored["pantera/agente/index.html"]
+    assert blob.content_encoding == "gzip"
+    assert blob.content_type == "text/html; charset=utf-8"
+    assert gzip.decompress(blob.data) == html
+    assert uploader.stats.bytes_sent == len(blob.data)
+    assert uploader.stats.bytes_saved == len(html) - len(blob.data)
+
+
+def test_binary_files_are_sent_as_is(client, tmp_path):
+    image = os.urandom(2048)
+    uploader = _uploader(client)
+    uploader.upload_file(_file(tmp_path, "shot.webp", image), "media/shot.webp", immutable=True)
+
+    blob = client.bucket("reports").stored["media/shot.webp"]
+    assert blob.data == image
+    assert blob.content_encoding is None
+    assert blob.content_type == "image/webp"
+    assert blob.cache_control == IMMUTABLE_CACHE_CONTROL
+
+
+def test_unchanged_objects_are_skipped_by_md5(client, tmp_path):
+    bucket = client.bucket("reports")
+    image = _file(tmp_path, "shot.webp", os.urandom(2048))
+    large = _file(tmp_path, "trace.zip", os.urandom(DEDUPE_MIN_BYTES))
+    small = _file(tmp_path, "report.json", b'{"tests": []}')
+    for path, name, immutable in ((image, "media/shot.webp", True), (large, "run/trace.zip", False), (small, "run/report.json", False)):
+        _uploader(client).upload_file(path, name, immutable)
+
+    # A later run (new uploader, nothing in _sent) publishes the same files again
+    uploader = _uploader(client)
+    assert not uploader.upload_file(image, "media/shot.webp", immutable=True)
+    assert not uploader.upload_file(large, "run/trace.zip")
+    # Small mutable files are re-sent without a lookup
+    assert uploader.upload_file(small, "run/report.json")
+    assert bucket.lookups[-2:] == ["media/shot.webp", "run/trace.zip"]
+    assert "run/report.json" not in bucket.lookups
+    assert uploader.stats.skipped == 2
+    assert uploader.stats.uploaded == 1
+
+    # Same name, different content: uploaded again
+    _file(tmp_path, "trace.zip", os.urandom(DEDUPE_MIN_BYTES))
+    assert uploader.upload_file(large, "run/trace.zip")
+
+
+def test_same_bytes_with_another_encoding_are_uploaded(client, tmp_path):
+    bucket = client.bucket("reports")
+    path = _file(tmp_path, "app.js", b"console.log('report');" * 100)
+    _uploader(client).upload_file(path, "assets/app.js", immutable=True)
+    # Stored without Content-Encoding by an older publisher: must be replaced
+    bucket.stored["assets/app.js"].content_encoding = None
+    assert _uploader(client).upload_file(path, "assets/app.js", immutable=True)
+    assert bucket.lookups == ["assets/app.js", "assets/app.js"]
+
+
+@pytest.mark.parametrize("error", [
+    ServiceUnavailable("503 backend unavailable"),
+    DataCorruption(None, "Checksum mismatch while uploading"),
+])
+def test_transient_errors_are_retried(client, tmp_path, error):
+    bucket = client.bucket("reports")
+    bucket.failures["run/report.json"] = [error, error]
+    uploader = _uploader(client, attempts=3)
+
+    assert uploader.upload_file(_file(tmp_path, "report.json", b'{"tests": []}'), "run/report.json")
+    assert bucket.upload_calls == ["run/report.json"] * 3
+    assert uploader.stats.retries == 2
+    assert "run/report.json" in bucket.stored
+
+
+def test_retries_are_bounded_and_permanent_errors_are_not_retried(client, tmp_path):
+    bucket = client.bucket("reports")
+    path = _file(tmp_path, "report.json", b'{"tests": []}')
+    bucket.failures["a.json"] = [ServiceUnavailable("503")] * 3
+    with pytest.raises(ServiceUnavailable):
+        _uploader(client, attempts=3).upload_file(path, "a.json")
+    assert bucket.upload_calls.count("a.json") == 3
+
+    bucket.failures["b.json"] = [Forbidden("403")]
+    with pytest.raises(Forbidden):
+        _uploader(client, attempts=3).upload_file(path, "b.json")
+    assert bucket.upload_calls.count("b.json") == 1
+
+
+def test_retried_upload_many_resumes_where_it_failed(client, tmp_path):
+    bucket = client.bucket("reports")
+    files = [
+        (_file(tmp_path, f"shot{index}.webp", os.urandom(1024)), f"media/shot{index}.webp", False)
+        for index in range(5)
+    ]
+    bucket.failures["media/shot3.webp"] = [Forbidden("403")]
+    uploader = _uploader(client)
+
+    with pytest.raises(Forbidden):
+        uploader.upload_many(files)
+    # Every other file was still sent
+    assert sorted(bucket.stored) == [name for _, name, _ in files if name != "media/shot3.webp"]
+
+    bucket.upload_calls.clear()
+    stats = uploader.upload_many(files)
+    # Only the failed file goes out again; the rest are skipped from _sent, without a lookup
+    assert bucket.upload_calls == ["media/shot3.webp"]
+    assert bucket.lookups == []
+    assert stats.uploaded == 5
+    assert stats.skipped == 4
@@ -0,0 +1,174 @@
+import pytest
+from google.api_core.exceptions import NotFound, PreconditionFailed
+from utils.history import HistoryStore, sync_history
+
+LOGIN = "tests/agente/test_login_agente.py::test_valid_login"
+STATUS = "tests/agente/test_agent_status.py::test_agent_status_break"
+
+
+def _report(durations: dict, created: float, outcomes: dict = None) -> dict:
+    """Minimal pytest-json-report result: the durations go to the call phase."""
+    outcomes = outcomes or {}
+    tests = [
+        {"nodeid": nodeid, "outcome": outcomes.get(nodeid, "passed"), "call": {"duration": duration}}
+        for nodeid, duration in durations.items()
+    ]
+    passed = sum(1 for test in tests if test["outcome"] == "passed")
+    return {
+        "created": created,
+        "duration": sum(durations.values()),
+        "summary": {"passed": passed, "failed": len(tests) - passed, "total": len(tests)},
+        "tests": tests,
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    with HistoryStore(str(tmp_path / "history.sqlite")) as store:
+        yield store
+
+
+def _record_baseline(store, durations: list, environment="pantera", profile="agente"):
+    for index, (login, status) in enumerate(durations):
+        store.record_run(f"base-{index}", environment, profile, _report({LOGIN: login, STATUS: status}, created=index))
+
+
+def test_analyze_flags_tests_slower_than_the_baseline_p50(store):
+    _record_baseline(store, [(10, 30), (11, 31), (12, 29), (13, 30), (40, 30)])
+    store.record_run("run", "pantera", "agente", _report({LOGIN: 16, STATUS: 33}, created=100))
+
+    analysis = store.analyze("run", threshold=0.2)
+    tests = {test["nodeid"]: test for test in analysis["tests"]}
+    assert analysis["baseline_runs"] == 5
+    assert analysis["regressions"] == 1
+
+    # Nearest-rank percentiles of [10, 11, 12, 13, 40]
+    assert tests[LOGIN]["p50"] == 12
+    assert tests[LOGIN]["p95"] == 40
+    assert tests[LOGIN]["change"] == pytest.approx(0.333, abs=0.001)
+    assert tests[LOGIN]["regression"]
+    # +10% is within the threshold
+    assert tests[STATUS]["p50"] == 30
+    assert not tests[STATUS]["regression"]
+
+
+def test_analyze_needs_min_samples_and_a_passing_run(store):
+    _record_baseline(store, [(10, 30), (10, 30)])
+    store.record_run("run", "pantera", "agente", _report({LOGIN: 50, STATUS: 30}, created=100))
+    assert store.analyze("run")["regressions"] == 0
+
+    store.record_run("base-2", "pantera", "agente", _report({LOGIN: 10, STATUS: 30}, created=2))
+    store.record_run("failed", "pantera", "agente", _report({LOGIN: 50, STATUS: 30}, created=101, outcomes={LOGIN: "failed"}))
+    assert store.analyze("run")["regressions"] == 1
+    # A failed test is never a duration regression, and failed results are not part of a baseline
+    assert store.analyze("failed")["regressions"] == 0
+
+
+def test_analyze_baseline_is_windowed_and_per_suite(store):
+    _record_baseline(store, [(100, 30)] * 3 + [(10, 30)] * 3)
+    for run_id, environment, profile in (("other", "bugs", "agente"), ("supervisor", "pantera", "supervisor")):
+        store.record_run(run_id, environment, profile, _report({LOGIN: 1, STATUS: 1}, created=50))
+    store.record_run("run", "pantera", "agente", _report({LOGIN: 20, STATUS: 30}, created=100))
+
+    analysis = store.analyze("run", window=3)
+    login = next(test for test in analysis["tests"] if test["nodeid"] == LOGIN)
+    # Only the 3 latest runs of pantera/agente: the older 100s runs and the other suites are out
+    assert analysis["baseline_runs"] == 3
+    assert login["p50"] == 10
+    assert login["regression"]
+    assert [run["run_id"] for run in analysis["runs"]] == ["base-3", "base-4", "base-5", "run"]
+
+
+def test_record_run_replaces_the_same_run_id(store):
+    store.record_run("run", "pantera", "agente", _report({LOGIN: 10, STATUS: 30}, created=1))
+    store.record_run("run", "pantera", "agente", _report({LOGIN: 12}, created=1))
+    assert store.test_durations("pantera") == {LOGIN: 12}
+
+
+class FakeBlob:
+    """In-memory GCS blob honouring if_generation_match like the real service."""
+
+    def __init__(self):
+        self.data = None
+        self.generation = None
+        self.uploads = 0
+        # Called once before the next upload: simulates another run updating the blob first
+        self.before_upload = None
+
+    def reload(self):
+        if self.data is None:
+            raise NotFound("history.sqlite")
+
+    def download_to_filename(self, path):
+        with open(path, "wb") as f:
+            f.write(self.data)
+
+    def upload_from_filename(self, path, if_generation_match=None):
+        if self.before_upload:
+            hook, self.before_upload = self.before_upload, None
+            hook()
+        if if_generation_match != (self.generation or 0):
+            raise PreconditionFailed("generation mismatch")
+        with open(path, "rb") as f:
+            self.data = f.read()
+        self.generation = (self.generation or 0) + 1
+        self.uploads += 1
+
+
+class FakeBucket:
+    def __init__(self):
+        self.blobs = {}
+
+    def blob(self, name):
+        return self.blobs.setdefault(name, FakeBlob())
+
+
+def _run_ids(blob, tmp_path) -> list:
+    path = str(tmp_path / "check.sqlite")
+    blob.download_to_filename(path)
+    with HistoryStore(path) as store:
+        return [row[0] for row in store.conn.execute("SELECT run_id FROM runs ORDER BY started_at")]
+
+
+def test_sync_history_creates_the_blob(tmp_path):
+    bucket = FakeBucket()
+    analysis = sync_history(bucket, "pantera/history.sqlite", str(tmp_path / "local.sqlite"), "run-1",
+                            "pantera", "agente", _report({LOGIN: 10}, created=1))
+    assert analysis["baseline_runs"] == 0
+    assert bucket.blob("pantera/history.sqlite").generation == 1
+
+
+def test_sync_history_retries_on_a_concurrent_update(tmp_path):
+    bucket = FakeBucket()
+    blob = bucket.blob("pantera/history.sqlite")
+    sync_history(bucket, "pantera/history.sqlite", str(tmp_path / "a.sqlite"), "run-1",
+                 "pantera", "agente", _report({LOGIN: 10}, created=1))
+
+    # run-2 uploads between run-3's download and upload: run-3 must start over from run-2's copy
+    blob.before_upload = lambda: sync_history(
+        bucket, "pantera/history.sqlite", str(tmp_path / "b.sqlite"), "run-2",
+        "pantera", "agente", _report({LOGIN: 11}, created=2),
+    )
+    analysis = sync_history(bucket, "pantera/history.sqlite", str(tmp_path / "c.sqlite"), "run-3",
+                            "pantera", "agente", _report({LOGIN: 12}, created=3))
+
+    assert _run_ids(blob, tmp_path) == ["run-1", "run-2", "run-3"]
+    assert blob.uploads == 3
+    assert analysis["baseline_runs"] == 2
+
+
+def test_sync_history_gives_up_after_the_attempts(tmp_path):
+    bucket = FakeBucket()
+    blob = bucket.blob("pantera/history.sqlite")
+    sync_history(bucket, "pantera/history.sqlite", str(tmp_path / "a.sqlite"), "run-1",
+                 "pantera", "agente", _report({LOGIN: 10}, created=1))
+
+    def always_conflict(path, if_generation_match=None):
+        raise PreconditionFailed("generation mismatch")
+
+    blob.upload_from_filename = always_conflict
+    analysis = sync_history(bucket, "pantera/history.sqlite", str(tmp_path / "b.sqlite"), "run-2",
+                            "pantera", "agente", _report({LOGIN: 11}, created=2), attempts=2)
+    # The analysis is still returned; the shared history keeps only run-1
+    assert analysis["baseline_runs"] == 1
+    assert _run_ids(blob, tmp_path) == ["run-1"]
@@ -0,0 +1,109 @@
+import os
+from types import SimpleNamespace
+import pytest
+from utils.network_router import NetworkRouter
+
+TRACKERS = [
+    "https://www.googletagmanager.com/gtm.js?id=GTM-ABC123",
+    "https://connect.facebook.net/en_US/fbevents.js",
+    "https://static.hotjar.com/c/hotjar-1.js",
+    "https://www.google-analytics.com/analytics.js",
+]
+BUNDLE = "https://app.chattigo.com/static/main.3f2a9c1b7d.js"
+
+
+class FakeResponse:
+    def __init__(self, body: bytes):
+        self.status = 200
+        self.headers = {"content-type": "application/javascript", "cache-control": "max-age=31536000"}
+        self._body = body
+
+    def body(self):
+        return self._body
+
+
+class FakeRoute:
+    """Records what the handler did with the request instead of sending it anywhere."""
+
+    def __init__(self, url: str, method: str = "GET"):
+        self.request = SimpleNamespace(url=url, method=method)
+        self.action = None
+        self.fetches = 0
+
+    def abort(self, error_code=None):
+        self.action = "abort"
+
+    def fallback(self):
+        self.action = "fallback"
+
+    def fetch(self):
+        self.fetches += 1
+        return FakeResponse(b"console.log('app');")
+
+    def fulfill(self, **kwargs):
+        self.action = "fulfill"
+
+
+class FakeContext:
+    """Dispatches like Playwright: the most recently registered matching route handles the request."""
+
+    def __init__(self):
+        self.routes = []
+
+    def route(self, pattern, handler):
+        self.routes.insert(0, (pattern, handler))
+
+    def request(self, url: str) -> FakeRoute:
+        route = FakeRoute(url)
+        for pattern, handler in self.routes:
+            if pattern.search(url):
+                handler(route)
+                break
+        return route
+
+
+@pytest.fixture
+def router(tmp_path):
+    return NetworkRouter(cache_dir=str(tmp_path), blocked_domains=["googletagmanager.com", "facebook.net",
+                                                                    "hotjar.com", "google-analytics.com"],
+                         block_trackers=True, cache_assets=True)
+
+
+def _cached_files(cache_dir) -> list:
+    return [name for _, _, names in os.walk(cache_dir) for name in names]
+
+
+@pytest.mark.parametrize("url", TRACKERS)
+def test_tracker_scripts_are_aborted_and_never_cached(router, tmp_path, url):
+    context = FakeContext()
+    router.install(context)
+
+    route = context.request(url)
+    assert route.action == "abort"
+    assert route.fetches == 0
+    assert _cached_files(tmp_path) == []
+    assert router.drain_metrics()["blocked"] == 1
+
+
+@pytest.mark.parametrize("url", TRACKERS)
+def test_serve_asset_aborts_trackers_whatever_the_route_order(router, tmp_path, url):
+    route = FakeRoute(url)
+    router._serve_asset(route)
+
+    assert route.action == "abort"
+    assert route.fetches == 0
+    assert _cached_files(tmp_path) == []
+    assert router.metrics["blocked"] == 1
+    assert router.metrics["misses"] == 0
+
+
+def test_app_bundles_are_cached_and_replayed(router, tmp_path):
+    context = FakeContext()
+    router.install(context)
+
+    first = context.request(BUNDLE)
+    second = context.request(BUNDLE)
+    assert (first.action, first.fetches) == ("fulfill", 1)
+    assert (second.action, second.fetches) == ("fulfill", 0)
+    metrics = router.drain_metrics()
+    assert (metrics["misses"], metrics["stored"], metrics["hits"], metrics["blocked"]) == (1, 1, 1, 0)
@@ -0,0 +1,46 @@
+from utils.outbound_latency import aggregate_sends, collect_sends
+
+
+def _send(template: str, ack: float, attachment: str = "none", **fields) -> dict:
+    return dict({
+        "template": template, "attachment": attachment, "ok": True, "ack": ack, "ttfb": ack / 2,
+        "confirmed": ack + 0.5, "total": ack + 3, "steps": {"select_template": 0.4}, "error": None,
+    }, **fields)
+
+
+def _test(nodeid: str, sends: list, timeline_env: str = None) -> dict:
+    metadata = {"outbound": sends}
+    if timeline_env:
+        metadata["timeline"] = {"env": timeline_env}
+    return {"nodeid": nodeid, "metadata": metadata}
+
+
+def test_collect_sends_environment_precedence():
+    tests = [
+        _test("test_outbound_send[a]", [_send("a", 1, env="pantera")], timeline_env="pantera"),
+        _test("test_outbound_send[b]", [_send("b", 1)], timeline_env="bugs"),
+        _test("test_outbound_send[c]", [_send("c", 1)]),
+    ]
+    # The stamped env, then the timeline's
+    assert [record["env"] for record in collect_sends(tests)] == ["pantera", "bugs", "unknown"]
+    # --env overrides all of them
+    assert [record["env"] for record in collect_sends(tests, "leones")] == ["leones"] * 3
+    assert collect_sends(tests)[0]["nodeid"] == "test_outbound_send[a]"
+
+
+def test_aggregate_flags_templates_and_attachments_above_the_median():
+    records = collect_sends([
+        _test("test_outbound_send[fast]", [_send("fast", 1.0), _send("fast", 1.2)]),
+        _test("test_outbound_send[medium]", [_send("medium", 1.1, "file")]),
+        _test("test_outbound_send[slow]", [_send("slow", 3.0, "url"), dict(_send("slow", 0, "url"), ok=False, ack=None)]),
+    ], "mock")
+
+    summary = aggregate_sends(records, threshold=0.5)
+    mock = summary["environments"]["mock"]
+    assert mock["sends"] == 5
+    assert mock["slow_templates"] == ["slow"]
+    assert mock["slow_attachments"] == ["url"]
+    assert mock["templates"]["slow"]["failed"] == 1
+    assert mock["templates"]["slow"]["ack"]["count"] == 1
+    assert mock["templates"]["slow"]["attachment"] == "url"
+    assert mock["templates"]["fast"]["steps"] == {"select_template": 0.4}
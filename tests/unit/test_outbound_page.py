@@ -0,0 +1,43 @@
+import logging
+from types import SimpleNamespace
+from pages.outbound_page import OutboundPage
+
+CONSOLE = "https://console.example.com"
+
+
+def _response(path: str, method: str = "POST", resource_type: str = "fetch", content_type: str = "application/json"):
+    request = SimpleNamespace(method=method, resource_type=resource_type, headers={"content-type": content_type})
+    return SimpleNamespace(url=f"{CONSOLE}{path}", request=request)
+
+
+def _record(*responses) -> list:
+    seen = []
+    on_response = OutboundPage._record_send_responses(seen)
+    for response in responses:
+        on_response(response)
+    return seen
+
+
+def test_only_the_send_endpoint_is_timed():
+    send = _response("/api/outbound/send")
+    seen = _record(
+        _response("/api/outbound/options", method="GET"),
+        _response("/api/files", content_type="multipart/form-data; boundary=x"),
+        _response("/api/outbound/drafts"),
+        send,
+        _response("/api/outbound/send", resource_type="document"),
+    )
+
+    # Uploads, GETs and navigations are never recorded
+    assert [response.url for response, _ in seen] == [f"{CONSOLE}/api/outbound/drafts", f"{CONSOLE}/api/outbound/send"]
+    # Another POST with "outbound" in its URL is not mistaken for the send
+    response, received_at = OutboundPage._send_response(seen, logging.getLogger("test"))
+    assert response is send
+    assert received_at == seen[1][1]
+
+
+def test_no_match_logs_the_requests_seen(caplog):
+    seen = _record(_response("/api/v2/campaigns/dispatch"))
+    with caplog.at_level(logging.WARNING):
+        assert OutboundPage._send_response(seen, logging.getLogger("test")) == (None, None)
+    assert f"{CONSOLE}/api/v2/campaigns/dispatch" in caplog.text
@@ -0,0 +1,93 @@
+from utils.pytest_progress import PytestProgress
+
+# Output of `pytest -v -n 2` on a demo module: one test errors in teardown after
+# passing, another fails and then errors in teardown
+XDIST_OUTPUT = """\
+============================= test session starts ==============================
+created: 2/2 workers
+2 workers [8 items]
+
+scheduling tests via LoadScheduling
+
+[gw0] [ 12%] PASSED tests/agente/test_demo.py::test_ok
+[gw1] [ 25%] PASSED tests/agente/test_demo.py::test_teardown_error
+[gw0] [ 37%] FAILED tests/agente/test_demo.py::test_fail
+[gw1] [ 37%] ERROR tests/agente/test_demo.py::test_teardown_error
+[gw0] [ 50%] ERROR tests/agente/test_demo.py::test_setup_error
+[gw1] [ 62%] FAILED tests/agente/test_demo.py::test_fail_and_teardown_error
+[gw1] [ 62%] ERROR tests/agente/test_demo.py::test_fail_and_teardown_error
+[gw0] [ 75%] PASSED tests/agente/test_demo.py::test_param[a b]
+[gw1] [ 87%] SKIPPED tests/agente/test_demo.py::test_skip
+[gw1] [100%] PASSED tests/agente/test_demo.py::test_param[c]
+
+==================================== ERRORS ====================================
+=========================== short test summary info ============================
+FAILED tests/agente/test_demo.py::test_fail - assert 0
+ERROR tests/agente/test_demo.py::test_teardown_error - RuntimeError: teardown
+=============== 2 failed, 4 passed, 1 skipped, 3 errors in 1.92s ===============
+"""
+
+# The same run without xdist
+PLAIN_OUTPUT = """\
+collecting ... collected 8 items
+
+tests/agente/test_demo.py::test_ok PASSED                                             [ 12%]
+tests/agente/test_demo.py::test_fail FAILED                                           [ 25%]
+tests/agente/test_demo.py::test_teardown_error PASSED                                 [ 37%]
+tests/agente/test_demo.py::test_teardown_error ERROR                                  [ 37%]
+tests/agente/test_demo.py::test_fail_and_teardown_error FAILED                        [ 50%]
+tests/agente/test_demo.py::test_fail_and_teardown_error ERROR                         [ 50%]
+tests/agente/test_demo.py::test_setup_error ERROR                                     [ 62%]
+tests/agente/test_demo.py::test_skip SKIPPED (unconditional skip)                     [ 75%]
+tests/agente/test_demo.py::test_param[a b] PASSED                                     [ 87%]
+tests/agente/test_demo.py::test_param[c] PASSED                                       [100%]
+FAILED tests/agente/test_demo.py::test_fail - assert 0
+"""
+
+FAILURES = [
+    "tests/agente/test_demo.py::test_fail",
+    "tests/agente/test_demo.py::test_teardown_error",
+    "tests/agente/test_demo.py::test_setup_error",
+    "tests/agente/test_demo.py::test_fail_and_teardown_error",
+]
+
+
+def _feed(output: str) -> PytestProgress:
+    progress = PytestProgress()
+    for line in output.splitlines(keepends=True):
+        progress.feed(line)
+    return progress
+
+
+def test_xdist_output_counts_each_test_once():
+    progress = _feed(XDIST_OUTPUT)
+    assert progress.total == 8
+    assert progress.done == progress.total
+    assert progress.counts == {"passed": 3, "failed": 4, "skipped": 1}
+    assert sorted(progress.failures) == sorted(FAILURES)
+    assert progress.eta() == 0
+
+
+def test_plain_output_counts_each_test_once():
+    progress = _feed(PLAIN_OUTPUT)
+    assert progress.total == 8
+    assert progress.done == progress.total
+    assert progress.counts == {"passed": 3, "failed": 4, "skipped": 1}
+    assert sorted(progress.failures) == sorted(FAILURES)
+
+
+def test_teardown_error_turns_a_passed_test_into_a_failure():
+    progress = PytestProgress()
+    assert progress.feed("[gw1] [ 25%] PASSED tests/agente/test_demo.py::test_teardown_error \n")
+    assert progress.counts["passed"] == 1
+    assert progress.feed("[gw1] [ 37%] ERROR tests/agente/test_demo.py::test_teardown_error \n")
+    assert progress.counts == {"passed": 0, "failed": 1, "skipped": 0}
+    # A repeated report of an already failed test changes nothing
+    assert not progress.feed("[gw1] [ 37%] ERROR tests/agente/test_demo.py::test_teardown_error \n")
+    assert progress.failures == ["tests/agente/test_demo.py::test_teardown_error"]
+
+
+def test_interrupted_run_keeps_the_reason():
+    progress = PytestProgress()
+    progress.feed("!!!!!!!! xdist.dsession.Interrupted: 3 login failures, environment considered down !!!!!!!!\n")
+    assert progress.interrupted == "3 login failures, environment considered down"
@@ -0,0 +1,27 @@
+import pytest
+from utils import resource_monitor
+from utils.resource_monitor import ResourceMonitor
+
+
+def test_getrusage_fallback_without_psutil(monkeypatch):
+    if resource_monitor.resource is None:
+        pytest.skip("getrusage is not available on this platform")
+    monkeypatch.setattr(resource_monitor, "psutil", None)
+    usage = ResourceMonitor(interval=0).start().usage()
+
+    assert usage["source"] == "getrusage"
+    assert usage["cpu"] > 0
+    assert usage["peak_rss_mb"] > 0
+    assert usage["processes"] is None
+
+
+def test_empty_figures_without_psutil_or_getrusage(monkeypatch):
+    # Windows without psutil
+    monkeypatch.setattr(resource_monitor, "psutil", None)
+    monkeypatch.setattr(resource_monitor, "resource", None)
+    monitor = ResourceMonitor().start()
+
+    assert monitor.cpu_seconds() == 0.0
+    usage = monitor.usage()
+    assert (usage["cpu"], usage["peak_rss_mb"], usage["processes"], usage["source"]) == (0.0, 0.0, None, None)
+    monitor.stop()
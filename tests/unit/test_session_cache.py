@@ -0,0 +1,154 @@
+import base64
+import json
+import os
+import time
+from types import SimpleNamespace
+import pytest
+from utils.session_cache import SessionCache
+
+ORIGIN = "https://pantera.example.com"
+USER = "agent1@mock.local"
+
+
+def _jwt(exp: float) -> str:
+    def part(data: dict) -> str:
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
+    return f"{part({'alg': 'HS256'})}.{part({'sub': USER, 'exp': exp})}.c2lnbmF0dXJl"
+
+
+class FakePage:
+    """What SessionCache.save reads from a logged-in page."""
+
+    def __init__(self, local_storage: dict = None, session_storage: dict = None):
+        state = {"cookies": [], "origins": [{
+            "origin": ORIGIN,
+            "localStorage": [{"name": name, "value": value} for name, value in (local_storage or {}).items()],
+        }]}
+        self.context = SimpleNamespace(storage_state=lambda: state)
+        self.session_storage = session_storage or {}
+
+    def evaluate(self, script):
+        return ORIGIN if "origin" in script else self.session_storage
+
+
+class FakeContext:
+    def __init__(self):
+        self.scripts = []
+
+    def add_init_script(self, script):
+        self.scripts.append(script)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SessionCache(cache_dir=str(tmp_path), ttl=3600)
+
+
+def _exists(cache, env="pantera", user=USER) -> list:
+    return [os.path.exists(path) for path in cache._paths(env, user)]
+
+
+def test_saved_session_is_loaded(cache):
+    cache.save(FakePage({"token": _jwt(time.time() + 3600)}, {"tab": "1"}), "pantera", USER)
+
+    state_path, meta = cache.load("pantera", USER)
+    assert state_path == cache._paths("pantera", USER)[0]
+    assert meta["origin"] == ORIGIN
+    assert meta["session_storage"] == {"tab": "1"}
+    # Entries are per environment
+    assert cache.load("bugs", USER) == (None, None)
+
+
+def test_jwt_expiry():
+    exp = int(time.time()) + 3600
+    assert SessionCache._jwt_expiry(_jwt(exp)) == exp
+    # JSON-encoded values keep their quotes in storage
+    assert SessionCache._jwt_expiry(f'"{_jwt(exp)}"') == exp
+    for value in ("not-a-jwt", "a.b", "abc.!!!.def", "e30.bm90IGpzb24.c2ln", "{}"):
+        assert SessionCache._jwt_expiry(value) is None
+
+
+@pytest.mark.parametrize("storage", ["local", "session"])
+def test_expired_jwt_invalidates_the_entry(cache, storage):
+    token = {"token": _jwt(time.time() - 10)}
+    page = FakePage(local_storage=token) if storage == "local" else FakePage(session_storage=token)
+    cache.save(page, "pantera", USER)
+
+    assert cache.load("pantera", USER) == (None, None)
+    assert _exists(cache) == [False, False]
+
+
+def test_jwt_about_to_expire_is_treated_as_expired(cache):
+    # Less than the one minute margin left
+    cache.save(FakePage({"token": _jwt(time.time() + 30)}), "pantera", USER)
+    assert cache.load("pantera", USER) == (None, None)
+
+
+def test_values_that_are_not_jwts_are_ignored(cache):
+    cache.save(FakePage({"theme": "dark", "token": "opaque-session-id"}, {"count": "3"}), "pantera", USER)
+    assert cache.load("pantera", USER)[0] is not None
+
+
+def test_ttl_expiry(cache):
+    cache.save(FakePage({"token": _jwt(time.time() + 86400)}), "pantera", USER)
+    meta_path = cache._paths("pantera", USER)[1]
+    with open(meta_path) as f:
+        meta = json.load(f)
+    meta["saved_at"] -= cache.ttl + 1
+    with open(meta_path, "w") as f:
+        json.dump(meta, f)
+
+    assert cache.load("pantera", USER) == (None, None)
+    assert _exists(cache) == [False, False]
+
+
+@pytest.mark.parametrize("meta", ["{not json", "", "[]", '"text"', '{"origin": "x"}', '{"saved_at": "yesterday"}'])
+def test_corrupt_meta_is_a_miss(cache, meta):
+    cache.save(FakePage(), "pantera", USER)
+    with open(cache._paths("pantera", USER)[1], "w") as f:
+        f.write(meta)
+
+    assert cache.load("pantera", USER) == (None, None)
+
+
+@pytest.mark.parametrize("state", ["{truncated", "[]", '{"origins": [{"localStorage": [{"name": "token"}]}]}'])
+def test_corrupt_state_is_a_miss(cache, state):
+    cache.save(FakePage(), "pantera", USER)
+    with open(cache._paths("pantera", USER)[0], "w") as f:
+        f.write(state)
+
+    assert cache.load("pantera", USER) == (None, None)
+
+
+def test_missing_files_are_a_miss(cache):
+    assert cache.load("pantera", USER) == (None, None)
+    cache.save(FakePage(), "pantera", USER)
+    os.remove(cache._paths("pantera", USER)[1])
+    assert cache.load("pantera", USER) == (None, None)
+
+
+def test_invalidate(cache):
+    cache.save(FakePage(), "pantera", USER)
+    cache.save(FakePage(), "bugs", USER)
+    cache.invalidate("pantera", USER)
+
+    assert _exists(cache, "pantera") == [False, False]
+    assert _exists(cache, "bugs") == [True, True]
+    # Nothing to remove is not an error
+    cache.invalidate("pantera", USER)
+
+
+def test_restore_session_storage(cache):
+    cache.save(FakePage(session_storage={"tab": "1"}), "pantera", USER)
+    _, meta = cache.load("pantera", USER)
+
+    context = FakeContext()
+    SessionCache.restore_session_storage(context, meta)
+    assert len(context.scripts) == 1
+    assert '{"tab": "1"}' in context.scripts[0]
+    assert json.dumps(ORIGIN) in context.scripts[0]
+
+    # Nothing captured: no init script
+    for empty in (None, {"session_storage": {}}):
+        SessionCache.restore_session_storage(context, empty)
+    assert len(context.scripts) == 1
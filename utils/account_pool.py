@@ -0,0 +1,135 @@
+import json
+import os
+import socket
+import time
+from contextlib import contextmanager
+from config.config import Config
+from utils.logger import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class AccountPool:
+    """
+    Cross-process lease pool for agent accounts.
+
+    Leases live in a JSON file guarded by an OS file lock, so every pytest-xdist
+    worker (and every concurrent run on the same host) sees the same state.
+    An exclusive lease gives one holder the account; shared leases can coexist
+    with each other but never with an exclusive one. Leases of dead processes
+    are reclaimed automatically. Every environment has its own account with the
+    same email, so leases are keyed by "<environment>:<email>".
+    """
+
+    def __init__(self, accounts: list = None, lease_file: str = None, timeout: int = None, poll_interval: float = 1.0,
+                 environment: str = "default"):
+        self.logger = get_logger(self.__class__.__name__)
+        self.environment = environment
+        self.accounts = accounts if accounts is not None else Config.USERS
+        self.lease_file = lease_file or Config.ACCOUNT_LEASE_FILE
+        self.timeout = Config.ACCOUNT_LEASE_TIMEOUT if timeout is None else timeout
+        self.poll_interval = poll_interval
+        self.host = socket.gethostname()
+
+    @contextmanager
+    def _locked_state(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.lease_file)), exist_ok=True)
+        with open(self.lease_file, "a+") as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            else:
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                f.seek(0)
+                content = f.read()
+                try:
+                    state = json.loads(content) if content.strip() else {}
+                except ValueError:
+                    self.logger.warning("Corrupted lease file, starting from an empty state")
+                    state = {}
+                state.setdefault("leases", {})
+                yield state
+                f.seek(0)
+                f.truncate()
+                json.dump(state, f)
+                f.flush()
+            finally:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _is_alive(self, lease: dict) -> bool:
+        if lease.get("host") != self.host or fcntl is None:
+            # Cannot check processes of other hosts (or on Windows): trust the lease
+            return True
+        try:
+            os.kill(lease["pid"], 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    def _key(self, email: str) -> str:
+        return f"{self.environment}:{email}"
+
+    def _prune(self, state: dict):
+        for key, leases in state["leases"].items():
+            alive = [lease for lease in leases if self._is_alive(lease)]
+            if len(alive) != len(leases):
+                self.logger.warning(f"Reclaimed {len(leases) - len(alive)} stale lease(s) on {key}")
+            state["leases"][key] = alive
+
+    def _pick(self, state: dict, shared: bool):
+        candidates = []
+        for account in self.accounts:
+            leases = state["leases"].get(self._key(account["email"]), [])
+            if any(lease["mode"] == "exclusive" for lease in leases):
+                continue
+            if not shared and leases:
+                continue
+            candidates.append((len(leases), account))
+        if not candidates:
+            return None
+        # Least shared account first (ties keep the configured order)
+        return min(candidates, key=lambda candidate: candidate[0])[1]
+
+    def acquire(self, holder: str, shared: bool = False) -> dict:
+        """Blocks until an account is available and returns it ({'email', 'password'})."""
+        mode = "shared" if shared else "exclusive"
+        deadline = time.monotonic() + self.timeout
+        waiting_logged = False
+        while True:
+            with self._locked_state() as state:
+                self._prune(state)
+                account = self._pick(state, shared)
+                if account:
+                    state["leases"].setdefault(self._key(account["email"]), []).append({
+                        "holder": holder, "mode": mode, "pid": os.getpid(), "host": self.host, "since": time.time(),
+                    })
+                    self.logger.info(f"{holder} leased {account['email']} on {self.environment} ({mode})")
+                    return account
+            if time.monotonic() > deadline:
+                raise TimeoutError(
+                    f"No agent account available on {self.environment} for {holder} after {self.timeout}s "
+                    f"({len(self.accounts)} accounts configured). Provision more agents or lower -n."
+                )
+            if not waiting_logged:
+                self.logger.info(f"{holder} waiting for a free agent account ({mode})...")
+                waiting_logged = True
+            time.sleep(self.poll_interval)
+
+    def release(self, email: str, holder: str):
+        with self._locked_state() as state:
+            leases = state["leases"].get(self._key(email), [])
+            state["leases"][self._key(email)] = [
+                lease for lease in leases
+                if not (lease["holder"] == holder and lease["pid"] == os.getpid())
+            ]
+        self.logger.info(f"{holder} released {email}")
@@ -0,0 +1,370 @@
+"""
+Framework overhead benchmarks against the local mock console.
+
+Two parts, both driven against utils.mock_console started in-process (no
+backend latency unless --latency is given, so what is measured is the
+framework itself):
+
+- Page objects and fixture tiers: each iteration goes through the same
+  layers the fixtures use (cold browser, warm context, UI login, restored
+  session, popup handling, status change, a full outbound send, a second send
+  on the reused page) and records wall and CPU time (Python + Playwright driver
+  + Chromium) of every case, plus the step() timings of the page objects.
+- xdist sweep: runs the suite against the mock for each worker count and keeps
+  wall time, throughput and the per-worker CPU/RSS from the JSON report.
+
+The output is a JSON baseline; --compare diffs it with a previous one and
+exits with 1 when something got slower than the tolerance, for CI:
+
+    python -m utils.benchmark --iterations 5 --workers 1,2,4 -o benchmark.json
+    python -m utils.benchmark --compare baseline.json --input benchmark.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from importlib import metadata
+from config.config import Config, PROJECT_ROOT
+from pages.agent_dashboard_page import AgentDashboardPage
+from pages.login_page import LoginPage
+from pages.outbound_flow import OutboundSendFlow, OutboundVariant, UTILS_DIR
+from utils.browser_pool import BrowserPool
+from utils.history import stats
+from utils.logger import get_logger
+from utils.mock_console import MockConsole, MockSettings
+from utils.report import full_duration
+from utils.resource_monitor import ResourceMonitor
+from utils.session_cache import SessionCache
+from utils.timing import recorder, aggregate_steps
+
+SCHEMA_VERSION = 1
+DEFAULT_SWEEP_TESTS = ["tests/agente/test_login_agente.py", "tests/agente/test_outbound_agente.py"]
+BENCHMARK_VARIANTS = [
+    OutboundVariant("bienvenida_rapida_auto"),
+    OutboundVariant("qa_imagen", attachment_path=os.path.join(UTILS_DIR, "Tinting_Home_Windows.jpg")),
+]
+# Differences below these are noise, whatever the relative change
+MIN_DELTA_SECONDS = 0.05
+MIN_DELTA_MB = 20
+
+logger = get_logger("Benchmark")
+
+
+class PageObjectBenchmark:
+    def __init__(self, console: MockConsole, iterations: int = 5, headless: bool = True):
+        self.logger = get_logger(self.__class__.__name__)
+        self.console = console
+        self.iterations = iterations
+        self.headless = headless
+        self.monitor = ResourceMonitor(interval=0.5)
+        self.samples = {}
+        self.failures = {}
+        self.timelines = []
+        # Accounts outside the configured pool log in to the mock with the default password
+        self.account = {"email": "benchmark@mock.local", "password": Config.PASSWORD}
+
+    @contextmanager
+    def measure(self, name: str):
+        cpu, start = self.monitor.cpu_seconds(), time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.failures[name] = self.failures.get(name, 0) + 1
+            self.logger.warning(f"{name} failed: {e}")
+            raise
+        wall = time.perf_counter() - start
+        self.samples.setdefault(name, []).append((wall, self.monitor.cpu_seconds() - cpu))
+
+    def _cold_browser(self):
+        # --browser-isolation=process: a Chromium launched and closed for the test
+        pool = BrowserPool(headless=self.headless, recycle_after=1)
+        try:
+            with self.measure("fixture.browser[process]"):
+                context = pool.acquire()
+                context.new_page().close()
+                pool.release(context)
+        finally:
+            pool.close()
+
+    def _warm_context(self, pool: BrowserPool):
+        with self.measure("fixture.browser[context]"):
+            context = pool.acquire()
+            context.new_page().close()
+            pool.release(context)
+
+    def _ui_login(self, pool: BrowserPool, cache: SessionCache):
+        context = pool.acquire()
+        try:
+            page = context.new_page()
+            login_page = LoginPage(page)
+            with self.measure("fixture.authenticated_page[login]"):
+                login_page.navigate(Config.BASE_URL)
+                login_page.login(self.account["email"], self.account["password"])
+                cache.save(page, "mock", self.account["email"])
+        finally:
+            pool.release(context)
+
+    def _restored_session(self, pool: BrowserPool, cache: SessionCache):
+        state_path, meta = cache.load("mock", self.account["email"])
+        if not state_path:
+            raise RuntimeError("No cached session to restore")
+        context = None
+        try:
+            with self.measure("fixture.authenticated_page[restored]"):
+                context = pool.acquire(storage_state=state_path)
+                cache.restore_session_storage(context, meta)
+                page = context.new_page()
+                login_page = LoginPage(page)
+                login_page.navigate(Config.dashboard_url())
+                if not login_page.has_active_session():
+                    raise RuntimeError("Restored session rejected by the mock console")
+
+            dashboard = AgentDashboardPage(page)
+            with self.measure("AgentDashboardPage.handle_popup"):
+                dashboard.handle_popup()
+            for status in ("Descanso", "Online"):
+                with self.measure("AgentDashboardPage.set_status"):
+                    dashboard.set_status(status)
+                with self.measure("AgentDashboardPage.verify_status_message"):
+                    if not dashboard.verify_status_message():
+                        raise RuntimeError("Status message not shown")
+
+            flow = OutboundSendFlow(page)
+            for index, variant in enumerate(BENCHMARK_VARIANTS):
+                name = "OutboundSendFlow.send" if index == 0 else "OutboundSendFlow.send[reused page]"
+                with self.measure(name):
+                    flow.send(variant)
+        finally:
+            if context is not None:
+                pool.release(context)
+
+    def run(self) -> dict:
+        Config.BASE_URL = self.console.login_url
+        self.monitor.start()
+        pool = BrowserPool(headless=self.headless)
+        with tempfile.TemporaryDirectory(prefix="benchmark-auth-") as auth_dir:
+            cache = SessionCache(cache_dir=auth_dir)
+            try:
+                # Launch outside the measurements: the warm tiers reuse this browser
+                pool.release(pool.acquire())
+                for iteration in range(1, self.iterations + 1):
+                    self.logger.info(f"Page object iteration {iteration}/{self.iterations}")
+                    recorder.start_test(f"benchmark::{iteration}", "benchmark", "mock")
+                    for case in (
+                        self._cold_browser,
+                        lambda: self._warm_context(pool),
+                        lambda: self._ui_login(pool, cache),
+                        lambda: self._restored_session(pool, cache),
+                    ):
+                        try:
+                            case()
+                        except Exception:
+                            # Counted by measure(); the next case starts from a fresh context
+                            pass
+                    self.timelines.append(recorder.finish_test())
+            finally:
+                pool.close()
+                self.monitor.stop()
+
+        cases = {}
+        for name in sorted(set(self.samples) | set(self.failures)):
+            samples = self.samples.get(name, [])
+            cases[name] = {
+                "failures": self.failures.get(name, 0),
+                "wall": stats([wall for wall, _ in samples]),
+                "cpu": stats([cpu for _, cpu in samples]),
+            }
+        return {
+            "iterations": self.iterations,
+            "cases": cases,
+            "steps": aggregate_steps(self.timelines),
+            "resources": self.monitor.usage(),
+        }
+
+
+def _sweep_run(console: MockConsole, workers: int, tests: list, extra_args: list) -> dict:
+    """One suite run against the mock with `workers` xdist workers (0 = no xdist)."""
+    with tempfile.TemporaryDirectory(prefix=f"benchmark-{workers}w-") as workdir:
+        report_path = os.path.join(workdir, "report.json")
+        env = dict(
+            os.environ,
+            MOCK_CONSOLE_URL=console.login_url,
+            HEADLESS="True",
+            # Cold caches and private leases, so every worker count starts from the same state
+            AUTH_CACHE_DIR=os.path.join(workdir, "auth"),
+            ACCOUNT_LEASE_FILE=os.path.join(workdir, "leases.json"),
+            HEALTH_CACHE_DIR=os.path.join(workdir, "health"),
+            AGENT_ACCOUNTS=",".join(f"benchmark{index}@mock.local:{Config.PASSWORD}" for index in range(max(workers, 1))),
+        )
+        command = [
+            sys.executable, "-m", "pytest", *[os.path.join(PROJECT_ROOT, test) for test in tests],
+            "--rootdir", PROJECT_ROOT, "-c", os.path.join(PROJECT_ROOT, "pytest.ini"),
+            # Same capture settings as the regular runs, without the HTML/Allure outputs
+            "-o", "addopts=--tracing=retain-on-failure --screenshot=only-on-failure",
+            "-p", "no:cacheprovider", "-q", "--env=mock",
+            "--json-report", f"--json-report-file={report_path}",
+        ]
+        if workers:
+            command += ["-n", str(workers), "--dist=load"]
+        command += extra_args
+
+        requests_before = sum(console.state.stats()["requests"].values())
+        logger.info(f"Sweep run with {workers} workers: {' '.join(command)}")
+        start = time.perf_counter()
+        # Artifacts of failed tests (traces, screenshots) stay in the temporary workdir
+        process = subprocess.run(command, cwd=workdir, env=env, capture_output=True, text=True)
+        wall = time.perf_counter() - start
+        try:
+            with open(report_path) as f:
+                report = json.load(f)
+        except (OSError, ValueError):
+            logger.error(f"Sweep run with {workers} workers produced no report:\n{process.stdout[-2000:]}{process.stderr[-2000:]}")
+            return {"workers": workers, "wall": round(wall, 3), "exit_code": process.returncode, "error": "no report"}
+
+    summary = report.get("summary", {})
+    durations = [full_duration(test) for test in report.get("tests", [])]
+    per_worker = report.get("resources", {}).get("workers", {})
+    return {
+        "workers": workers,
+        "exit_code": process.returncode,
+        "wall": round(wall, 3),
+        "tests": summary.get("total", 0),
+        "passed": summary.get("passed", 0),
+        "failed": summary.get("failed", 0) + summary.get("error", 0),
+        "throughput": round(summary.get("total", 0) / wall, 3) if wall else None,
+        "test_duration": stats(durations),
+        "cpu_total": round(sum(usage.get("cpu", 0) for usage in per_worker.values()), 3),
+        "peak_rss_mb": max((usage.get("peak_rss_mb", 0) for usage in per_worker.values()), default=0),
+        "resources": report.get("resources"),
+        "steps": report.get("step_timings", {}),
+        "api_requests": sum(console.state.stats()["requests"].values()) - requests_before,
+    }
+
+
+def run_sweep(console: MockConsole, workers: list, tests: list, extra_args: list = ()) -> list:
+    return [_sweep_run(console, count, tests, list(extra_args)) for count in workers]
+
+
+def _environment(settings: MockSettings) -> dict:
+    def version(package):
+        try:
+            return metadata.version(package)
+        except metadata.PackageNotFoundError:
+            return None
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, capture_output=True, text=True
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "playwright": version("playwright"),
+        "pytest_xdist": version("pytest-xdist"),
+        "mock_console": {"latency": settings.latency, "jitter": settings.jitter, "failure_rate": settings.failure_rate},
+    }
+
+
+def _metrics(result: dict) -> dict:
+    """Flat metric name -> (value, unit) of a benchmark result, the keys compared between runs."""
+    metrics = {}
+    for name, case in result.get("page_objects", {}).get("cases", {}).items():
+        for kind in ("wall", "cpu"):
+            if case[kind].get("count"):
+                metrics[f"{name}.{kind}.p50"] = (case[kind]["p50"], "s")
+    for name, step in result.get("page_objects", {}).get("steps", {}).items():
+        metrics[f"step.{name}.mean"] = (step["mean"], "s")
+    for run in result.get("sweep", []):
+        if "error" in run:
+            continue
+        prefix = f"sweep.{run['workers']}w"
+        metrics[f"{prefix}.wall"] = (run["wall"], "s")
+        metrics[f"{prefix}.cpu_total"] = (run["cpu_total"], "s")
+        metrics[f"{prefix}.peak_rss_mb"] = (run["peak_rss_mb"], "MB")
+    return metrics
+
+
+def compare(baseline: dict, current: dict, tolerance: float = 0.2) -> list:
+    """
+    One row per metric present in both results. A metric regressed when it grew by
+    more than `tolerance` (relative) and by more than the noise floor (absolute).
+    """
+    base_metrics, current_metrics = _metrics(baseline), _metrics(current)
+    rows = []
+    for name in sorted(set(base_metrics) & set(current_metrics)):
+        (before, unit), (after, _) = base_metrics[name], current_metrics[name]
+        change = (after - before) / before if before else None
+        floor = MIN_DELTA_MB if unit == "MB" else MIN_DELTA_SECONDS
+        rows.append({
+            "metric": name,
+            "baseline": before,
+            "current": after,
+            "change": round(change, 3) if change is not None else None,
+            "regression": change is not None and change > tolerance and after - before > floor,
+        })
+    return rows
+
+
+def print_comparison(rows: list, tolerance: float):
+    width = max((len(row["metric"]) for row in rows), default=10)
+    for row in rows:
+        change = f"{row['change']:+.1%}" if row["change"] is not None else "n/a"
+        flag = "  <-- regresión" if row["regression"] else ""
+        print(f"{row['metric']:<{width}}  {row['baseline']:>10.3f}  {row['current']:>10.3f}  {change:>8}{flag}")
+    regressions = sum(1 for row in rows if row["regression"])
+    print(f"{len(rows)} métricas comparadas, {regressions} regresiones (tolerancia {tolerance:.0%})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mide el costo propio del framework contra la consola simulada")
+    parser.add_argument("--iterations", type=int, default=5, help="Iteraciones de los benchmarks de page objects")
+    parser.add_argument("--workers", default="1,2,4", help="Cantidades de workers de xdist a barrer (0 = sin xdist)")
+    parser.add_argument("--tests", nargs="+", default=DEFAULT_SWEEP_TESTS, help="Tests que corre cada barrido")
+    parser.add_argument("--skip-page-objects", action="store_true")
+    parser.add_argument("--skip-sweep", action="store_true")
+    parser.add_argument("--latency", type=float, default=0.0, help="Demora de la API simulada (segundos)")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--headed", action="store_true")
+    parser.add_argument("-o", "--output", default="benchmark.json")
+    parser.add_argument("--compare", help="Baseline JSON con el que comparar")
+    parser.add_argument("--input", help="Resultado ya medido a comparar con --compare (no corre benchmarks)")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Aumento relativo tolerado antes de marcar regresión")
+    args = parser.parse_args()
+
+    if args.input:
+        with open(args.input) as f:
+            result = json.load(f)
+    else:
+        settings = MockSettings(latency=args.latency, jitter=args.jitter, failure_rate=args.failure_rate)
+        result = {"schema": SCHEMA_VERSION, "created_at": time.time(), "environment": _environment(settings)}
+        with MockConsole.on_free_port(settings=settings) as console:
+            if not args.skip_page_objects:
+                result["page_objects"] = PageObjectBenchmark(console, args.iterations, headless=not args.headed).run()
+            if not args.skip_sweep:
+                workers = [int(value) for value in args.workers.split(",") if value.strip()]
+                result["sweep"] = run_sweep(console, workers, args.tests)
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"Resultados en {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        rows = compare(baseline, result, args.tolerance)
+        print_comparison(rows, args.tolerance)
+        if any(row["regression"] for row in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import time
+from playwright.sync_api import sync_playwright, Browser, BrowserContext
+from config.config import Config
+from utils.logger import get_logger
+
+CHROMIUM_ARGS = ["--no-sandbox", "--disable-dev-shm-usage", "--disable-gpu", "--disable-setuid-sandbox"]
+CONTEXT_OPTIONS = {"viewport": {"width": 1280, "height": 720}, "locale": "es-ES"}
+
+
+class BrowserPool:
+    """
+    Keeps a single Chromium process per worker and hands out a fresh, isolated
+    BrowserContext for every test.
+
+    The browser is relaunched lazily when it has served `recycle_after` contexts
+    (0 = never recycle) or when it disconnected (crash). With recycle_after=1 the
+    pool behaves like the old strict mode: one browser process per test.
+    Recycling waits until no context of the browser is open, so a long-lived
+    context (the session-scoped outbound page) is never closed under a test:
+    while it is open, recycle_after=1 no longer gives one browser per test.
+    An optional NetworkRouter is installed on every context it creates, and an
+    optional TraceRecorder records it.
+    """
+
+    def __init__(self, headless: bool = None, recycle_after: int = 0, router=None, tracer=None):
+        self.logger = get_logger(self.__class__.__name__)
+        self.headless = Config.HEADLESS if headless is None else headless
+        self.recycle_after = recycle_after
+        self.router = router
+        self.tracer = tracer
+        self._playwright = None
+        self._browser: Browser = None
+        self._served_by_browser = 0
+        # Contexts handed out and not released yet
+        self._live = []
+        self.launch_durations = []
+        self.contexts_served = 0
+        # Launch time paid by the last acquire() call (0 when the browser was reused)
+        self.last_launch_duration = 0.0
+
+    def _browser_alive(self) -> bool:
+        return self._browser is not None and self._browser.is_connected()
+
+    def _launch(self):
+        if self._playwright is None:
+            self._playwright = sync_playwright().start()
+        start = time.perf_counter()
+        self._browser = self._playwright.chromium.launch(headless=self.headless, args=CHROMIUM_ARGS)
+        duration = time.perf_counter() - start
+        self._served_by_browser = 0
+        self.launch_durations.append(duration)
+        self.logger.info(f"Chromium launched in {duration:.2f}s (launch #{len(self.launch_durations)})")
+        return duration
+
+    def _close_browser(self):
+        if self._browser is not None:
+            try:
+                if self._browser.is_connected():
+                    self._browser.close()
+            except Exception as e:
+                self.logger.warning(f"Error closing browser: {e}")
+            self._browser = None
+        self._live = []
+
+    def acquire(self, **context_options) -> BrowserContext:
+        """Returns a new isolated context, launching or relaunching the browser if needed."""
+        self.last_launch_duration = 0.0
+        if self._browser is not None and not self._browser.is_connected():
+            self.logger.warning("Browser disconnected (crash?). Relaunching...")
+            self._browser = None
+            # Its contexts died with it and must not defer the next recycle
+            self._live = []
+        if not self._browser_alive():
+            self.last_launch_duration = self._launch()
+
+        options = dict(CONTEXT_OPTIONS)
+        options.update(context_options)
+        context = self._browser.new_context(**options)
+        if self.router is not None:
+            self.router.install(context)
+        if self.tracer is not None:
+            self.tracer.attach(context)
+        self._live.append(context)
+        self._served_by_browser += 1
+        self.contexts_served += 1
+        return context
+
+    def release(self, context: BrowserContext):
+        """Closes the context and recycles the browser once it reached its quota and nothing else is open."""
+        if self.tracer is not None:
+            self.tracer.detach(context)
+        if context in self._live:
+            self._live.remove(context)
+        try:
+            context.close()
+        except Exception as e:
+            self.logger.warning(f"Error closing context: {e}")
+        if self.recycle_after and self._served_by_browser >= self.recycle_after:
+            if self._live:
+                self.logger.info(f"Browser recycle deferred, {len(self._live)} context(s) still open")
+                return
+            self.logger.info(f"Recycling browser after {self._served_by_browser} contexts")
+            self._close_browser()
+
+    def close(self):
+        self._close_browser()
+        if self._playwright is not None:
+            self._playwright.stop()
+            self._playwright = None
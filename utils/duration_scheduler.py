@@ -0,0 +1,171 @@
+"""
+Duration-aware scheduling for pytest-xdist (longest processing time first).
+
+xdist's `load` scheduler hands out tests in collection order, so a long
+outbound test picked last keeps one worker busy while the others idle.
+DurationScheduling keeps the same dispatch mechanics but orders the queue by
+the durations of previous runs (the SQLite history of utils.history or
+pytest-json-report files), longest first, and gives each worker one more test
+only when it finishes one. Tests without history are predicted at the median
+of the known ones. conftest only installs it when some history is available,
+otherwise xdist keeps its default `load` scheduler.
+"""
+import glob
+import heapq
+import json
+import os
+import statistics
+import time
+from xdist.scheduler import LoadScheduling
+from utils.logger import get_logger
+from utils.report import full_duration
+
+logger = get_logger("DurationScheduler")
+
+
+def _report_durations(path: str) -> dict:
+    """nodeid -> durations of the passing tests of one pytest-json-report file."""
+    with open(path) as f:
+        report = json.load(f)
+    durations = {}
+    for test in report.get("tests", []):
+        if test.get("outcome") == "passed":
+            durations.setdefault(test["nodeid"], []).append(full_duration(test))
+    return durations
+
+
+def load_durations(sources: list, environment: str = None) -> dict:
+    """
+    Reads historical durations from every source: SQLite history files (.sqlite/.db),
+    JSON reports, or directories of JSON reports. Returns nodeid -> median seconds.
+    Missing or unreadable sources are skipped.
+    """
+    from utils.history import HistoryStore
+
+    samples = {}
+    for source in sources:
+        paths = sorted(glob.glob(os.path.join(source, "*.json"))) if os.path.isdir(source) else [source]
+        for path in paths:
+            try:
+                if path.endswith((".sqlite", ".db")):
+                    if not os.path.exists(path):
+                        raise OSError(f"{path} does not exist")
+                    with HistoryStore(path) as store:
+                        durations = {nodeid: [p50] for nodeid, p50 in store.test_durations(environment).items()}
+                else:
+                    durations = _report_durations(path)
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Ignoring duration history {path}: {e}")
+                continue
+            for nodeid, values in durations.items():
+                samples.setdefault(nodeid, []).extend(values)
+    return {nodeid: statistics.median(values) for nodeid, values in samples.items()}
+
+
+def predict_makespan(durations: list, workers: int) -> float:
+    """
+    Simulates DurationScheduling on `durations` (already in dispatch order): each worker
+    starts with two tests and receives the next one whenever its running test finishes.
+    """
+    if not durations or workers < 1:
+        return 0.0
+    prefill, queue = durations[:2 * workers], durations[2 * workers:]
+    # (time the worker asks for a test, time its queue is done)
+    heap = []
+    for worker in range(workers):
+        first = prefill[worker] if worker < len(prefill) else 0.0
+        second = prefill[2 * workers - 1 - worker] if 2 * workers - 1 - worker < len(prefill) else 0.0
+        heap.append((first, first + second))
+    heapq.heapify(heap)
+    for duration in queue:
+        _, end = heapq.heappop(heap)
+        heapq.heappush(heap, (end, end + duration))
+    return max(end for _, end in heap)
+
+
+class DurationScheduling(LoadScheduling):
+    def __init__(self, config, log=None, durations: dict = None):
+        super().__init__(config, log)
+        self.logger = get_logger(self.__class__.__name__)
+        self.durations = durations or {}
+        self.predicted = {}
+        self.started = None
+        self.workers = 0
+        self.finished = {}
+
+    def _order_pending(self):
+        known = [self.durations[nodeid] for nodeid in self.collection if nodeid in self.durations]
+        fallback = statistics.median(known) if known else 0.0
+        self.predicted = {nodeid: self.durations.get(nodeid, fallback) for nodeid in self.collection}
+        # Stable sort: equal predictions keep the collection (fixture-friendly) order
+        self.pending.sort(key=lambda index: -self.predicted[self.collection[index]])
+
+    def schedule(self):
+        if self.collection is not None:
+            super().schedule()
+            return
+        if not self._check_nodes_have_same_collection():
+            self.log("**Different tests collected, aborting run**")
+            return
+
+        self.collection = next(iter(self.node2collection.values()))
+        self.pending[:] = range(len(self.collection))
+        if not self.collection:
+            return
+        self._order_pending()
+        self.started = time.monotonic()
+        self.workers = len(self.nodes)
+        order = [self.predicted[self.collection[index]] for index in self.pending]
+        self.logger.info(
+            f"Scheduling {len(order)} tests longest first on {self.workers} workers, "
+            f"predicted makespan {predict_makespan(order, self.workers):.1f}s"
+        )
+
+        # Two tests per worker (xdist needs the next item to run the current one), dealt in
+        # snake order so the longest and the shortest of the first batch share a worker
+        nodes = self.nodes
+        prefill, self.pending[:] = self.pending[:2 * len(nodes)], self.pending[2 * len(nodes):]
+        for position, node in enumerate(nodes):
+            batch = [prefill[i] for i in (position, 2 * len(nodes) - 1 - position) if i < len(prefill)]
+            if batch:
+                self.node2pending[node].extend(batch)
+                node.send_runtest_some(batch)
+
+        if not self.pending:
+            for node in nodes:
+                node.shutdown()
+
+    def check_schedule(self, node, duration: float = 0):
+        if node.shutting_down:
+            return
+        if self.pending:
+            missing = 2 - len(self.node2pending[node])
+            if missing > 0:
+                self._send_tests(node, missing)
+        else:
+            node.shutdown()
+        self.log("num items waiting for node:", len(self.pending))
+
+    def mark_test_complete(self, node, item_index: int, duration: float = 0):
+        self.finished[node.gateway.id] = time.monotonic()
+        super().mark_test_complete(node, item_index, duration)
+
+    def summary(self) -> dict:
+        """Predicted vs actual makespan, for the JSON report."""
+        workers = self.workers or 1
+        order = sorted(self.predicted.values(), reverse=True)
+        actual = max(self.finished.values()) - self.started if self.finished and self.started else None
+        return {
+            "strategy": "duration",
+            "workers": workers,
+            "tests": len(self.predicted),
+            "tests_with_history": sum(1 for nodeid in self.predicted if nodeid in self.durations),
+            "predicted_total": round(sum(order), 3),
+            "predicted_makespan": round(predict_makespan(order, workers), 3),
+            # No schedule can finish before the average load or the longest test
+            "lower_bound": round(max(sum(order) / workers, order[0] if order else 0.0), 3),
+            "actual_makespan": round(actual, 3) if actual is not None else None,
+            "worker_finished": {
+                worker: round(finished - self.started, 3) for worker, finished in sorted(self.finished.items())
+            },
+        }
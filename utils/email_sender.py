@@ -1,47 +1,243 @@
+import argparse
+import queue
 import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from email.utils import make_msgid
 import os
 from utils.logger import get_logger
 
+
+@dataclass
+class DeliveryResult:
+    to: str
+    subject: str
+    message_id: str
+    ok: bool
+    # Seconds waiting for the rate limiter and a free connection, then inside the SMTP transaction
+    wait: float = 0.0
+    duration: float = 0.0
+    sent_at: float = None
+    error: str = None
+
+
+class RateLimiter:
+    """Token bucket shared by every sending thread (rate <= 0 disables it)."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
 class EmailSender:
-    def __init__(self):
+    """
+    SMTP sender that keeps its connections open between messages.
+
+    Up to `pool_size` authenticated connections are reused by send_email() and
+    send_batch(); a connection is replaced after `max_per_connection` messages
+    (Gmail limits them) or when the server dropped it. A shared token bucket caps
+    the overall rate so bursts do not trip the provider's limits.
+    """
+
+    def __init__(self, smtp_server: str = None, smtp_port: int = None, sender_email: str = None, password: str = None,
+                 starttls: bool = None, pool_size: int = None, rate_limit: float = None, max_per_connection: int = None):
         self.logger = get_logger(self.__class__.__name__)
-        self.smtp_server = os.getenv("SMTP_SERVER", "smtp.gmail.com")
-        self.smtp_port = int(os.getenv("SMTP_PORT", 587))
-        self.sender_email = os.getenv("SMTP_SENDER")
-        self.password = os.getenv("SMTP_PASSWORD")
+        self.smtp_server = smtp_server or os.getenv("SMTP_SERVER", "smtp.gmail.com")
+        self.smtp_port = smtp_port or int(os.getenv("SMTP_PORT", 587))
+        self.sender_email = sender_email or os.getenv("SMTP_SENDER")
+        self.password = password or os.getenv("SMTP_PASSWORD")
+        # The local stand-in (utils/smtp_stub.py) speaks plain SMTP without authentication
+        self.starttls = os.getenv("SMTP_STARTTLS", "True").lower() == "true" if starttls is None else starttls
+        self.pool_size = pool_size or int(os.getenv("SMTP_POOL_SIZE", 4))
+        self.max_per_connection = max_per_connection or int(os.getenv("SMTP_MAX_PER_CONNECTION", 100))
+        self.rate_limiter = RateLimiter(float(os.getenv("SMTP_RATE_LIMIT", 0)) if rate_limit is None else rate_limit)
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.pool_size)
+        self.connections_opened = 0
 
-    def send_email(self, subject: str, body: str, to_email: str):
-        """
-        Sends an email using the configured SMTP server.
-        """
-        if not self.sender_email or not self.password:
-            self.logger.error("SMTP credentials not configured (SMTP_SENDER, SMTP_PASSWORD).")
-            raise ValueError("SMTP credentials missing.")
+    def __enter__(self):
+        return self
 
-        try:
-            msg = MIMEMultipart()
-            msg['From'] = self.sender_email
-            msg['To'] = to_email
-            msg['Subject'] = subject
+    def __exit__(self, *exc):
+        self.close()
 
-            msg.attach(MIMEText(body, 'plain'))
+    def _check_credentials(self):
+        if not self.sender_email or (self.starttls and not self.password):
+            self.logger.error("SMTP credentials not configured (SMTP_SENDER, SMTP_PASSWORD).")
+            raise ValueError("SMTP credentials missing.")
 
-            self.logger.info(f"Connecting to SMTP server: {self.smtp_server}:{self.smtp_port}")
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
+    def _open(self) -> smtplib.SMTP:
+        self.logger.info(f"Connecting to SMTP server: {self.smtp_server}:{self.smtp_port}")
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=30)
+        if self.starttls:
             server.starttls()
-            
+        if self.password:
             self.logger.info(f"Logging in as {self.sender_email}")
             server.login(self.sender_email, self.password)
-            
-            self.logger.info(f"Sending email to {to_email}")
-            text = msg.as_string()
-            server.sendmail(self.sender_email, to_email, text)
-            
+        self.connections_opened += 1
+        server.messages_sent = 0
+        return server
+
+    @staticmethod
+    def _quit(server: smtplib.SMTP):
+        try:
             server.quit()
-            self.logger.info("Email sent successfully.")
+        except smtplib.SMTPException:
+            server.close()
+        except OSError:
+            pass
+
+    @contextmanager
+    def _connection(self, fresh: bool = False):
+        """
+        A pooled connection (a new one when `fresh`); broken or exhausted ones are
+        closed instead of returned.
+        """
+        with self._slots:
+            server = None
+            if not fresh:
+                try:
+                    server = self._idle.get_nowait()
+                except queue.Empty:
+                    pass
+            if server is None:
+                server = self._open()
+            healthy = False
+            try:
+                yield server
+                healthy = True
+            finally:
+                if healthy and server.messages_sent < self.max_per_connection:
+                    self._idle.put(server)
+                else:
+                    self._quit(server)
+
+    def build_message(self, subject: str, body: str, to_email: str) -> MIMEMultipart:
+        msg = MIMEMultipart()
+        msg['From'] = self.sender_email
+        msg['To'] = to_email
+        msg['Subject'] = subject
+        msg['Message-ID'] = make_msgid(domain=self.sender_email.split("@")[-1])
+        msg.attach(MIMEText(body, 'plain'))
+        return msg
+
+    def _deliver(self, subject: str, body: str, to_email: str) -> DeliveryResult:
+        msg = self.build_message(subject, body, to_email)
+        result = DeliveryResult(to_email, subject, msg['Message-ID'], ok=False)
+        queued = time.perf_counter()
+        self.rate_limiter.acquire()
+        text = msg.as_string()
+        # One retry on a newly opened connection when the server dropped an idle pooled one.
+        # The other idle connections may be dead too (server restart), so the retry never takes them.
+        for attempt in (1, 2):
+            try:
+                with self._connection(fresh=attempt == 2) as server:
+                    start = time.perf_counter()
+                    result.wait = round(start - queued, 4)
+                    server.sendmail(self.sender_email, to_email, text)
+                    server.messages_sent += 1
+                    result.duration = round(time.perf_counter() - start, 4)
+                result.ok, result.sent_at, result.error = True, time.time(), None
+                return result
+            except smtplib.SMTPServerDisconnected as e:
+                result.error = str(e)
+                if attempt == 2:
+                    raise
+                self.logger.warning(f"SMTP connection dropped, retrying on a new one: {e}")
+
+    def send_email(self, subject: str, body: str, to_email: str):
+        """
+        Sends an email using the configured SMTP server.
+        """
+        self._check_credentials()
+        try:
+            self.logger.info(f"Sending email to {to_email}")
+            result = self._deliver(subject, body, to_email)
+            self.logger.info(f"Email sent successfully in {result.duration:.2f}s.")
             return True
         except Exception as e:
             self.logger.error(f"Failed to send email: {e}")
             raise e
+
+    def send_batch(self, messages: list, concurrency: int = None) -> list:
+        """
+        Sends (subject, body, to_email) tuples over the pooled connections, `concurrency`
+        (default: pool size) at a time. Never raises for a single message: failures are
+        returned as DeliveryResult(ok=False), in the same order as `messages`.
+        """
+        self._check_credentials()
+
+        def deliver(message):
+            subject, body, to_email = message
+            try:
+                return self._deliver(subject, body, to_email)
+            except Exception as e:
+                self.logger.error(f"Failed to send email to {to_email}: {e}")
+                return DeliveryResult(to_email, subject, None, ok=False, error=str(e))
+
+        workers = min(concurrency or self.pool_size, self.pool_size, len(messages)) or 1
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="smtp") as executor:
+            results = list(executor.map(deliver, messages))
+        sent = sum(1 for result in results if result.ok)
+        self.logger.info(
+            f"Batch: {sent}/{len(results)} sent in {time.perf_counter() - start:.2f}s "
+            f"over {self.connections_opened} connections"
+        )
+        return results
+
+    def close(self):
+        while True:
+            try:
+                self._quit(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+
+def main():
+    from utils.history import percentile
+
+    parser = argparse.ArgumentParser(description="Envía un lote de emails (p. ej. para cargar el canal de email entrante)")
+    parser.add_argument("--to", default="qapantera@chattigo.com")
+    parser.add_argument("--count", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=None)
+    parser.add_argument("--rate", type=float, default=None, help="Máximo de emails por segundo (0 = sin límite)")
+    args = parser.parse_args()
+
+    stamp = int(time.time())
+    messages = [
+        (f"Load Test Email {stamp}-{index}", "This is a load test email sent by the automation framework.", args.to)
+        for index in range(args.count)
+    ]
+    with EmailSender(rate_limit=args.rate) as sender:
+        results = sender.send_batch(messages, args.concurrency)
+    durations = [result.duration for result in results if result.ok]
+    print(f"Enviados {len(durations)}/{len(results)}")
+    if durations:
+        print(f"SMTP p50 {percentile(durations, 50):.3f}s, p95 {percentile(durations, 95):.3f}s, máx {max(durations):.3f}s")
+
+
+if __name__ == "__main__":
+    main()
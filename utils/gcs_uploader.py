@@ -0,0 +1,188 @@
+"""
+Concurrent artifact publishing to Google Cloud Storage.
+
+Every upload of a run (report, JSON, screenshots, traces) goes through one
+shared storage client and a bounded thread pool. Text formats are gzipped and
+stored with Content-Encoding: gzip (GCS transcodes them for clients that do not
+accept it), each payload's MD5 is compared with what is already stored so a
+re-published report only sends what changed, and transient errors are retried
+with exponential backoff. With STORAGE_EMULATOR_HOST set (e.g. a local
+fake-gcs-server) the client talks to the emulator without credentials.
+"""
+import base64
+import gzip
+import hashlib
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from urllib.parse import quote
+from utils.logger import get_logger
+
+# Compressed before upload and served with Content-Encoding: gzip
+GZIP_TYPES = {
+    ".html": "text/html; charset=utf-8",
+    ".json": "application/json",
+    ".css": "text/css",
+    ".js": "application/javascript",
+    ".txt": "text/plain; charset=utf-8",
+    ".log": "text/plain; charset=utf-8",
+    ".svg": "image/svg+xml",
+}
+CONTENT_TYPES = {
+    ".webp": "image/webp",
+    ".jpg": "image/jpeg",
+    ".png": "image/png",
+    ".zst": "application/zstd",
+    ".zip": "application/zip",
+    ".sqlite": "application/vnd.sqlite3",
+}
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Below this size a metadata lookup costs about as much as uploading again
+DEDUPE_MIN_BYTES = 64 * 1024
+UPLOAD_WORKERS = int(os.getenv("UPLOAD_WORKERS", 8))
+UPLOAD_ATTEMPTS = int(os.getenv("UPLOAD_ATTEMPTS", 5))
+
+_storage_client = None
+_storage_client_lock = threading.Lock()
+
+
+def get_storage_client():
+    """Shared google.cloud.storage client, created on first use (safe to share across upload threads)."""
+    global _storage_client
+    with _storage_client_lock:
+        if _storage_client is None:
+            from google.cloud import storage
+            if os.getenv("STORAGE_EMULATOR_HOST"):
+                # The library switches to anonymous credentials for the emulator; only a project is needed
+                _storage_client = storage.Client(project=os.getenv("GOOGLE_CLOUD_PROJECT", "test"))
+            else:
+                _storage_client = storage.Client()
+        return _storage_client
+
+
+def public_url(bucket_name: str, blob_name: str) -> str:
+    base = os.getenv("STORAGE_EMULATOR_HOST", "https://storage.googleapis.com").rstrip("/")
+    return f"{base}/{bucket_name}/{quote(blob_name)}"
+
+
+def _transient_errors() -> tuple:
+    import requests
+    from google.api_core import exceptions
+    from google.resumable_media import DataCorruption
+
+    return (
+        exceptions.TooManyRequests, exceptions.InternalServerError, exceptions.BadGateway,
+        exceptions.ServiceUnavailable, exceptions.GatewayTimeout,
+        requests.exceptions.ConnectionError, requests.exceptions.Timeout, DataCorruption,
+    )
+
+
+@dataclass
+class UploadStats:
+    uploaded: int = 0
+    skipped: int = 0
+    bytes_sent: int = 0
+    # Bytes not sent thanks to gzip and to skipping unchanged files
+    bytes_saved: int = 0
+    retries: int = 0
+
+
+class ArtifactUploader:
+    def __init__(self, bucket_name: str, client=None, workers: int = None, attempts: int = None, backoff: float = 0.5):
+        self.logger = get_logger(self.__class__.__name__)
+        self.bucket_name = bucket_name
+        self.bucket = (client or get_storage_client()).bucket(bucket_name)
+        self.workers = workers or UPLOAD_WORKERS
+        self.attempts = attempts or UPLOAD_ATTEMPTS
+        self.backoff = backoff
+        self.stats = UploadStats()
+        self._lock = threading.Lock()
+        # blob name -> MD5 sent by this uploader, so retried publishes skip them without a lookup
+        self._sent = {}
+
+    def _count(self, **increments):
+        with self._lock:
+            for name, value in increments.items():
+                setattr(self.stats, name, getattr(self.stats, name) + value)
+
+    def _with_retries(self, action, description: str):
+        transient = _transient_errors()
+        for attempt in range(1, self.attempts + 1):
+            try:
+                return action()
+            except transient as e:
+                if attempt == self.attempts:
+                    raise
+                delay = self.backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+                self.logger.warning(f"{description} failed ({e.__class__.__name__}), retrying in {delay:.1f}s ({attempt}/{self.attempts})")
+                self._count(retries=1)
+                time.sleep(delay)
+
+    @staticmethod
+    def _payload(path: str) -> tuple:
+        """(bytes to send, content type, content encoding, original size)."""
+        extension = os.path.splitext(path)[1].lower()
+        with open(path, "rb") as f:
+            data = f.read()
+        if extension in GZIP_TYPES:
+            # mtime=0 keeps the output (and its MD5) stable for identical content
+            compressed = gzip.compress(data, compresslevel=6, mtime=0)
+            if len(compressed) < len(data):
+                return compressed, GZIP_TYPES[extension], "gzip", len(data)
+            return data, GZIP_TYPES[extension], None, len(data)
+        return data, CONTENT_TYPES.get(extension, "application/octet-stream"), None, len(data)
+
+    def upload_file(self, path: str, blob_name: str, immutable: bool = False) -> bool:
+        """Uploads one file; returns False when the stored object already had the same content."""
+        data, content_type, content_encoding, size = self._payload(path)
+        md5 = base64.b64encode(hashlib.md5(data).digest()).decode("ascii")
+
+        unchanged = self._sent.get(blob_name) == md5
+        # Content-addressed (immutable) names are usually already stored by a previous run
+        if not unchanged and (immutable or len(data) >= DEDUPE_MIN_BYTES):
+            existing = self._with_retries(lambda: self.bucket.get_blob(blob_name, retry=None), f"Lookup of {blob_name}")
+            unchanged = existing is not None and existing.md5_hash == md5 and existing.content_encoding == content_encoding
+        if unchanged:
+            self._count(skipped=1, bytes_saved=size)
+            return False
+
+        blob = self.bucket.blob(blob_name)
+        blob.content_encoding = content_encoding
+        if immutable:
+            blob.cache_control = IMMUTABLE_CACHE_CONTROL
+        self._with_retries(
+            lambda: blob.upload_from_string(data, content_type=content_type, checksum="md5", retry=None),
+            f"Upload of {blob_name}",
+        )
+        with self._lock:
+            self._sent[blob_name] = md5
+        self._count(uploaded=1, bytes_sent=len(data), bytes_saved=size - len(data))
+        return True
+
+    def upload_many(self, files: list) -> UploadStats:
+        """Uploads (path, blob_name, immutable) tuples in parallel; raises the first failure after all finished."""
+        if not files:
+            return self.stats
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(files)), thread_name_prefix="upload") as executor:
+            futures = [executor.submit(self.upload_file, *upload) for upload in files]
+        errors = [future.exception() for future in futures if future.exception()]
+        if errors:
+            raise errors[0]
+        return self.stats
+
+    @staticmethod
+    def dir_files(local_dir: str, prefix: str, immutable: bool = False) -> list:
+        """(path, blob_name, immutable) for every file of local_dir (recursively) under prefix/."""
+        files = []
+        for root, _, names in os.walk(local_dir):
+            for name in sorted(names):
+                path = os.path.join(root, name)
+                relative = os.path.relpath(path, local_dir).replace(os.sep, "/")
+                files.append((path, f"{prefix}/{relative}", immutable))
+        return files
+
+    def url(self, blob_name: str) -> str:
+        return public_url(self.bucket_name, blob_name)
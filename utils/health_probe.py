@@ -0,0 +1,126 @@
+import asyncio
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from urllib.parse import urljoin
+import aiohttp
+from config.config import Config
+from utils.logger import get_logger
+
+
+@dataclass
+class EndpointHealth:
+    url: str
+    ok: bool
+    status: int = None
+    elapsed: float = None
+    error: str = None
+
+
+@dataclass
+class EnvironmentHealth:
+    environment: str
+    ok: bool
+    checked_at: float
+    endpoints: list = field(default_factory=list)
+
+    @property
+    def verdict(self) -> str:
+        """One line explanation, e.g. for a skip reason or a Discord message."""
+        if self.ok:
+            return f"Ambiente disponible ({self.environment})"
+        problems = [
+            f"{endpoint.url} -> {endpoint.error or f'HTTP {endpoint.status}'}"
+            for endpoint in self.endpoints if not endpoint.ok
+        ]
+        return f"Ambiente no disponible ({self.environment}): " + "; ".join(problems)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "EnvironmentHealth":
+        endpoints = [EndpointHealth(**endpoint) for endpoint in data.get("endpoints", [])]
+        return cls(data["environment"], data["ok"], data["checked_at"], endpoints)
+
+
+class HealthProbe:
+    """
+    Checks that the QA environments answer before any browser is launched.
+
+    Every configured path is requested on the environment origin with aiohttp,
+    all endpoints and environments in parallel. An endpoint is healthy when it
+    answers with a non-5xx status before the timeout. Verdicts are cached on
+    disk for a short TTL (one file per environment) so the bot, the pytest
+    controller and its workers share a single probe.
+    """
+
+    def __init__(self, environments: dict = None, paths: list = None, timeout: float = None,
+                 ttl: int = None, cache_dir: str = None):
+        self.logger = get_logger(self.__class__.__name__)
+        self.environments = environments or Config.ENVIRONMENTS
+        self.paths = paths or Config.HEALTH_PROBE_PATHS
+        self.timeout = Config.HEALTH_PROBE_TIMEOUT if timeout is None else timeout
+        self.ttl = Config.HEALTH_PROBE_TTL if ttl is None else ttl
+        self.cache_dir = cache_dir or Config.HEALTH_CACHE_DIR
+
+    def _cache_path(self, environment: str) -> str:
+        return os.path.join(self.cache_dir, f"{environment}.json")
+
+    def cached(self, environment: str):
+        """Returns the cached EnvironmentHealth if it is younger than the TTL, else None."""
+        try:
+            with open(self._cache_path(environment)) as f:
+                health = EnvironmentHealth.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        if time.time() - health.checked_at > self.ttl:
+            return None
+        return health
+
+    def _store(self, health: EnvironmentHealth):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._cache_path(health.environment)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(asdict(health), f)
+        os.replace(tmp_path, path)
+
+    async def _probe_endpoint(self, session: aiohttp.ClientSession, url: str) -> EndpointHealth:
+        start = time.perf_counter()
+        try:
+            async with session.get(url, allow_redirects=True) as response:
+                return EndpointHealth(url, response.status < 500, response.status, round(time.perf_counter() - start, 3))
+        except asyncio.TimeoutError:
+            return EndpointHealth(url, False, elapsed=round(time.perf_counter() - start, 3), error=f"timeout after {self.timeout}s")
+        except aiohttp.ClientError as e:
+            return EndpointHealth(url, False, elapsed=round(time.perf_counter() - start, 3), error=str(e) or e.__class__.__name__)
+
+    async def probe(self, environment: str, session: aiohttp.ClientSession = None) -> EnvironmentHealth:
+        """Probes one environment now (no cache) and stores the verdict."""
+        if session is None:
+            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout)) as session:
+                return await self.probe(environment, session)
+
+        base_url = self.environments[environment]
+        urls = [urljoin(base_url, path) for path in self.paths]
+        endpoints = await asyncio.gather(*(self._probe_endpoint(session, url) for url in urls))
+        health = EnvironmentHealth(environment, all(endpoint.ok for endpoint in endpoints), time.time(), list(endpoints))
+        if not health.ok:
+            self.logger.warning(health.verdict)
+        self._store(health)
+        return health
+
+    async def check(self, environment: str, use_cache: bool = True) -> EnvironmentHealth:
+        if use_cache:
+            health = self.cached(environment)
+            if health:
+                return health
+        return await self.probe(environment)
+
+    async def check_all(self, use_cache: bool = True) -> dict:
+        """Checks every configured environment in parallel; returns {environment: EnvironmentHealth}."""
+        results = await asyncio.gather(*(self.check(environment, use_cache) for environment in self.environments))
+        return {health.environment: health for health in results}
+
+    def check_sync(self, environment: str, use_cache: bool = True) -> EnvironmentHealth:
+        """Blocking variant for pytest hooks (no event loop running there)."""
+        return asyncio.run(self.check(environment, use_cache))
@@ -0,0 +1,256 @@
+"""
+Historical store of suite runs (SQLite), used for duration trends and regressions.
+
+One database file per environment holds every run of every profile: the run
+summary, the duration/outcome of each test and the per-test total of each
+named step (from the timelines in the JSON report metadata). The bot keeps
+the file next to the reports in GCS and updates it with a generation
+precondition, so concurrent runs never overwrite each other's rows.
+"""
+import argparse
+import json
+import math
+import os
+import sqlite3
+import time
+from utils.logger import get_logger
+from utils.report import full_duration
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    environment TEXT NOT NULL,
+    profile TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    duration REAL,
+    passed INTEGER,
+    failed INTEGER,
+    total INTEGER
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id TEXT NOT NULL,
+    nodeid TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    duration REAL NOT NULL,
+    PRIMARY KEY (run_id, nodeid)
+);
+CREATE TABLE IF NOT EXISTS steps (
+    run_id TEXT NOT NULL,
+    nodeid TEXT NOT NULL,
+    step TEXT NOT NULL,
+    duration REAL NOT NULL,
+    PRIMARY KEY (run_id, nodeid, step)
+);
+CREATE INDEX IF NOT EXISTS runs_by_suite ON runs (environment, profile, started_at);
+CREATE INDEX IF NOT EXISTS results_by_test ON results (nodeid);
+"""
+
+# Defaults: baseline = last 20 runs of the same environment/profile, flag tests 20% slower
+# than their baseline median once at least 3 samples exist
+DEFAULT_WINDOW = int(os.getenv("HISTORY_WINDOW", 20))
+DEFAULT_THRESHOLD = float(os.getenv("HISTORY_REGRESSION_THRESHOLD", 0.2))
+MIN_SAMPLES = 3
+
+
+def percentile(values: list, q: float) -> float:
+    """Nearest-rank percentile (q in 0..100) of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def stats(values: list) -> dict:
+    """count/p50/p95/mean/min/max of a list of durations ({"count": 0} when empty)."""
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "p50": round(percentile(values, 50), 4),
+        "p95": round(percentile(values, 95), 4),
+        "mean": round(sum(values) / len(values), 4),
+        "min": round(min(values), 4),
+        "max": round(max(values), 4),
+    }
+
+
+class HistoryStore:
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def record_run(self, run_id: str, environment: str, profile: str, report: dict):
+        """Stores one pytest-json-report result. Re-recording the same run_id replaces it."""
+        tests = report.get("tests", [])
+        summary = report.get("summary", {})
+        with self.conn:
+            for table in ("runs", "results", "steps"):
+                self.conn.execute(f"DELETE FROM {table} WHERE run_id = ?", (run_id,))
+            self.conn.execute(
+                "INSERT INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, environment, profile, report.get("created", time.time()), report.get("duration"),
+                 summary.get("passed", 0), summary.get("failed", 0), summary.get("total", 0)),
+            )
+            self.conn.executemany(
+                "INSERT INTO results VALUES (?, ?, ?, ?)",
+                [(run_id, test["nodeid"], test["outcome"], full_duration(test)) for test in tests],
+            )
+            steps = {}
+            for test in tests:
+                for span in test.get("metadata", {}).get("timeline", {}).get("spans", []):
+                    if span["kind"] == "step":
+                        key = (test["nodeid"], span["name"])
+                        steps[key] = steps.get(key, 0) + span["duration"]
+            self.conn.executemany(
+                "INSERT INTO steps VALUES (?, ?, ?, ?)",
+                [(run_id, nodeid, step, duration) for (nodeid, step), duration in steps.items()],
+            )
+
+    def _baseline_runs(self, run_id: str, environment: str, profile: str, window: int) -> list:
+        rows = self.conn.execute(
+            "SELECT run_id FROM runs WHERE environment = ? AND profile = ? AND run_id != ? "
+            "AND started_at <= (SELECT started_at FROM runs WHERE run_id = ?) "
+            "ORDER BY started_at DESC LIMIT ?",
+            (environment, profile, run_id, run_id, window),
+        )
+        return [row[0] for row in rows]
+
+    def test_durations(self, environment: str, profile: str = None, window: int = DEFAULT_WINDOW) -> dict:
+        """nodeid -> p50 duration of the passing results over the last `window` runs (scheduling hints)."""
+        query = "SELECT run_id FROM runs WHERE environment = ?"
+        params = [environment]
+        if profile:
+            query += " AND profile = ?"
+            params.append(profile)
+        run_ids = [row[0] for row in self.conn.execute(query + " ORDER BY started_at DESC LIMIT ?", params + [window])]
+        if not run_ids:
+            return {}
+        samples = {}
+        rows = self.conn.execute(
+            f"SELECT nodeid, duration FROM results WHERE outcome = 'passed' AND run_id IN ({','.join('?' * len(run_ids))})",
+            run_ids,
+        )
+        for nodeid, duration in rows:
+            samples.setdefault(nodeid, []).append(duration)
+        return {nodeid: percentile(durations, 50) for nodeid, durations in samples.items()}
+
+    def analyze(self, run_id: str, window: int = DEFAULT_WINDOW, threshold: float = DEFAULT_THRESHOLD) -> dict:
+        """
+        Compares a recorded run against the rolling baseline of its environment/profile:
+        p50/p95 of each test over the previous `window` passing runs, the relative change of
+        this run and whether it is a regression (passed, and slower than p50 * (1 + threshold)).
+        """
+        run = self.conn.execute("SELECT environment, profile FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        if run is None:
+            return {}
+        environment, profile = run
+        baseline = self._baseline_runs(run_id, environment, profile, window)
+        placeholders = ",".join("?" * len(baseline))
+
+        samples = {}
+        if baseline:
+            rows = self.conn.execute(
+                f"SELECT nodeid, duration FROM results WHERE outcome = 'passed' AND run_id IN ({placeholders})",
+                baseline,
+            )
+            for nodeid, duration in rows:
+                samples.setdefault(nodeid, []).append(duration)
+
+        tests = []
+        for nodeid, outcome, duration in self.conn.execute(
+            "SELECT nodeid, outcome, duration FROM results WHERE run_id = ? ORDER BY nodeid", (run_id,)
+        ):
+            durations = samples.get(nodeid, [])
+            entry = {"nodeid": nodeid, "outcome": outcome, "duration": round(duration, 3), "samples": len(durations)}
+            if durations:
+                p50 = percentile(durations, 50)
+                entry.update(p50=round(p50, 3), p95=round(percentile(durations, 95), 3))
+                entry["change"] = round((duration - p50) / p50, 3) if p50 else None
+                entry["regression"] = (
+                    outcome == "passed" and len(durations) >= MIN_SAMPLES and p50 > 0
+                    and duration > p50 * (1 + threshold)
+                )
+            else:
+                entry["regression"] = False
+            tests.append(entry)
+
+        runs = [
+            {"run_id": row[0], "started_at": row[1], "duration": row[2], "passed": row[3], "failed": row[4]}
+            for row in self.conn.execute(
+                "SELECT run_id, started_at, duration, passed, failed FROM runs WHERE environment = ? AND profile = ? "
+                "AND started_at <= (SELECT started_at FROM runs WHERE run_id = ?) ORDER BY started_at DESC LIMIT ?",
+                (environment, profile, run_id, window + 1),
+            )
+        ][::-1]
+
+        return {
+            "environment": environment,
+            "profile": profile,
+            "window": window,
+            "threshold": threshold,
+            "baseline_runs": len(baseline),
+            "regressions": sum(1 for test in tests if test["regression"]),
+            "tests": tests,
+            "runs": runs,
+        }
+
+
+def sync_history(bucket, blob_name: str, local_path: str, run_id: str, environment: str, profile: str,
+                 report: dict, attempts: int = 5) -> dict:
+    """
+    Downloads the history database from GCS, records the run and uploads it back with
+    if_generation_match, retrying from a fresh copy when another run updated it first.
+    Returns the analysis of the run.
+    """
+    from google.api_core.exceptions import NotFound, PreconditionFailed
+
+    logger = get_logger("HistorySync")
+    blob = bucket.blob(blob_name)
+    for attempt in range(1, attempts + 1):
+        if os.path.exists(local_path):
+            os.remove(local_path)
+        try:
+            blob.reload()
+            generation = blob.generation
+            blob.download_to_filename(local_path)
+        except NotFound:
+            generation = 0  # only succeeds if nobody created the file meanwhile
+
+        with HistoryStore(local_path) as store:
+            store.record_run(run_id, environment, profile, report)
+            analysis = store.analyze(run_id)
+        try:
+            blob.upload_from_filename(local_path, if_generation_match=generation)
+            return analysis
+        except PreconditionFailed:
+            logger.info(f"History {blob_name} changed concurrently, retrying ({attempt}/{attempts})")
+    logger.warning(f"Could not update history {blob_name} after {attempts} attempts")
+    return analysis
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Registra un reporte JSON en el histórico local y muestra su análisis")
+    parser.add_argument("json_report")
+    parser.add_argument("--db", default="history.sqlite")
+    parser.add_argument("--run-id", required=True)
+    parser.add_argument("--profile", default="agente")
+    parser.add_argument("--env", default="pantera")
+    args = parser.parse_args()
+    with open(args.json_report) as f:
+        report = json.load(f)
+    with HistoryStore(args.db) as store:
+        store.record_run(args.run_id, args.env, args.profile, report)
+        print(json.dumps(store.analyze(args.run_id), indent=2))
+
+
+if __name__ == "__main__":
+    main()
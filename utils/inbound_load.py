@@ -0,0 +1,458 @@
+"""
+Inbound email load scenario: many agents online, a burst of emails, end-to-end latency per message.
+
+N agents log in as isolated contexts of one Chromium (the asyncio page objects,
+as in utils.multi_agent) and stay on the dashboard. Then a burst of emails is
+sent through EmailSender, each with a unique token in the subject, and every
+dashboard reports (MutationObserver + exposed binding) the moment a chat-card
+with a token is rendered. Per message the latency is the time from the start
+of its SMTP transaction to the card being rendered on whichever agent the
+console routed it to; the report has the percentiles, the routing per agent and
+distribution charts.
+
+By default everything is local: the mock console (utils.mock_console) and an
+SMTP stand-in (utils.smtp_stub) whose emails become incoming chats.
+
+    python -m utils.inbound_load --agents 20 --emails 200 -o inbound_load.json --html inbound_load.html
+
+Against a QA environment the emails go through the SMTP_* configuration to
+--to, and one account per agent is needed in AGENT_ACCOUNTS.
+"""
+import argparse
+import asyncio
+import html
+import json
+import sys
+import time
+import uuid
+from string import Template
+from playwright.async_api import async_playwright
+from config.config import Config
+from pages.async_api.agent_dashboard_page import AgentDashboardPage
+from pages.async_api.login_page import LoginPage
+from utils.browser_pool import CHROMIUM_ARGS, CONTEXT_OPTIONS
+from utils.email_sender import EmailSender
+from utils.history import percentile, stats
+from utils.logger import get_logger
+from utils.mock_console import MockConsole, MockSettings
+from utils.multi_agent import agent_accounts
+from utils.report import format_seconds
+from utils.resource_monitor import ResourceMonitor
+from utils.smtp_stub import SmtpStub
+
+HISTOGRAM_BINS = 20
+BINDING = "__inboundLoadChatCard"
+# Reports every token seen in a chat-card, once per page. Filled with the binding and the token pattern.
+WATCHER_SCRIPT = Template("""
+(function () {
+  var pattern = new RegExp($pattern, "g");
+  var seen = {};
+  function scan() {
+    document.querySelectorAll("chat-card").forEach(function (card) {
+      (card.textContent.match(pattern) || []).forEach(function (token) {
+        if (!seen[token]) {
+          seen[token] = true;
+          window.$binding(token);
+        }
+      });
+    });
+  }
+  new MutationObserver(scan).observe(document, {childList: true, subtree: true, characterData: true});
+})();
+""")
+
+
+def latency_stats(values: list) -> dict:
+    """stats() plus the p90/p99 tail used for load results."""
+    result = stats(values)
+    if values:
+        result["p90"] = round(percentile(values, 90), 4)
+        result["p99"] = round(percentile(values, 99), 4)
+    return result
+
+
+def histogram(values: list, bins: int = HISTOGRAM_BINS) -> dict:
+    if not values:
+        return {"edges": [], "counts": []}
+    low, high = min(values), max(values)
+    width = (high - low) / bins or 1
+    counts = [0] * bins
+    for value in values:
+        counts[min(int((value - low) / width), bins - 1)] += 1
+    return {"edges": [round(low + width * index, 3) for index in range(bins + 1)], "counts": counts}
+
+
+class InboundLoadRunner:
+    def __init__(self, base_url: str, accounts: list, sender: EmailSender, to_email: str, emails: int = 50,
+                 concurrency: int = None, ramp_up: float = 0.2, timeout: float = 60, headless: bool = True):
+        self.logger = get_logger(self.__class__.__name__)
+        self.base_url = base_url
+        self.accounts = accounts
+        self.sender = sender
+        self.to_email = to_email
+        self.emails = emails
+        self.concurrency = concurrency
+        self.ramp_up = ramp_up
+        self.timeout = timeout
+        self.headless = headless
+        self.monitor = ResourceMonitor(interval=0.5)
+        # Unique per run, so cards left over from a previous run never match
+        self.run_id = uuid.uuid4().hex[:8]
+        self.seen = {}
+        self._expected = set()
+        self._all_seen = None
+
+    def token(self, index: int) -> str:
+        return f"LT{self.run_id}-{index:05d}"
+
+    def _on_card(self, agent: str, token: str):
+        # First agent wins: the same token on a second agent would be a routing duplicate
+        if token in self.seen:
+            self.seen[token].setdefault("duplicates", []).append(agent)
+            return
+        self.seen[token] = {"agent": agent, "seen_at": time.time()}
+        if self._expected and self._expected <= self.seen.keys():
+            self._all_seen.set()
+
+    async def _login(self, browser, index: int, account: dict) -> dict:
+        await asyncio.sleep(index * self.ramp_up)
+        agent = {"agent": account["email"], "error": None}
+        start = time.perf_counter()
+        try:
+            # Closed with the browser: the dashboards stay open until the last card arrives
+            context = await browser.new_context(**CONTEXT_OPTIONS)
+            await context.expose_binding(BINDING, lambda source, token: self._on_card(account["email"], token))
+            await context.add_init_script(WATCHER_SCRIPT.substitute(
+                pattern=json.dumps(f"LT{self.run_id}-\\d+"), binding=BINDING,
+            ))
+            page = await context.new_page()
+            login_page = LoginPage(page)
+            await login_page.navigate(self.base_url)
+            await login_page.login(account["email"], account["password"])
+
+            dashboard = AgentDashboardPage(page)
+            await dashboard.handle_popup()
+            # Only Online agents get chats routed to them
+            if "Online" not in await dashboard.get_status_text():
+                await dashboard.set_status("Online")
+            if not await dashboard.is_chats_header_visible():
+                raise RuntimeError("Chat list not rendered")
+        except Exception as e:
+            agent["error"] = f"{type(e).__name__}: {e}"
+            self.logger.error(f"Agent {account['email']} could not get online: {e}")
+        agent["login_duration"] = round(time.perf_counter() - start, 4)
+        return agent
+
+    def _messages(self) -> list:
+        return [
+            (f"Load Test Email {self.token(index)}", "Inbound load test email sent by the automation framework.", self.to_email)
+            for index in range(self.emails)
+        ]
+
+    async def run(self) -> dict:
+        self._all_seen = asyncio.Event()
+        self.monitor.start()
+        try:
+            async with async_playwright() as playwright:
+                browser = await playwright.chromium.launch(headless=self.headless, args=CHROMIUM_ARGS)
+                try:
+                    agents = await asyncio.gather(*(
+                        self._login(browser, index, account) for index, account in enumerate(self.accounts)
+                    ))
+                    online = [agent for agent in agents if agent["error"] is None]
+                    if not online:
+                        raise RuntimeError("No agent got online, nothing would receive the emails")
+                    self.logger.info(f"{len(online)}/{len(agents)} agents online, sending {self.emails} emails")
+
+                    burst_start = time.time()
+                    # EmailSender is thread based: the loop keeps serving the bindings meanwhile
+                    deliveries = await asyncio.to_thread(self.sender.send_batch, self._messages(), self.concurrency)
+                    burst_end = time.time()
+                    self._expected = {
+                        self.token(index) for index, delivery in enumerate(deliveries) if delivery.ok
+                    }
+                    if self._expected <= self.seen.keys():
+                        self._all_seen.set()
+                    try:
+                        await asyncio.wait_for(self._all_seen.wait(), self.timeout)
+                    except asyncio.TimeoutError:
+                        self.logger.warning(
+                            f"{len(self._expected - self.seen.keys())} emails not shown after {self.timeout:.0f}s"
+                        )
+                finally:
+                    await browser.close()
+        finally:
+            self.monitor.stop()
+        return self._result(agents, deliveries, burst_start, burst_end)
+
+    def _result(self, agents: list, deliveries: list, burst_start: float, burst_end: float) -> dict:
+        messages = []
+        for index, delivery in enumerate(deliveries):
+            token = self.token(index)
+            card = self.seen.get(token, {})
+            # The SMTP transaction start (after the rate limiter and the wait for a connection)
+            sent_at = delivery.sent_at - delivery.duration if delivery.ok else None
+            messages.append({
+                "token": token,
+                "sent": delivery.ok,
+                "error": delivery.error,
+                "agent": card.get("agent"),
+                "duplicates": card.get("duplicates", []),
+                "queue_wait": delivery.wait,
+                "smtp": delivery.duration,
+                "offset": round(sent_at - burst_start, 4) if sent_at else None,
+                "latency": round(card["seen_at"] - sent_at, 4) if card and sent_at else None,
+            })
+
+        latencies = [message["latency"] for message in messages if message["latency"] is not None]
+        per_agent = {}
+        for agent in agents:
+            values = [message["latency"] for message in messages if message["agent"] == agent["agent"]]
+            per_agent[agent["agent"]] = {
+                "online": agent["error"] is None,
+                "error": agent["error"],
+                "login_duration": agent["login_duration"],
+                "chats": len(values),
+                "latency": latency_stats(values),
+            }
+        received = sum(1 for message in messages if message["latency"] is not None)
+        return {
+            "run_id": self.run_id,
+            "created_at": time.time(),
+            "base_url": self.base_url,
+            "agents": len(agents),
+            "agents_online": sum(1 for agent in agents if agent["error"] is None),
+            "emails": len(messages),
+            "sent": sum(1 for message in messages if message["sent"]),
+            "received": received,
+            "missing": sum(1 for message in messages if message["sent"] and message["latency"] is None),
+            "duplicated": sum(1 for message in messages if message["duplicates"]),
+            "burst_duration": round(burst_end - burst_start, 3),
+            "send_rate": round(len(messages) / max(burst_end - burst_start, 1e-6), 2),
+            "latency": latency_stats(latencies),
+            "smtp": latency_stats([message["smtp"] for message in messages if message["sent"]]),
+            "histogram": histogram(latencies),
+            "per_agent": per_agent,
+            "resources": self.monitor.usage(),
+            "messages": messages,
+        }
+
+
+REPORT_TEMPLATE = Template("""<!DOCTYPE html>
+<html lang="es">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Carga de emails entrantes - $run_id</title>
+    <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
+    <style>
+        body { font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; background-color: #1e1e1e; color: #e0e0e0; margin: 0; padding: 20px; }
+        .container { max-width: 1200px; margin: 0 auto; background-color: #2d2d2d; padding: 30px; border-radius: 10px; box-shadow: 0 4px 15px rgba(0,0,0,0.5); }
+        h1 { text-align: center; color: #ffffff; border-bottom: 2px solid #444; padding-bottom: 10px; }
+        .stats { display: flex; flex-wrap: wrap; gap: 10px; margin-bottom: 20px; }
+        .stat-item { background: #333; padding: 12px 16px; border-radius: 8px; flex: 1; min-width: 140px; }
+        .stat-value { display: block; font-size: 1.4em; font-weight: bold; }
+        .passed { color: #4caf50; }
+        .failed { color: #f44336; }
+        .charts { display: grid; grid-template-columns: 1fr 1fr; gap: 20px; }
+        .chart-container { background: #333; border-radius: 8px; padding: 10px; height: 300px; position: relative; }
+        table { width: 100%; border-collapse: collapse; margin-top: 20px; font-size: 0.9em; background: #333; border-radius: 8px; }
+        td, th { padding: 6px; text-align: right; }
+        td:first-child, th:first-child { text-align: left; }
+        .footer { text-align: center; margin-top: 20px; color: #777; font-size: 0.8em; }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <h1>Carga de emails entrantes</h1>
+        <div class="stats">
+            <div class="stat-item">Agentes online<span class="stat-value">$agents_online / $agents</span></div>
+            <div class="stat-item">Emails enviados<span class="stat-value">$sent / $emails</span></div>
+            <div class="stat-item">Recibidos<span class="stat-value $received_class">$received</span></div>
+            <div class="stat-item">Latencia p50<span class="stat-value">$p50</span></div>
+            <div class="stat-item">Latencia p95<span class="stat-value">$p95</span></div>
+            <div class="stat-item">Latencia p99<span class="stat-value">$p99</span></div>
+            <div class="stat-item">Ráfaga<span class="stat-value">$burst_duration s ($send_rate/s)</span></div>
+        </div>
+        <div class="charts">
+            <div class="chart-container"><canvas id="histogram"></canvas></div>
+            <div class="chart-container"><canvas id="cdf"></canvas></div>
+            <div class="chart-container"><canvas id="timeline"></canvas></div>
+            <div class="chart-container"><canvas id="agents"></canvas></div>
+        </div>
+        <table>
+            <tr><th>Agente</th><th>Chats</th><th>p50</th><th>p95</th><th>Máx</th><th>Login</th><th>Error</th></tr>
+$agent_rows
+        </table>
+        <div class="footer">Ejecución $run_id · generado el $generated</div>
+    </div>
+    <script>
+        const data = $data;
+        const axes = (x, y) => ({
+            x: { title: { display: true, text: x, color: '#aaa' }, ticks: { color: '#aaa' } },
+            y: { title: { display: true, text: y, color: '#aaa' }, ticks: { color: '#aaa' } }
+        });
+        const options = (title, x, y) => ({
+            responsive: true, maintainAspectRatio: false, scales: axes(x, y),
+            plugins: { title: { display: true, text: title, color: '#fff' }, legend: { labels: { color: '#fff' } } }
+        });
+        new Chart(document.getElementById('histogram'), {
+            type: 'bar',
+            data: { labels: data.histogram.edges.slice(0, -1).map(edge => edge.toFixed(2)),
+                    datasets: [{ label: 'Emails', data: data.histogram.counts, backgroundColor: '#3f51b5' }] },
+            options: options('Distribución de latencia', 'Latencia envío → chat-card (s)', 'Emails')
+        });
+        new Chart(document.getElementById('cdf'), {
+            type: 'line',
+            data: { datasets: [{ label: '% de emails recibidos', data: data.cdf, borderColor: '#03a9f4', pointRadius: 0, stepped: true }] },
+            options: options('Latencia acumulada', 'Latencia (s)', '%')
+        });
+        new Chart(document.getElementById('timeline'), {
+            type: 'scatter',
+            data: { datasets: [{ label: 'Email', data: data.timeline, backgroundColor: '#4caf50' }] },
+            options: options('Latencia según el momento de envío', 'Segundos desde el inicio de la ráfaga', 'Latencia (s)')
+        });
+        new Chart(document.getElementById('agents'), {
+            type: 'bar',
+            data: { labels: data.agents.map(agent => agent.name),
+                    datasets: [{ label: 'Chats', data: data.agents.map(agent => agent.chats), backgroundColor: '#607d8b', yAxisID: 'y' },
+                               { label: 'p95 (s)', data: data.agents.map(agent => agent.p95), backgroundColor: '#f44336', yAxisID: 'y1' }] },
+            options: Object.assign(options('Reparto por agente', 'Agente', 'Chats'), {
+                scales: Object.assign(axes('Agente', 'Chats'), { y1: { position: 'right', ticks: { color: '#aaa' }, grid: { drawOnChartArea: false } } })
+            })
+        });
+    </script>
+</body>
+</html>
+""")
+
+
+def write_html(result: dict, path: str):
+    latencies = sorted(message["latency"] for message in result["messages"] if message["latency"] is not None)
+    total = result["sent"] or 1
+    rows = []
+    for name, agent in result["per_agent"].items():
+        latency = agent["latency"]
+        rows.append(
+            f'            <tr><td>{html.escape(name)}</td><td>{agent["chats"]}</td><td>{format_seconds(latency.get("p50"))}</td>'
+            f'<td>{format_seconds(latency.get("p95"))}</td><td>{format_seconds(latency.get("max"))}</td>'
+            f'<td>{format_seconds(agent["login_duration"])}</td><td class="failed">{html.escape(agent["error"] or "")}</td></tr>'
+        )
+    data = {
+        "histogram": result["histogram"],
+        "cdf": [{"x": value, "y": round((index + 1) / total * 100, 2)} for index, value in enumerate(latencies)],
+        "timeline": [
+            {"x": message["offset"], "y": message["latency"]}
+            for message in result["messages"] if message["latency"] is not None
+        ],
+        "agents": [
+            {"name": name, "chats": agent["chats"], "p95": agent["latency"].get("p95")}
+            for name, agent in result["per_agent"].items()
+        ],
+    }
+    latency = result["latency"]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(REPORT_TEMPLATE.substitute(
+            run_id=result["run_id"],
+            agents=result["agents"],
+            agents_online=result["agents_online"],
+            emails=result["emails"],
+            sent=result["sent"],
+            received=result["received"],
+            received_class="passed" if not result["missing"] else "failed",
+            p50=format_seconds(latency.get("p50")),
+            p95=format_seconds(latency.get("p95")),
+            p99=format_seconds(latency.get("p99")),
+            burst_duration=result["burst_duration"],
+            send_rate=result["send_rate"],
+            agent_rows="\n".join(rows),
+            generated=time.strftime("%d/%m/%Y %H:%M:%S"),
+            # </ would close the script tag early
+            data=json.dumps(data).replace("</", "<\\/"),
+        ))
+
+
+def print_summary(result: dict):
+    latency = result["latency"]
+    print(
+        f"{result['agents_online']}/{result['agents']} agentes online, "
+        f"{result['received']}/{result['sent']} emails recibidos ({result['missing']} faltantes, "
+        f"{result['duplicated']} duplicados)"
+    )
+    print(f"Ráfaga de {result['emails']} emails en {result['burst_duration']:.1f}s ({result['send_rate']:.1f}/s)")
+    if latency["count"]:
+        print(
+            f"Latencia envío → chat-card: p50 {latency['p50']:.2f}s, p90 {latency['p90']:.2f}s, "
+            f"p95 {latency['p95']:.2f}s, p99 {latency['p99']:.2f}s, máx {latency['max']:.2f}s"
+        )
+    chats = [agent["chats"] for agent in result["per_agent"].values() if agent["online"]]
+    if chats:
+        print(f"Chats por agente: mín {min(chats)}, máx {max(chats)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Escenario de carga: muchos agentes recibiendo una ráfaga de emails entrantes")
+    parser.add_argument("--env", default="mock", choices=sorted(Config.ENVIRONMENTS), help="Ambiente contra el que correr")
+    parser.add_argument("--agents", type=int, default=10, help="Agentes online al mismo tiempo")
+    parser.add_argument("--emails", type=int, default=50, help="Emails de la ráfaga")
+    parser.add_argument("--concurrency", type=int, help="Envíos SMTP simultáneos (por defecto SMTP_POOL_SIZE)")
+    parser.add_argument("--rate", type=float, default=None, help="Máximo de emails por segundo (0 = sin límite)")
+    parser.add_argument("--to", default="qapantera@chattigo.com", help="Casilla del canal de email (ambientes reales)")
+    parser.add_argument("--timeout", type=float, default=60, help="Segundos de espera para que aparezcan todos los chats")
+    parser.add_argument("--ramp-up", type=float, default=0.2, help="Segundos entre el login de un agente y el siguiente")
+    parser.add_argument("--poll-interval", type=float, default=None, help="Consulta de chats del dashboard simulado (segundos)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Demora de la API simulada (segundos)")
+    parser.add_argument("--headed", action="store_true")
+    parser.add_argument("-o", "--output", help="Archivo JSON con el resultado")
+    parser.add_argument("--html", help="Reporte HTML con los gráficos de distribución")
+    args = parser.parse_args()
+
+    try:
+        accounts = agent_accounts(args.env, args.agents)
+    except ValueError as e:
+        parser.error(str(e))
+
+    console = smtp = None
+    try:
+        if args.env == "mock":
+            settings = MockSettings.from_env()
+            settings.latency = args.latency
+            if args.poll_interval is not None:
+                settings.chat_poll_interval = args.poll_interval
+            console = MockConsole.on_free_port(settings=settings).start()
+            smtp = SmtpStub.on_free_port(on_message=console.add_email_chat).start()
+            base_url = console.login_url
+            sender = EmailSender("127.0.0.1", smtp.port, "inbound-load@example.com", starttls=False, rate_limit=args.rate)
+            # The stub has no AUTH: ignore an SMTP_PASSWORD meant for the real server
+            sender.password = None
+        else:
+            base_url = Config.ENVIRONMENTS[args.env]
+            sender = EmailSender(rate_limit=args.rate)
+        Config.BASE_URL = base_url
+
+        runner = InboundLoadRunner(
+            base_url, accounts, sender, args.to, emails=args.emails, concurrency=args.concurrency,
+            ramp_up=args.ramp_up, timeout=args.timeout, headless=not args.headed,
+        )
+        with sender:
+            result = asyncio.run(runner.run())
+    finally:
+        if smtp is not None:
+            smtp.stop()
+        if console is not None:
+            console.stop()
+
+    print_summary(result)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"Resultados en {args.output}")
+    if args.html:
+        write_html(result, args.html)
+        print(f"Reporte en {args.html}")
+    if result["missing"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1005 @@
+"""
+Local stand-in of the Chattigo agent console (aiohttp).
+
+Serves minimal pages with the same selectors the page objects rely on (login
+form, state selector and timers, the 'Entendido' popup, chat cards, the
+Enviar Outbound wizard) backed by a small in-memory JSON API, so the suite can
+run offline and the framework's own overhead can be measured without loading
+the QA environments. Backend latency, jitter and failures are injected on the
+/api/ routes. Start it and run the suite with --env=mock:
+
+    python -m utils.mock_console --port 8765 --latency 0.2 --failure-rate 0.02
+    pytest tests/agente --env=mock
+
+Control endpoints (outside /api/, never delayed nor failed):
+    GET  /__mock/stats      request counters, sent outbounds, uploads
+    POST /__mock/settings   change any MockSettings field at runtime (JSON)
+    POST /__mock/chats      add an incoming chat {"sender", "subject", "body"}
+
+Incoming chats are routed like the real console does: to the least busy agent
+that is Online and has the dashboard open (polled its chats recently), or
+queued until one is. With --smtp-port, emails sent to that local SMTP server
+become incoming chats, so the inbound email tests run against the mock too.
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import hmac
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from dataclasses import asdict, dataclass, fields
+from aiohttp import web
+from config.config import Config
+from utils.logger import get_logger
+from utils.smtp_stub import SmtpStub
+
+DEFAULT_PORT = int(os.getenv("MOCK_CONSOLE_PORT", 8765))
+TOKEN_SECRET = os.getenv("MOCK_CONSOLE_SECRET", "chattigo-mock-console").encode()
+LOGIN_PATH = "/login/pages/login"
+
+CAMPAIGNS = ["Campaña automation", "PruebasQA Hija 1"]
+CHANNELS = ["5215639549198", "5215500000000"]
+# (name, language, attachment: "file", "url" or None). Names that are prefixes of
+# others come first, as the page objects click the first option containing the name.
+TEMPLATES = [
+    ("bienvenida_rapida_hija1", "es", None),
+    ("bienvenida_rapida_auto", "es", None),
+    ("qa_documento", "es", "file"),
+    ("qa_documento_url", "es", "url"),
+    ("qa_imagen", "es", "file"),
+    ("qa_imagen_url", "es", "url"),
+    ("qa_video_url", "es", "url"),
+    ("qa_header_boton", "es", None),
+    ("qa_asterisco_inicio", "es", None),
+    ("qa_plantilla_portugues", "pt_BR", None),
+    ("qa_plantila_ingles", "en", None),
+    ("qa_boton_llamar", "es", None),
+]
+AGENTS = ["Yo", "Agente específico"]
+AGENT_STATES = ["Online", "Descanso"]
+CLOSE_REASONS = ["Cierre", "Spam", "Sin respuesta"]
+
+
+@dataclass
+class MockSettings:
+    # Seconds added to every matching request, plus up to `jitter` more
+    latency: float = 0.0
+    jitter: float = 0.0
+    # Share of matching requests answered with HTTP 503
+    failure_rate: float = 0.0
+    # Path prefixes that get the latency and failures
+    fault_paths: tuple = ("/api/",)
+    # Share of dashboard loads that show the 'Entendido' popup, and its delay
+    popup_rate: float = 1.0
+    popup_delay: float = 0.0
+    chat_poll_interval: float = 2.0
+    session_ttl: int = 3600
+
+    @classmethod
+    def from_env(cls) -> "MockSettings":
+        return cls(
+            latency=float(os.getenv("MOCK_CONSOLE_LATENCY", 0)),
+            jitter=float(os.getenv("MOCK_CONSOLE_JITTER", 0)),
+            failure_rate=float(os.getenv("MOCK_CONSOLE_FAILURE_RATE", 0)),
+            popup_rate=float(os.getenv("MOCK_CONSOLE_POPUP_RATE", 1)),
+            popup_delay=float(os.getenv("MOCK_CONSOLE_POPUP_DELAY", 0)),
+            chat_poll_interval=float(os.getenv("MOCK_CONSOLE_CHAT_POLL_INTERVAL", 2)),
+        )
+
+    def update(self, values: dict):
+        names = {field.name for field in fields(self)}
+        unknown = set(values) - names
+        if unknown:
+            raise ValueError(f"Unknown settings: {', '.join(sorted(unknown))}")
+        for name, value in values.items():
+            setattr(self, name, tuple(value) if name == "fault_paths" else value)
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def issue_token(user: str, ttl: int) -> str:
+    """HMAC-signed JWT, so SessionCache sees a real 'exp' claim."""
+    header = _b64(json.dumps({"alg": "HS256", "typ": "JWT"}).encode())
+    payload = _b64(json.dumps({"sub": user, "exp": int(time.time()) + ttl}).encode())
+    signature = hmac.new(TOKEN_SECRET, f"{header}.{payload}".encode(), hashlib.sha256).digest()
+    return f"{header}.{payload}.{_b64(signature)}"
+
+
+def verify_token(token: str):
+    """Returns the user of a valid, unexpired token, else None."""
+    try:
+        header, payload, signature = token.split(".")
+        expected = hmac.new(TOKEN_SECRET, f"{header}.{payload}".encode(), hashlib.sha256).digest()
+        if not hmac.compare_digest(_b64(expected), signature):
+            return None
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+    except (ValueError, TypeError):
+        return None
+    return claims["sub"] if claims.get("exp", 0) > time.time() else None
+
+
+class ConsoleState:
+    """In-memory backend shared by every page served (and by MockConsole callers in other threads)."""
+
+    def __init__(self, accounts: dict = None):
+        self.accounts = accounts if accounts is not None else {user["email"]: user["password"] for user in Config.USERS}
+        self.agents = {}
+        self.chats = {}
+        self.outbounds = []
+        self.uploads = []
+        self.requests = {}
+        self.injected_failures = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def check_credentials(self, user: str, password: str) -> bool:
+        # Accounts outside the configured pool log in with the default password
+        return bool(user) and password == self.accounts.get(user, Config.PASSWORD)
+
+    def _agent_entry(self, user: str) -> dict:
+        # present_until: the agent counts as connected until then (renewed by every chat poll)
+        return self.agents.setdefault(user, {
+            "state": "Online", "since": time.time(), "online": 0.0, "pause": 0.0, "present_until": 0.0, "assigned_at": 0.0,
+        })
+
+    def count(self, route: str):
+        with self._lock:
+            self.requests[route] = self.requests.get(route, 0) + 1
+
+    def agent(self, user: str) -> dict:
+        with self._lock:
+            agent = self._agent_entry(user)
+            now = time.time()
+            # Fold the time spent in the current state into its counter
+            agent["online" if agent["state"] == "Online" else "pause"] += now - agent["since"]
+            agent["since"] = now
+            return {"state": agent["state"], "online_seconds": int(agent["online"]), "pause_seconds": int(agent["pause"])}
+
+    def set_agent_state(self, user: str, state: str) -> dict:
+        self.agent(user)
+        with self._lock:
+            self.agents[user]["state"] = state
+        return self.agent(user)
+
+    def _route(self, chat: dict, now: float):
+        """Assigns a chat to the least busy connected Online agent (longest idle first on ties)."""
+        available = [
+            user for user, agent in self.agents.items() if agent["state"] == "Online" and agent["present_until"] > now
+        ]
+        if not available:
+            return
+        load = {user: 0 for user in available}
+        for other in self.chats.values():
+            if other["agent"] in load:
+                load[other["agent"]] += 1
+        chat["agent"] = min(available, key=lambda user: (load[user], self.agents[user]["assigned_at"]))
+        chat["assigned_at"] = now
+        self.agents[chat["agent"]]["assigned_at"] = now
+
+    def add_chat(self, sender: str, subject: str, body: str) -> dict:
+        with self._lock:
+            now = time.time()
+            chat = {
+                "id": next(self._ids), "sender": sender, "subject": subject, "body": body,
+                "received_at": now, "agent": None, "assigned_at": None,
+            }
+            self._route(chat, now)
+            self.chats[chat["id"]] = chat
+            return dict(chat)
+
+    def chats_for(self, user: str, presence: float) -> list:
+        """Chats assigned to `user`, who stays connected for `presence` seconds; queued chats are routed first."""
+        with self._lock:
+            now = time.time()
+            self._agent_entry(user)["present_until"] = now + presence
+            for chat in sorted(self.chats.values(), key=lambda chat: chat["received_at"]):
+                if chat["agent"] is None:
+                    self._route(chat, now)
+            return sorted(
+                (dict(chat) for chat in self.chats.values() if chat["agent"] == user),
+                key=lambda chat: -chat["received_at"],
+            )
+
+    def close_chat(self, chat_id: int, reason: str) -> bool:
+        with self._lock:
+            return self.chats.pop(chat_id, None) is not None
+
+    def record(self, collection: list, item: dict) -> dict:
+        with self._lock:
+            item = dict(item, id=next(self._ids), at=time.time())
+            collection.append(item)
+            return item
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests": dict(self.requests),
+                "injected_failures": self.injected_failures,
+                "outbounds": len(self.outbounds),
+                "uploads": len(self.uploads),
+                "open_chats": len(self.chats),
+                "queued_chats": sum(1 for chat in self.chats.values() if chat["agent"] is None),
+            }
+
+
+LOGIN_HTML = """<!DOCTYPE html>
+<html lang="es"><head><meta charset="utf-8"><title>Chattigo (mock) - Login</title>
+<style>
+body { font-family: sans-serif; background: #f3f4f8; }
+.login { width: 320px; margin: 120px auto; padding: 24px; background: #fff; border-radius: 8px; }
+.login input, .login button { display: block; width: 100%; margin: 8px 0; padding: 8px; box-sizing: border-box; }
+.error { color: #c0392b; }
+</style></head>
+<body>
+<app-root><app-login><div class="login">
+  <h3>Consola de agente</h3>
+  <form id="login-form" onsubmit="return false">
+    <input type="text" placeholder="Usuario" autocomplete="username">
+    <input type="password" placeholder="Contraseña" autocomplete="current-password">
+    <button id="loginButton" type="submit">Ingresar</button>
+  </form>
+  <p class="error" id="login-error" hidden></p>
+</div></app-login></app-root>
+<script>
+document.getElementById("loginButton").addEventListener("click", async function () {
+  var button = this, error = document.getElementById("login-error");
+  var inputs = document.querySelectorAll("#login-form input");
+  button.disabled = true;
+  error.hidden = true;
+  try {
+    var response = await fetch("/api/login", {
+      method: "POST", headers: {"Content-Type": "application/json"},
+      body: JSON.stringify({username: inputs[0].value, password: inputs[1].value})
+    });
+    if (response.ok) {
+      localStorage.setItem("token", (await response.json()).token);
+      location.href = "/dashboard/agent";
+      return;
+    }
+    error.textContent = response.status === 401 ? "Login incorrecto, intente de nuevo." : "Servicio no disponible, intente más tarde.";
+  } catch (e) {
+    error.textContent = "Servicio no disponible, intente más tarde.";
+  }
+  error.hidden = false;
+  button.disabled = false;
+});
+</script>
+</body></html>
+"""
+
+DASHBOARD_HTML = """<!DOCTYPE html>
+<html lang="es"><head><meta charset="utf-8"><title>Chattigo (mock)</title>
+<script>
+(function () {
+  var token = localStorage.getItem("token");
+  try {
+    var claims = JSON.parse(atob(token.split(".")[1].replace(/-/g, "+").replace(/_/g, "/")));
+    if (claims.exp * 1000 > Date.now()) { document.documentElement.className = "authed"; return; }
+  } catch (e) {}
+  localStorage.removeItem("token");
+  location.replace("__LOGIN_PATH__");
+})();
+</script>
+<style>
+html:not(.authed) app-root { display: none; }
+body { font-family: sans-serif; margin: 0; }
+[hidden] { display: none !important; }
+.layout { display: flex; min-height: 100vh; }
+nav { width: 48px; background: #1f2d3d; color: #fff; padding: 8px; }
+nav.expanded { width: 200px; }
+nav .menu { list-style: none; padding: 0; display: none; }
+nav.expanded .menu { display: block; }
+nav .submenu { list-style: none; padding-left: 12px; }
+nav a { display: block; padding: 6px 0; cursor: pointer; }
+.console, .outbound { flex: 1; display: flex; padding: 16px; gap: 16px; }
+.sidebar { width: 320px; }
+.detail { flex: 1; }
+state-selector { position: relative; display: inline-block; }
+.state-options button { display: block; }
+chat-card { display: block; padding: 8px; margin: 4px 0; border: 1px solid #ddd; cursor: pointer; }
+chat-card.active { border-color: #3498db; }
+ch-ui-snackbar > div { display: flex; gap: 8px; padding: 8px; background: #2ecc71; color: #fff; }
+.backdrop { position: fixed; inset: 0; background: rgba(0, 0, 0, .4); z-index: 10; }
+.dialog, [role=dialog] { position: fixed; top: 30%; left: 35%; width: 30%; padding: 16px; background: #fff; z-index: 11; }
+.toast { position: fixed; bottom: 16px; right: 16px; padding: 8px; background: #333; color: #fff; }
+#scrollbar { flex: 1; overflow-y: auto; }
+#scrollbar section { margin-bottom: 16px; }
+.options p, .options button { display: block; cursor: pointer; }
+.error { color: #c0392b; }
+</style></head>
+<body>
+<app-root><app-pages><app-main-dashboard>
+<div class="layout">
+  <nav>
+    <button class="toggle" title="Menú">&#9776;</button>
+    <ul class="menu">
+      <li><a id="menu-outbound">Outbound</a>
+        <ul class="submenu" hidden><li><a id="menu-send-outbound">Enviar Outbound</a></li></ul>
+      </li>
+      <li><a id="menu-logout">Cerrar Sesión</a></li>
+    </ul>
+  </nav>
+  __VIEW__
+</div>
+</app-main-dashboard></app-pages></app-root>
+<script>
+var MOCK = __MOCK_CONFIG__;
+
+function escapeHtml(text) {
+  var element = document.createElement("span");
+  element.textContent = text;
+  return element.innerHTML;
+}
+
+function logout() {
+  localStorage.removeItem("token");
+  location.href = "__LOGIN_PATH__";
+}
+
+async function api(path, options) {
+  options = options || {};
+  options.headers = Object.assign({"Authorization": "Bearer " + localStorage.getItem("token")}, options.headers || {});
+  if (options.json !== undefined) {
+    options.method = options.method || "POST";
+    options.headers["Content-Type"] = "application/json";
+    options.body = JSON.stringify(options.json);
+  }
+  var response = await fetch(path, options);
+  if (response.status === 401) { logout(); }
+  if (!response.ok) { throw new Error("HTTP " + response.status); }
+  return response.json();
+}
+
+function showToast(text, closable) {
+  var toast = document.createElement("div");
+  toast.className = "toast";
+  toast.innerHTML = "<span>" + escapeHtml(text) + "</span>" + (closable ? " <button>Cerrar</button>" : "");
+  document.body.appendChild(toast);
+  var close = function () { toast.remove(); };
+  if (closable) { toast.querySelector("button").addEventListener("click", close); }
+  setTimeout(close, closable ? 15000 : 5000);
+}
+
+document.querySelector("nav .toggle").addEventListener("click", function () {
+  document.querySelector("nav").classList.toggle("expanded");
+});
+document.getElementById("menu-outbound").addEventListener("click", function () {
+  var submenu = document.querySelector("nav .submenu");
+  submenu.hidden = !submenu.hidden;
+});
+document.getElementById("menu-send-outbound").addEventListener("click", function () {
+  location.href = "/dashboard/outbound/send";
+});
+document.getElementById("menu-logout").addEventListener("click", logout);
+
+function showPopup() {
+  var modal = document.createElement("ch-ui-widget-generic-modal");
+  modal.innerHTML =
+    '<div class="modal"><div class="backdrop"></div><div class="dialog">' +
+    '<button class="close"><span>&times;</span></button>' +
+    '<div><div class="title">Recuerda revisar tus chats pendientes</div>' +
+    '<div><div><div><button class="ok">Entendido</button></div></div></div></div>' +
+    '</div></div>';
+  // Removed (not hidden) on close, like the real modal component
+  modal.querySelectorAll("button").forEach(function (button) {
+    button.addEventListener("click", function () { modal.remove(); });
+  });
+  document.querySelector("app-main-dashboard").appendChild(modal);
+}
+if (Math.random() < MOCK.popupRate) { setTimeout(showPopup, MOCK.popupDelay * 1000); }
+
+__VIEW_SCRIPT__
+</script>
+</body></html>
+"""
+
+AGENT_VIEW = """<app-agent-console><agent-console>
+  <div class="console">
+    <div class="sidebar">
+      <div class="session">
+        <session-control><div>
+          <div class="state-row">
+            <div>Estado</div>
+            <div><state-selector>
+              <button id="state-button">Online</button>
+              <div class="state-options" hidden>__STATE_OPTIONS__</div>
+            </state-selector></div>
+          </div>
+          <div class="timers">
+            <div><span>Tiempo en sesión</span><span><timer-count><span id="session-timer">00:00:00</span></timer-count></span></div>
+            <div><span>Tiempo en pausa</span><span><timer-count><span id="pause-timer">00:00:00</span></timer-count></span></div>
+          </div>
+        </div></session-control>
+      </div>
+      <div class="chats"><h3>Chats del agente</h3><div id="chat-list"></div></div>
+    </div>
+    <div class="detail" id="chat-detail"></div>
+  </div>
+  <ch-ui-alerts><div id="alerts"></div></ch-ui-alerts>
+</agent-console></app-agent-console>"""
+
+AGENT_SCRIPT = """
+var agent = {state: "Online", online: 0, pause: 0};
+
+function formatTimer(seconds) {
+  return [Math.floor(seconds / 3600), Math.floor(seconds / 60) % 60, seconds % 60]
+    .map(function (value) { return String(value).padStart(2, "0"); }).join(":");
+}
+
+function renderAgent() {
+  document.getElementById("state-button").textContent = agent.state;
+  document.getElementById("session-timer").textContent = formatTimer(agent.online);
+  document.getElementById("pause-timer").textContent = formatTimer(agent.pause);
+}
+
+function applyAgent(data) {
+  agent = {state: data.state, online: data.online_seconds, pause: data.pause_seconds};
+  renderAgent();
+}
+
+setInterval(function () {
+  if (agent.state === "Online") { agent.online += 1; } else { agent.pause += 1; }
+  renderAgent();
+}, 1000);
+
+function showSnackbar(text) {
+  var alerts = document.getElementById("alerts");
+  alerts.innerHTML =
+    '<ch-ui-snackbar><div><div>' + escapeHtml(text) + '</div>' +
+    '<div><button><span>&times;</span></button></div></div></ch-ui-snackbar>';
+  alerts.querySelector("button").addEventListener("click", function () { alerts.innerHTML = ""; });
+}
+
+document.getElementById("state-button").addEventListener("click", function () {
+  var options = document.querySelector(".state-options");
+  options.hidden = !options.hidden;
+});
+document.querySelectorAll(".state-options button").forEach(function (button) {
+  button.addEventListener("click", async function () {
+    document.querySelector(".state-options").hidden = true;
+    try {
+      applyAgent(await api("/api/agent/state", {json: {state: button.textContent}}));
+      showSnackbar("Estado actualizado a " + button.textContent);
+    } catch (e) {
+      showToast("No se pudo cambiar el estado", false);
+    }
+  });
+});
+
+var openChat = null;
+var lastChats = [];
+
+function renderChats(chats) {
+  var list = document.getElementById("chat-list");
+  list.innerHTML = "";
+  chats.forEach(function (chat) {
+    var card = document.createElement("chat-card");
+    card.dataset.id = chat.id;
+    card.className = chat.id === openChat ? "active" : "";
+    card.innerHTML = "<strong>" + escapeHtml(chat.sender) + "</strong><div>" + escapeHtml(chat.subject) + "</div>";
+    card.addEventListener("click", function () { showChat(chat); });
+    list.appendChild(card);
+  });
+  if (openChat !== null && !chats.some(function (chat) { return chat.id === openChat; })) {
+    openChat = null;
+    document.getElementById("chat-detail").innerHTML = "";
+  }
+}
+
+function showChat(chat) {
+  openChat = chat.id;
+  var detail = document.getElementById("chat-detail");
+  detail.innerHTML =
+    "<h3>" + escapeHtml(chat.subject) + "</h3><p>" + escapeHtml(chat.sender) + "</p>" +
+    "<div class='message'>" + escapeHtml(chat.body) + "</div><button id='finalize'>Finalizar</button>";
+  document.getElementById("finalize").addEventListener("click", function () {
+    var dialog = document.createElement("div");
+    dialog.setAttribute("role", "dialog");
+    dialog.innerHTML = "<p>Motivo de cierre</p><ul>__CLOSE_REASONS__</ul><a id='confirm-finalize'>Finalizar chat</a>";
+    var reason = null;
+    dialog.querySelectorAll("li").forEach(function (item) {
+      item.addEventListener("click", function () {
+        reason = item.textContent;
+        dialog.querySelectorAll("li").forEach(function (other) { other.style.fontWeight = other === item ? "bold" : ""; });
+      });
+    });
+    dialog.querySelector("a").addEventListener("click", async function () {
+      if (!reason) { return; }
+      try {
+        await api("/api/chats/" + chat.id + "/close", {json: {reason: reason}});
+        dialog.remove();
+        refreshChats();
+      } catch (e) {
+        showToast("No se pudo finalizar el chat", false);
+      }
+    });
+    document.body.appendChild(dialog);
+  });
+  renderChats(lastChats);
+}
+
+async function refreshChats() {
+  try {
+    lastChats = await api("/api/chats");
+    renderChats(lastChats);
+  } catch (e) {
+    // Next poll retries
+  }
+}
+
+api("/api/agent/state").then(applyAgent).catch(function () {});
+refreshChats();
+setInterval(refreshChats, MOCK.chatPollInterval * 1000);
+"""
+
+OUTBOUND_VIEW = """<app-outbound><div class="outbound">
+  <div id="scrollbar">
+    <h3>Nuevo envío</h3>
+    <section id="campaign"><h4>Campaña</h4><button class="dropdown">Seleccionar</button><div class="options"></div></section>
+  </div>
+</div></app-outbound>"""
+
+OUTBOUND_SCRIPT = """
+var optionsPromise = api("/api/outbound/options");
+var outbound = {};
+var scrollbar = document.getElementById("scrollbar");
+
+function addSection(id, title, html) {
+  var section = document.createElement("section");
+  section.id = id;
+  section.innerHTML = "<h4>" + title + "</h4>" + html;
+  scrollbar.appendChild(section);
+  return section;
+}
+
+// Dropdown whose options (tag `tag`) are loaded from the options API when it is opened
+function dropdown(section, key, tag, onSelect) {
+  var button = section.querySelector(".dropdown");
+  var list = section.querySelector(".options");
+  button.addEventListener("click", async function () {
+    if (list.childElementCount) { list.innerHTML = ""; return; }
+    var values = (await optionsPromise)[key];
+    values.forEach(function (value) {
+      var option = document.createElement(tag);
+      option.textContent = value;
+      option.addEventListener("click", function () {
+        list.innerHTML = "";
+        button.textContent = value;
+        onSelect(value);
+      });
+      list.appendChild(option);
+    });
+  });
+}
+
+async function upload(input) {
+  var form = new FormData();
+  form.append("file", input.files[0]);
+  return api("/api/files", {method: "POST", body: form});
+}
+
+dropdown(document.getElementById("campaign"), "campaigns", "p", function (value) {
+  outbound.campaign = value;
+  if (document.getElementById("channel")) { return; }
+  var channel = addSection("channel", "Canal", "<button class='dropdown'>Seleccionar</button><div class='options'></div>");
+  dropdown(channel, "channels", "p", function (value) {
+    outbound.channel = value;
+    if (!document.getElementById("contacts")) { contactsSection(); }
+  });
+});
+
+function contactsSection() {
+  var section = addSection(
+    "contacts", "Lista de contactos",
+    "<button class='attach'>Adjuntar lista de contactos</button> <span class='file-name'></span> " +
+    "<button class='save' disabled>Guardar</button>"
+  );
+  section.querySelector(".attach").addEventListener("click", function () {
+    var dialog = document.createElement("div");
+    dialog.setAttribute("role", "dialog");
+    dialog.innerHTML =
+      "<h4>Adjuntar lista de contactos</h4><p class='pick'>Selecciona un archivo</p>" +
+      "<input type='file' hidden><p class='error' hidden></p>" +
+      "<button class='cancel'>Cancelar</button> <button class='confirm' disabled>Guardar</button>";
+    var input = dialog.querySelector("input");
+    var confirm = dialog.querySelector(".confirm");
+    var error = dialog.querySelector(".error");
+    dialog.querySelector(".pick").addEventListener("click", function () { input.click(); });
+    input.addEventListener("change", async function () {
+      error.hidden = true;
+      try {
+        outbound.contacts = await upload(input);
+        confirm.disabled = false;
+      } catch (e) {
+        error.textContent = "Error al subir el archivo, intenta de nuevo.";
+        error.hidden = false;
+      }
+    });
+    dialog.querySelector(".cancel").addEventListener("click", function () { dialog.remove(); });
+    confirm.addEventListener("click", function () {
+      section.querySelector(".file-name").textContent = outbound.contacts.name;
+      section.querySelector(".save").disabled = false;
+      dialog.remove();
+    });
+    document.body.appendChild(dialog);
+  });
+  section.querySelector(".save").addEventListener("click", function () {
+    section.querySelector(".save").remove();
+    section.querySelector(".attach").remove();
+    templateSection();
+  });
+}
+
+function templateSection() {
+  var section = addSection("template", "Plantilla", "<button class='dropdown'>Seleccionar...</button><div class='panel'></div>");
+  var button = section.querySelector(".dropdown");
+  var panel = section.querySelector(".panel");
+  button.addEventListener("click", async function () {
+    if (panel.childElementCount) { return; }
+    var templates = (await optionsPromise).templates;
+    panel.innerHTML = "<input type='text' placeholder='Buscar...'><div class='options'></div><div class='attachment'></div>";
+    var search = panel.querySelector("input");
+    var list = panel.querySelector(".options");
+    templates.forEach(function (template) {
+      var option = document.createElement("button");
+      option.textContent = template.name + " - " + template.language;
+      option.dataset.name = template.name;
+      option.addEventListener("click", function () { chooseTemplate(section, template); });
+      list.appendChild(option);
+    });
+    search.addEventListener("input", function () {
+      var term = search.value.toLowerCase();
+      list.querySelectorAll("button").forEach(function (option) {
+        option.hidden = option.dataset.name.toLowerCase().indexOf(term) === -1;
+      });
+    });
+  });
+}
+
+function chooseTemplate(section, template) {
+  outbound.template = template.name;
+  outbound.attachment = null;
+  section.querySelector(".dropdown").textContent = template.name;
+  section.querySelector(".panel .options").hidden = true;
+  var attachment = section.querySelector(".attachment");
+  if (template.attachment === "file") {
+    attachment.innerHTML = "<button class='attach-file'>Adjunta un archivo</button><input type='file' hidden><span class='file-name'></span>";
+    var input = attachment.querySelector("input");
+    attachment.querySelector(".attach-file").addEventListener("click", function () { input.click(); });
+    input.addEventListener("change", async function () {
+      try {
+        outbound.attachment = await upload(input);
+        attachment.querySelector(".file-name").textContent = outbound.attachment.name;
+      } catch (e) {
+        showToast("Error al subir el archivo", false);
+      }
+    });
+  } else if (template.attachment === "url") {
+    attachment.innerHTML = "<span class='write-url'>o escribe una URL</span><input type='text' class='url' hidden>";
+    attachment.querySelector(".write-url").addEventListener("click", function () {
+      attachment.querySelector(".url").hidden = false;
+    });
+  }
+  if (!section.querySelector("a.save")) {
+    var save = document.createElement("a");
+    save.className = "save";
+    save.textContent = "Guardar";
+    save.addEventListener("click", function () { saveTemplate(section, template); });
+    section.appendChild(save);
+  }
+}
+
+function saveTemplate(section, template) {
+  var url = section.querySelector(".url");
+  if (url) { outbound.attachment = url.value ? {url: url.value} : null; }
+  if (template.attachment && !outbound.attachment) {
+    showToast("Adjunta un archivo o escribe una URL", false);
+    return;
+  }
+  section.querySelector(".panel").remove();
+  section.querySelector("a.save").remove();
+  if (!document.getElementById("agent")) { agentSection(); }
+}
+
+function agentSection() {
+  var section = addSection(
+    "agent", "Agente",
+    "<button class='dropdown'>Seleccionar...</button><div class='options'></div><button class='save'>Guardar</button>"
+  );
+  dropdown(section, "agents", "button", function (value) { outbound.agent = value; });
+  section.querySelector(".save").addEventListener("click", function () {
+    if (!outbound.agent) { return; }
+    section.querySelector(".save").remove();
+    sendSection();
+  });
+}
+
+function sendSection() {
+  var send = document.createElement("button");
+  send.className = "send";
+  send.textContent = "ENVIAR OUTBOUND";
+  send.addEventListener("click", async function () {
+    send.disabled = true;
+    try {
+      var result = await api("/api/outbound/send", {json: outbound});
+      var dialog = document.createElement("div");
+      dialog.setAttribute("role", "dialog");
+      dialog.innerHTML = "<p>Outbound " + result.id + " enviado correctamente</p><button>Entendido</button>";
+      dialog.querySelector("button").addEventListener("click", function () {
+        dialog.remove();
+        showToast("El envío se está procesando", true);
+      });
+      document.body.appendChild(dialog);
+    } catch (e) {
+      send.disabled = false;
+      showToast("No se pudo enviar el outbound", false);
+    }
+  });
+  scrollbar.appendChild(send);
+}
+"""
+
+
+def _render_dashboard(view: str, settings: MockSettings) -> str:
+    config = {
+        "popupRate": settings.popup_rate,
+        "popupDelay": settings.popup_delay,
+        "chatPollInterval": settings.chat_poll_interval,
+    }
+    if view == "agent":
+        markup = AGENT_VIEW.replace(
+            "__STATE_OPTIONS__", "".join(f"<button>{state}</button>" for state in AGENT_STATES)
+        )
+        script = AGENT_SCRIPT.replace("__CLOSE_REASONS__", "".join(f"<li>{reason}</li>" for reason in CLOSE_REASONS))
+    else:
+        markup, script = OUTBOUND_VIEW, OUTBOUND_SCRIPT
+    return (
+        DASHBOARD_HTML.replace("__VIEW_SCRIPT__", script)
+        .replace("__VIEW__", markup)
+        .replace("__MOCK_CONFIG__", json.dumps(config))
+        .replace("__LOGIN_PATH__", LOGIN_PATH)
+    )
+
+
+def create_app(settings: MockSettings = None, state: ConsoleState = None) -> web.Application:
+    logger = get_logger("MockConsole")
+    settings = settings or MockSettings.from_env()
+    state = state or ConsoleState()
+
+    @web.middleware
+    async def faults(request, handler):
+        resource = request.match_info.route.resource
+        state.count(f"{request.method} {resource.canonical if resource else request.path}")
+        if request.path.startswith(settings.fault_paths):
+            delay = settings.latency + random.uniform(0, settings.jitter)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if random.random() < settings.failure_rate:
+                state.injected_failures += 1
+                return web.json_response({"error": "injected failure"}, status=503)
+        return await handler(request)
+
+    @web.middleware
+    async def auth(request, handler):
+        if request.path.startswith("/api/") and request.path != "/api/login":
+            scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+            request["user"] = verify_token(token) if scheme == "Bearer" else None
+            if request["user"] is None:
+                return web.json_response({"error": "unauthorized"}, status=401)
+        return await handler(request)
+
+    async def index(request):
+        raise web.HTTPFound(LOGIN_PATH)
+
+    async def login_page(request):
+        return web.Response(text=LOGIN_HTML, content_type="text/html")
+
+    async def dashboard(request):
+        return web.Response(text=_render_dashboard(request.match_info.get("view", "agent"), settings), content_type="text/html")
+
+    async def login(request):
+        data = await request.json()
+        if not state.check_credentials(data.get("username"), data.get("password")):
+            return web.json_response({"error": "invalid credentials"}, status=401)
+        return web.json_response({"token": issue_token(data["username"], settings.session_ttl)})
+
+    async def agent_state(request):
+        if request.method == "POST":
+            new_state = (await request.json()).get("state")
+            if new_state not in AGENT_STATES:
+                return web.json_response({"error": f"unknown state {new_state!r}"}, status=400)
+            return web.json_response(state.set_agent_state(request["user"], new_state))
+        return web.json_response(state.agent(request["user"]))
+
+    async def chats(request):
+        # An agent that missed a few polls (closed tab, logged out) stops receiving chats
+        return web.json_response(state.chats_for(request["user"], 3 * settings.chat_poll_interval))
+
+    async def close_chat(request):
+        reason = (await request.json()).get("reason")
+        if not state.close_chat(int(request.match_info["chat_id"]), reason):
+            return web.json_response({"error": "chat not found"}, status=404)
+        return web.json_response({"closed": True, "reason": reason})
+
+    async def outbound_options(request):
+        return web.json_response({
+            "campaigns": CAMPAIGNS,
+            "channels": CHANNELS,
+            "templates": [{"name": name, "language": language, "attachment": attachment} for name, language, attachment in TEMPLATES],
+            "agents": AGENTS,
+        })
+
+    async def upload(request):
+        reader = await request.multipart()
+        part = await reader.next()
+        if part is None:
+            return web.json_response({"error": "no file"}, status=400)
+        size = 0
+        while chunk := await part.read_chunk():
+            size += len(chunk)
+        return web.json_response(state.record(state.uploads, {"name": part.filename, "size": size}))
+
+    async def send_outbound(request):
+        data = await request.json()
+        missing = [key for key in ("campaign", "channel", "template", "agent") if not data.get(key)]
+        if missing:
+            return web.json_response({"error": f"missing {', '.join(missing)}"}, status=400)
+        outbound = state.record(state.outbounds, {**data, "user": request["user"]})
+        logger.info(f"Outbound {outbound['id']} sent with template {data['template']}")
+        return web.json_response({"id": outbound["id"], "status": "queued", "template": data["template"]})
+
+    async def mock_stats(request):
+        return web.json_response({**state.stats(), "settings": asdict(settings)})
+
+    async def mock_settings(request):
+        try:
+            settings.update(await request.json())
+        except ValueError as e:
+            return web.json_response({"error": str(e)}, status=400)
+        return web.json_response(asdict(settings))
+
+    async def mock_chats(request):
+        data = await request.json()
+        return web.json_response(state.add_chat(data["sender"], data.get("subject", ""), data.get("body", "")))
+
+    app = web.Application(middlewares=[faults, auth])
+    app["settings"], app["state"] = settings, state
+    app.router.add_get("/", index)
+    app.router.add_get(LOGIN_PATH, login_page)
+    app.router.add_get("/dashboard/agent", dashboard)
+    app.router.add_get("/dashboard/{view:outbound}/send", dashboard)
+    app.router.add_post("/api/login", login)
+    app.router.add_route("*", "/api/agent/state", agent_state)
+    app.router.add_get("/api/chats", chats)
+    app.router.add_post("/api/chats/{chat_id:\\d+}/close", close_chat)
+    app.router.add_get("/api/outbound/options", outbound_options)
+    app.router.add_post("/api/files", upload)
+    app.router.add_post("/api/outbound/send", send_outbound)
+    app.router.add_get("/__mock/stats", mock_stats)
+    app.router.add_post("/__mock/settings", mock_settings)
+    app.router.add_post("/__mock/chats", mock_chats)
+    return app
+
+
+class MockConsole:
+    """Runs the mock console in a background thread, e.g. from a benchmark or a fixture."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT, settings: MockSettings = None):
+        self.logger = get_logger(self.__class__.__name__)
+        self.host = host
+        self.port = port
+        self.settings = settings or MockSettings.from_env()
+        self.state = ConsoleState()
+        self._loop = None
+        self._runner = None
+        self._thread = None
+
+    @classmethod
+    def on_free_port(cls, host: str = "127.0.0.1", settings: MockSettings = None) -> "MockConsole":
+        """
+        A console on a port picked by the OS when it starts, for runners that start their own
+        (benchmarks, load scenarios) without disturbing one already running on DEFAULT_PORT.
+        """
+        return cls(host, 0, settings)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def login_url(self) -> str:
+        return f"{self.base_url}{LOGIN_PATH}"
+
+    def add_chat(self, sender: str, subject: str, body: str) -> dict:
+        return self.state.add_chat(sender, subject, body)
+
+    def add_email_chat(self, email: dict):
+        """SmtpStub on_message callback: an accepted email becomes an incoming chat."""
+        self.add_chat(email["from"], email["subject"] or "", email["body"])
+
+    def start(self):
+        started = threading.Event()
+        errors = []
+
+        def serve():
+            self._loop = asyncio.new_event_loop()
+            try:
+                self._runner = web.AppRunner(create_app(self.settings, self.state), access_log=None)
+                self._loop.run_until_complete(self._runner.setup())
+                site = web.TCPSite(self._runner, self.host, self.port)
+                self._loop.run_until_complete(site.start())
+                # The actual port when it was 0 (see on_free_port)
+                self.port = self._runner.addresses[0][1]
+            except Exception as e:
+                errors.append(e)
+                started.set()
+                return
+            started.set()
+            self._loop.run_forever()
+            self._loop.run_until_complete(self._runner.cleanup())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=serve, name="mock-console", daemon=True)
+        self._thread.start()
+        started.wait()
+        if errors:
+            raise errors[0]
+        self.logger.info(f"Mock agent console listening on {self.base_url}")
+        return self
+
+    def stop(self):
+        if self._loop and self._thread.is_alive():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Consola de agente simulada para correr la suite con --env=mock")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency", type=float, default=None, help="Segundos de demora en cada llamada /api/")
+    parser.add_argument("--jitter", type=float, default=None, help="Demora adicional aleatoria máxima (segundos)")
+    parser.add_argument("--failure-rate", type=float, default=None, help="Proporción de llamadas /api/ que responden 503")
+    parser.add_argument("--popup-rate", type=float, default=None, help="Proporción de cargas del dashboard con el popup 'Entendido'")
+    parser.add_argument("--popup-delay", type=float, default=None, help="Segundos hasta que aparece el popup")
+    parser.add_argument("--chat-poll-interval", type=float, default=None, help="Segundos entre consultas de chats del dashboard")
+    parser.add_argument("--smtp-port", type=int, default=None, help="Levanta un SMTP local cuyos emails llegan como chats")
+    args = parser.parse_args()
+
+    settings = MockSettings.from_env()
+    settings.update({
+        name: value for name, value in (
+            ("latency", args.latency), ("jitter", args.jitter), ("failure_rate", args.failure_rate),
+            ("popup_rate", args.popup_rate), ("popup_delay", args.popup_delay),
+            ("chat_poll_interval", args.chat_poll_interval),
+        ) if value is not None
+    })
+    state = ConsoleState()
+    smtp = None
+    if args.smtp_port:
+        smtp = SmtpStub(args.host, args.smtp_port, on_message=lambda email: state.add_chat(
+            email["from"], email["subject"] or "", email["body"]
+        )).start()
+    print(f"Consola simulada en http://{args.host}:{args.port}{LOGIN_PATH} ({asdict(settings)})")
+    try:
+        web.run_app(create_app(settings, state), host=args.host, port=args.port, print=None)
+    finally:
+        if smtp is not None:
+            smtp.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Many agent sessions in one process, on the asyncio page objects (pages/async_api).
+
+Instead of one xdist worker (Python interpreter + Playwright driver + Chromium)
+per agent, a single event loop drives one Chromium and gives every agent its
+own BrowserContext, so cookies and storage stay isolated while the browser
+and driver processes are shared. Sessions start with a ramp-up delay and at
+most --concurrency of them run at the same time.
+
+Scenarios (each one includes the previous):
+- login: login and popup handling.
+- status: Descanso -> Online, checking the success message.
+- outbound: --sends outbound sends from the agent's page.
+
+    python -m utils.multi_agent --env mock --start-mock --agents 20 --scenario status
+    python -m utils.multi_agent --env pantera --agents 2 --scenario outbound -o multi_agent.json
+
+Against --env=mock the agents are generated (agentN@mock.local, the mock
+accepts them with PASSWORD); any other environment needs one account per
+agent in AGENT_ACCOUNTS / AGENT_ACCOUNTS_FILE.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from playwright.async_api import async_playwright
+from config.config import Config
+from pages.async_api.agent_dashboard_page import AgentDashboardPage
+from pages.async_api.login_page import LoginPage
+from pages.async_api.outbound_flow import OutboundSendFlow
+from pages.outbound_flow import OutboundVariant
+from utils.browser_pool import CHROMIUM_ARGS, CONTEXT_OPTIONS
+from utils.history import stats
+from utils.logger import get_logger
+from utils.mock_console import MockConsole
+from utils.resource_monitor import ResourceMonitor
+from utils.timing import aggregate_steps
+
+SCENARIOS = ("login", "status", "outbound")
+
+
+def agent_accounts(environment: str, count: int) -> list:
+    """One account per agent: generated for the mock, from Config.USERS otherwise."""
+    if environment == "mock":
+        return [{"email": f"agent{index}@mock.local", "password": Config.PASSWORD} for index in range(1, count + 1)]
+    if len(Config.USERS) < count:
+        raise ValueError(
+            f"{count} agents requested but only {len(Config.USERS)} accounts configured "
+            "(AGENT_ACCOUNTS / AGENT_ACCOUNTS_FILE)"
+        )
+    return Config.USERS[:count]
+
+
+class MultiAgentRunner:
+    def __init__(self, base_url: str, accounts: list, scenario: str = "login", concurrency: int = None,
+                 ramp_up: float = 0.5, sends: int = 1, template: str = "bienvenida_rapida_auto",
+                 headless: bool = True):
+        if scenario not in SCENARIOS:
+            raise ValueError(f"Unknown scenario '{scenario}', expected one of {', '.join(SCENARIOS)}")
+        self.logger = get_logger(self.__class__.__name__)
+        self.base_url = base_url
+        self.accounts = accounts
+        self.scenario = scenario
+        self.concurrency = concurrency or len(accounts)
+        self.ramp_up = ramp_up
+        self.sends = sends
+        self.variant = OutboundVariant(template)
+        self.headless = headless
+        self.monitor = ResourceMonitor(interval=0.5)
+
+    async def _session(self, browser, semaphore: asyncio.Semaphore, index: int, account: dict) -> dict:
+        # Ramp-up: agent N starts N * ramp_up seconds after the first one
+        await asyncio.sleep(index * self.ramp_up)
+        result = {"agent": account["email"], "steps": [], "error": None}
+        async with semaphore:
+            start = time.perf_counter()
+            context = await browser.new_context(**CONTEXT_OPTIONS)
+            try:
+                page = await context.new_page()
+                login_page = LoginPage(page, result["steps"])
+                await login_page.navigate(self.base_url)
+                await login_page.login(account["email"], account["password"])
+
+                dashboard = AgentDashboardPage(page, result["steps"])
+                await dashboard.handle_popup()
+                if self.scenario in ("status", "outbound"):
+                    for status in ("Descanso", "Online"):
+                        await dashboard.set_status(status)
+                        if not await dashboard.verify_status_message():
+                            raise RuntimeError(f"Status message not shown after setting {status}")
+                if self.scenario == "outbound":
+                    flow = OutboundSendFlow(page, steps=result["steps"])
+                    for _ in range(self.sends):
+                        await flow.send(self.variant)
+            except Exception as e:
+                result["error"] = f"{type(e).__name__}: {e}"
+                self.logger.error(f"Agent {account['email']} failed: {e}")
+            finally:
+                await context.close()
+                result["duration"] = round(time.perf_counter() - start, 4)
+        return result
+
+    async def run(self) -> dict:
+        self.monitor.start()
+        start = time.perf_counter()
+        try:
+            async with async_playwright() as playwright:
+                browser = await playwright.chromium.launch(headless=self.headless, args=CHROMIUM_ARGS)
+                try:
+                    semaphore = asyncio.Semaphore(self.concurrency)
+                    sessions = await asyncio.gather(*(
+                        self._session(browser, semaphore, index, account)
+                        for index, account in enumerate(self.accounts)
+                    ))
+                finally:
+                    await browser.close()
+        finally:
+            self.monitor.stop()
+        wall = time.perf_counter() - start
+
+        resources = self.monitor.usage()
+        agents = len(self.accounts)
+        passed = [session for session in sessions if session["error"] is None]
+        return {
+            "scenario": self.scenario,
+            "agents": agents,
+            "concurrency": self.concurrency,
+            "ramp_up": self.ramp_up,
+            "passed": len(passed),
+            "failed": agents - len(passed),
+            "wall": round(wall, 3),
+            "session_duration": stats([session["duration"] for session in passed]),
+            "steps": aggregate_steps([{"spans": session["steps"]} for session in sessions]),
+            "resources": dict(resources, rss_per_agent_mb=round(resources["peak_rss_mb"] / agents, 1)),
+            "sessions": [
+                {key: value for key, value in session.items() if key != "steps"} for session in sessions
+            ],
+        }
+
+
+def print_summary(result: dict):
+    resources = result["resources"]
+    duration = result["session_duration"]
+    print(f"Escenario '{result['scenario']}': {result['passed']}/{result['agents']} agentes OK en {result['wall']:.1f}s")
+    if duration["count"]:
+        print(f"Duración por sesión: p50 {duration['p50']:.2f}s, p95 {duration['p95']:.2f}s")
+    print(
+        f"CPU {resources['cpu']:.1f}s, RSS pico {resources['peak_rss_mb']:.0f} MB "
+        f"({resources['rss_per_agent_mb']:.0f} MB por agente, fuente: {resources['source']})"
+    )
+    for session in result["sessions"]:
+        if session["error"]:
+            print(f"  FALLÓ {session['agent']}: {session['error']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Corre muchas sesiones de agente en un solo proceso (Playwright async)")
+    parser.add_argument("--env", default="mock", choices=sorted(Config.ENVIRONMENTS), help="Ambiente contra el que correr")
+    parser.add_argument("--agents", type=int, default=10, help="Cantidad de sesiones de agente")
+    parser.add_argument("--scenario", default="login", choices=SCENARIOS)
+    parser.add_argument("--concurrency", type=int, help="Sesiones simultáneas como máximo (por defecto todas)")
+    parser.add_argument("--ramp-up", type=float, default=0.5, help="Segundos entre el inicio de un agente y el siguiente")
+    parser.add_argument("--sends", type=int, default=1, help="Envíos por agente en el escenario outbound")
+    parser.add_argument("--template", default="bienvenida_rapida_auto", help="Plantilla del escenario outbound")
+    parser.add_argument("--start-mock", action="store_true", help="Levanta la consola simulada en este proceso")
+    parser.add_argument("--headed", action="store_true")
+    parser.add_argument("-o", "--output", help="Archivo JSON con el resultado")
+    args = parser.parse_args()
+
+    try:
+        accounts = agent_accounts(args.env, args.agents)
+    except ValueError as e:
+        parser.error(str(e))
+
+    console = None
+    base_url = Config.ENVIRONMENTS[args.env]
+    if args.start_mock:
+        if args.env != "mock":
+            parser.error("--start-mock solo tiene sentido con --env mock")
+        console = MockConsole.on_free_port().start()
+        base_url = console.login_url
+    # Page objects that build URLs (e.g. dashboard_url) read the configured base URL
+    Config.BASE_URL = base_url
+
+    try:
+        runner = MultiAgentRunner(
+            base_url, accounts, scenario=args.scenario, concurrency=args.concurrency, ramp_up=args.ramp_up,
+            sends=args.sends, template=args.template, headless=not args.headed,
+        )
+        result = asyncio.run(runner.run())
+    finally:
+        if console is not None:
+            console.stop()
+
+    print_summary(result)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"Resultados en {args.output}")
+    if result["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+import re
+from playwright.sync_api import BrowserContext, Route
+from config.config import Config
+from utils.logger import get_logger
+
+# Only these requests are routed through Python; everything else never leaves the browser
+STATIC_ASSET = re.compile(r"^https?://[^?#]+\.(?:js|mjs|css|woff2?|ttf|otf|eot|svg|png|jpe?g|gif|webp|ico)(?:[?#].*)?$", re.IGNORECASE)
+# Build fingerprints such as main.3f2a9c1b7d.js or chunk-5XKQ2B7H.js
+FINGERPRINT = re.compile(r"[.-](?=[0-9A-Za-z]*\d)[0-9A-Za-z]{8,}\.[a-z0-9]+(?:[?#].*)?$")
+MAX_AGE = re.compile(r"max-age=(\d+)")
+# Responses cached for at least a week by the server are treated as immutable
+IMMUTABLE_MAX_AGE = 7 * 24 * 3600
+# Dropped when replaying: the stored body is already decoded and its length may differ
+HOP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "set-cookie"}
+
+
+class NetworkRouter:
+    """
+    Routing layer installed on every test BrowserContext.
+
+    Requests to tracking/analytics domains are aborted. Immutable static
+    assets (fingerprinted bundles, or long max-age / immutable responses) are
+    stored in a content-addressed cache on disk: bodies live under blobs/ named
+    by their sha256 and index/ maps each URL to its blob and headers. Writes
+    are atomic, so every worker on the host shares the same cache.
+    """
+
+    def __init__(self, cache_dir: str = None, blocked_domains: list = None,
+                 block_trackers: bool = None, cache_assets: bool = None):
+        self.logger = get_logger(self.__class__.__name__)
+        self.cache_dir = cache_dir or Config.ASSET_CACHE_DIR
+        self.blocked_domains = Config.BLOCKED_DOMAINS if blocked_domains is None else blocked_domains
+        self.block_trackers = Config.BLOCK_TRACKERS if block_trackers is None else block_trackers
+        self.cache_assets = Config.ASSET_CACHE_ENABLED if cache_assets is None else cache_assets
+        self.metrics = self._empty_metrics()
+        domains = "|".join(re.escape(domain) for domain in self.blocked_domains)
+        self._blocked = re.compile(rf"^https?://([^/?#]*\.)?({domains})(:\d+)?([/?#]|$)", re.IGNORECASE) if domains else None
+
+    @staticmethod
+    def _empty_metrics() -> dict:
+        return {"blocked": 0, "hits": 0, "misses": 0, "stored": 0, "bytes_from_cache": 0}
+
+    def drain_metrics(self) -> dict:
+        """Returns the counters accumulated since the previous call and resets them."""
+        metrics, self.metrics = self.metrics, self._empty_metrics()
+        return metrics
+
+    def _is_blocked(self, url: str) -> bool:
+        return bool(self.block_trackers and self._blocked and self._blocked.search(url))
+
+    def install(self, context: BrowserContext):
+        # Playwright runs the most recently registered route first: the block route goes last
+        if self.cache_assets:
+            context.route(STATIC_ASSET, self._serve_asset)
+        if self.block_trackers and self._blocked:
+            context.route(self._blocked, self._block)
+
+    def _block(self, route: Route):
+        self.metrics["blocked"] += 1
+        route.abort("blockedbyclient")
+
+    def _index_path(self, url: str):
+        key = hashlib.sha256(url.encode()).hexdigest()
+        return os.path.join(self.cache_dir, "index", f"{key}.json")
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, "blobs", digest[:2], digest)
+
+    @staticmethod
+    def _write_atomic(path: str, data: bytes):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _lookup(self, url: str):
+        try:
+            with open(self._index_path(url)) as f:
+                entry = json.load(f)
+            with open(self._blob_path(entry["sha256"]), "rb") as f:
+                return entry, f.read()
+        except (OSError, ValueError, KeyError):
+            return None, None
+
+    @staticmethod
+    def _is_immutable(url: str, status: int, headers: dict) -> bool:
+        if status != 200 or "set-cookie" in headers or "cookie" in headers.get("vary", "").lower():
+            return False
+        cache_control = headers.get("cache-control", "").lower()
+        if "no-store" in cache_control or "private" in cache_control:
+            return False
+        if "immutable" in cache_control or FINGERPRINT.search(url):
+            return True
+        max_age = MAX_AGE.search(cache_control)
+        return bool(max_age) and int(max_age.group(1)) >= IMMUTABLE_MAX_AGE
+
+    def _store(self, url: str, status: int, headers: dict, body: bytes):
+        digest = hashlib.sha256(body).hexdigest()
+        blob_path = self._blob_path(digest)
+        if not os.path.exists(blob_path):
+            self._write_atomic(blob_path, body)
+        entry = {
+            "url": url,
+            "status": status,
+            "sha256": digest,
+            "headers": {name: value for name, value in headers.items() if name not in HOP_HEADERS},
+        }
+        self._write_atomic(self._index_path(url), json.dumps(entry).encode())
+        self.metrics["stored"] += 1
+
+    def _serve_asset(self, route: Route):
+        request = route.request
+        # Tracker scripts match STATIC_ASSET too: never fetch or cache them
+        if self._is_blocked(request.url):
+            self._block(route)
+            return
+        if request.method != "GET":
+            route.fallback()
+            return
+
+        entry, body = self._lookup(request.url)
+        if entry:
+            self.metrics["hits"] += 1
+            self.metrics["bytes_from_cache"] += len(body)
+            route.fulfill(status=entry["status"], headers=entry["headers"], body=body)
+            return
+
+        self.metrics["misses"] += 1
+        try:
+            response = route.fetch()
+        except Exception as e:
+            self.logger.warning(f"Asset fetch failed for {request.url}: {e}")
+            route.fallback()
+            return
+        headers = response.headers
+        if self._is_immutable(request.url, response.status, headers):
+            try:
+                self._store(request.url, response.status, headers, response.body())
+            except OSError as e:
+                self.logger.warning(f"Could not cache {request.url}: {e}")
+        route.fulfill(response=response)
@@ -0,0 +1,129 @@
+"""
+Outbound HSM send latency, per template and attachment type, per environment.
+
+Every OutboundSendFlow.send() leaves a record with the time of each wizard
+step and the network timings of send_outbound ('ack': ENVIAR OUTBOUND click ->
+backend response, 'ttfb', 'confirmed': click -> success modal). conftest attaches
+the records to each test's JSON report entry (metadata "outbound") and the
+report gets an "outbound_latency" section built here. A template or attachment
+type whose ack p50 is Config.OUTBOUND_SLOW_THRESHOLD above the median of its
+environment is flagged as slow.
+
+Several JSON reports (e.g. one per environment, or a week of runs) can be
+combined from the command line:
+
+    python -m utils.outbound_latency runs/*/report.json -o outbound_latency.json
+"""
+import argparse
+import json
+import statistics
+from config.config import Config
+from utils.history import stats
+from utils.report import format_seconds
+
+METRICS = ("ack", "ttfb", "confirmed", "total")
+STEPS = ("reset", "select_campaign", "select_channel", "upload_contact_list", "select_template", "select_agent", "send_outbound")
+
+
+def collect_sends(tests: list, environment: str = None) -> list:
+    """Send records of the tests of a JSON report, tagged with their environment and test."""
+    records = []
+    for test in tests:
+        metadata = test.get("metadata") or {}
+        timeline_env = metadata.get("timeline", {}).get("env")
+        for record in metadata.get("outbound", []):
+            # An explicit environment (--env) wins over the one conftest stamped on the record
+            env = environment or record.get("env") or timeline_env or "unknown"
+            records.append(dict(record, env=env, nodeid=test["nodeid"]))
+    return records
+
+
+def _group(records: list) -> dict:
+    ok = [record for record in records if record["ok"]]
+    group = {"count": len(records), "failed": len(records) - len(ok)}
+    for metric in METRICS:
+        group[metric] = stats([record[metric] for record in ok if record.get(metric) is not None])
+    group["steps"] = {
+        step: stats([record["steps"][step] for record in ok if step in record["steps"]])["mean"]
+        for step in STEPS if any(step in record["steps"] for record in ok)
+    }
+    return group
+
+
+def _flag_slow(groups: dict, threshold: float) -> list:
+    """Names whose ack p50 is `threshold` above the median p50 of all the groups."""
+    medians = {name: group["ack"]["p50"] for name, group in groups.items() if group["ack"]["count"]}
+    if len(medians) < 2:
+        return []
+    baseline = statistics.median(medians.values())
+    slow = []
+    for name, p50 in medians.items():
+        groups[name]["vs_median"] = round(p50 / baseline - 1, 3) if baseline else None
+        if baseline and p50 > baseline * (1 + threshold):
+            slow.append(name)
+    return sorted(slow, key=lambda name: -medians[name])
+
+
+def aggregate_sends(records: list, threshold: float = None) -> dict:
+    """environment -> per template and per attachment type latency stats, plus the slow ones."""
+    threshold = Config.OUTBOUND_SLOW_THRESHOLD if threshold is None else threshold
+    environments = {}
+    for env in sorted({record["env"] for record in records}):
+        env_records = [record for record in records if record["env"] == env]
+        templates = {
+            template: dict(_group([record for record in env_records if record["template"] == template]),
+                           attachment=next(record["attachment"] for record in env_records if record["template"] == template))
+            for template in sorted({record["template"] for record in env_records})
+        }
+        attachments = {
+            kind: _group([record for record in env_records if record["attachment"] == kind])
+            for kind in sorted({record["attachment"] for record in env_records})
+        }
+        environments[env] = {
+            "sends": len(env_records),
+            "ack": stats([record["ack"] for record in env_records if record["ok"] and record.get("ack") is not None]),
+            "templates": templates,
+            "attachments": attachments,
+            "slow_templates": _flag_slow(templates, threshold),
+            "slow_attachments": _flag_slow(attachments, threshold),
+        }
+    return {"threshold": threshold, "environments": environments}
+
+
+def print_table(summary: dict):
+    for env, data in summary["environments"].items():
+        print(f"\n{env}: {data['sends']} envíos, ack p50 {format_seconds(data['ack'].get('p50'))}")
+        print(f"  {'Plantilla':<26} {'Adjunto':<8} {'n':>3} {'ack p50':>8} {'ack p95':>8} {'ttfb p50':>8} {'total p50':>9}")
+        for template, group in sorted(data["templates"].items(), key=lambda item: -(item[1]["ack"].get("p50") or 0)):
+            mark = "  <- lenta" if template in data["slow_templates"] else ""
+            print(
+                f"  {template:<26} {group['attachment']:<8} {group['count']:>3} {format_seconds(group['ack'].get('p50')):>8} "
+                f"{format_seconds(group['ack'].get('p95')):>8} {format_seconds(group['ttfb'].get('p50')):>8} "
+                f"{format_seconds(group['total'].get('p50')):>9}{mark}"
+            )
+        if data["slow_attachments"]:
+            print(f"  Adjuntos lentos: {', '.join(data['slow_attachments'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latencia de envío de outbound HSM por plantilla y ambiente")
+    parser.add_argument("reports", nargs="+", help="Reportes JSON de pytest (pytest-json-report)")
+    parser.add_argument("--env", help="Ambiente de los reportes (por defecto el registrado en cada test)")
+    parser.add_argument("--threshold", type=float, default=None, help="Cuánto por encima de la mediana se considera lenta (0.5 = +50%%)")
+    parser.add_argument("-o", "--output", help="Archivo JSON con la agregación")
+    args = parser.parse_args()
+
+    records = []
+    for path in args.reports:
+        with open(path) as f:
+            records.extend(collect_sends(json.load(f).get("tests", []), args.env))
+    summary = aggregate_sends(records, args.threshold)
+    print_table(summary)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+        print(f"\nResultados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Incremental parser for the verbose (-v) terminal output of a pytest run.
+
+Fed line by line while the subprocess runs, it keeps live pass/fail counts,
+the list of failed tests, an ETA and a bounded tail of the output, so the
+caller never has to buffer the whole run in memory.
+"""
+import re
+import time
+from collections import deque
+
+# xdist:  "[gw0] [ 45%] PASSED tests/agente/test_x.py::test_y[param id]"
+XDIST_RESULT = re.compile(r"^\[gw\d+\] \[\s*\d+%\] (PASSED|FAILED|ERROR|SKIPPED|XFAIL|XPASS) (\S+::.+?)\s*$")
+# plain:  "tests/agente/test_x.py::test_y[param id] PASSED    [ 45%]"
+PLAIN_RESULT = re.compile(r"^(\S+::.+?) (PASSED|FAILED|ERROR|SKIPPED|XFAIL|XPASS)\b")
+# "2 workers [11 items]" (xdist) or "collected 11 items"
+COLLECTED = re.compile(r"(?:\[(\d+) items?\]|collected (\d+) items?)")
+# "!!!! xdist.dsession.Interrupted: 3 login failures, ... !!!!" (fail-fast stop)
+INTERRUPTED = re.compile(r"Interrupted: (.+?) !*$")
+
+OUTCOMES = {
+    "PASSED": "passed",
+    "XPASS": "passed",
+    "FAILED": "failed",
+    "ERROR": "failed",
+    "SKIPPED": "skipped",
+    "XFAIL": "skipped",
+}
+SEVERITY = {"passed": 0, "skipped": 1, "failed": 2}
+
+
+class PytestProgress:
+    def __init__(self, tail_lines: int = 200):
+        self.started = time.monotonic()
+        self.total = 0
+        # nodeid -> outcome: a test reports once per phase (e.g. PASSED and then ERROR in teardown)
+        self.outcomes = {}
+        self.failures = []
+        self.interrupted = None
+        self.tail = deque(maxlen=tail_lines)
+
+    @property
+    def counts(self) -> dict:
+        counts = {"passed": 0, "failed": 0, "skipped": 0}
+        for outcome in self.outcomes.values():
+            counts[outcome] += 1
+        return counts
+
+    @property
+    def done(self) -> int:
+        return len(self.outcomes)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def eta(self):
+        """Seconds left, extrapolated from the average test duration so far (None until known)."""
+        if not self.total or not self.done:
+            return None
+        return max(0.0, self.elapsed / self.done * (self.total - self.done))
+
+    def feed(self, line: str) -> bool:
+        """Consumes one output line; returns True when the counts changed."""
+        line = line.rstrip()
+        self.tail.append(line)
+
+        match = XDIST_RESULT.match(line)
+        if match:
+            status, nodeid = match.groups()
+        else:
+            match = PLAIN_RESULT.match(line)
+            if not match:
+                interrupted = INTERRUPTED.search(line)
+                if interrupted:
+                    self.interrupted = interrupted.group(1)
+                    return True
+                collected = COLLECTED.search(line)
+                if collected and not self.total:
+                    self.total = int(collected.group(1) or collected.group(2))
+                    return True
+                return False
+            nodeid, status = match.groups()
+
+        outcome = OUTCOMES[status]
+        previous = self.outcomes.get(nodeid)
+        # A later phase can only make the test worse (PASSED -> ERROR in teardown), never better
+        if previous and SEVERITY[outcome] <= SEVERITY[previous]:
+            return False
+        self.outcomes[nodeid] = outcome
+        if outcome == "failed":
+            self.failures.append(nodeid)
+        return True
@@ -0,0 +1,574 @@
+"""
+Custom HTML report built from the pytest-json-report output.
+
+The HTML is streamed to disk test by test, so memory stays flat regardless of
+the number of tests. Screenshots are not inlined: they are exported next to the
+report (media/) as content-hashed WebP/JPEG files plus a small thumbnail, which
+the report lazy-loads. Usable from the bot or from the command line:
+
+    python -m utils.report report.json -o index.html --profile agente --env pantera
+"""
+import argparse
+import glob
+import hashlib
+import html
+import io
+import json
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from string import Template
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# Friendly names shown in the report
+TEST_NAME_MAPPING = {
+    "test_valid_login": "Login del Agente exitoso",
+    "test_logout_agente": "Cierre de sesión del Agente",
+    "test_agent_status_timer": "Contador de estado Online",
+    "test_agent_status_break": "Activacion de estado descanso",
+    "test_receive_email": "recibo de mail -agente",
+    "test_chat_closure": "Cierre chat mail"
+}
+
+FILE_NAME_MAPPING = {
+    "tests/agente/test_inbound_email.py": "Chat - Mail",
+    "tests/agente/test_outbound_agente.py": "Outbound - Envio HSM",
+    "tests/agente/test_agent_status.py": "Agente"
+}
+
+NO_CLASS = "Sin Clase"
+# Screenshots exported next to the report (without Pillow the PNG is copied as is)
+MEDIA_DIR = "media"
+IMAGE_FORMAT = os.getenv("REPORT_IMAGE_FORMAT", "webp").lower()  # webp or jpeg
+IMAGE_QUALITY = int(os.getenv("REPORT_IMAGE_QUALITY", 80))
+THUMBNAIL_WIDTH = 320
+MEDIA_WORKERS = 4
+TIMELINE_ROW_HEIGHT = 18  # px per nesting level in the per-test timeline
+SLOWEST_STEPS = 10
+TREND_ROWS = 15
+
+HEAD_TEMPLATE = Template("""<!DOCTYPE html>
+<html lang="es">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Reporte de Pruebas - $title</title>
+    <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
+    <style>
+        body { font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; background-color: #1e1e1e; color: #e0e0e0; margin: 0; padding: 20px; }
+        .container { max-width: 1200px; margin: 0 auto; background-color: #2d2d2d; padding: 30px; border-radius: 10px; box-shadow: 0 4px 15px rgba(0,0,0,0.5); display: flex; flex-wrap: wrap; gap: 30px; }
+        h1 { width: 100%; text-align: center; color: #ffffff; margin-bottom: 20px; border-bottom: 2px solid #444; padding-bottom: 10px; }
+
+        .left-panel { flex: 1; min-width: 300px; display: flex; flex-direction: column; align-items: center; }
+        .right-panel { flex: 2; min-width: 400px; }
+
+        .chart-container { width: 100%; max-width: 400px; height: 300px; position: relative; margin-bottom: 20px; }
+        .stats { width: 100%; font-size: 1.1em; background: #333; padding: 20px; border-radius: 8px; box-sizing: border-box; }
+        .stat-item { margin: 10px 0; display: flex; justify-content: space-between; }
+        .stat-value { font-weight: bold; }
+        .passed { color: #4caf50; }
+        .failed { color: #f44336; }
+
+        .test-list { height: 600px; overflow-y: auto; padding-right: 10px; }
+        .test-list::-webkit-scrollbar { width: 8px; }
+        .test-list::-webkit-scrollbar-track { background: #333; }
+        .test-list::-webkit-scrollbar-thumb { background: #555; border-radius: 4px; }
+        .test-list::-webkit-scrollbar-thumb:hover { background: #777; }
+
+        .test-item { background-color: #333; padding: 12px; margin-bottom: 8px; border-radius: 5px; border-left: 5px solid #777; transition: transform 0.2s; cursor: pointer; }
+        .test-item:hover { background-color: #3a3a3a; }
+        .test-item.passed { border-left-color: #4caf50; }
+        .test-item.failed { border-left-color: #f44336; }
+        .test-header { display: flex; justify-content: space-between; align-items: center; }
+        .test-name { font-weight: bold; font-size: 1em; }
+        .test-duration { font-size: 0.85em; color: #aaa; }
+        .error-details { background-color: #1e1e1e; padding: 10px; margin-top: 10px; border-radius: 4px; font-family: monospace; font-size: 0.9em; color: #ff8a80; white-space: pre-wrap; display: none; }
+        .timeline { position: relative; background: #1e1e1e; border-radius: 4px; margin-top: 10px; overflow: hidden; }
+        .timeline-span { position: absolute; height: 16px; line-height: 16px; font-size: 0.7em; color: #fff; padding: 0 3px; box-sizing: border-box; overflow: hidden; white-space: nowrap; text-overflow: ellipsis; border-right: 1px solid #1e1e1e; }
+        .timeline-span.step { background: #3f51b5; }
+        .timeline-span.action { background: #607d8b; }
+        .history { background: #333; padding: 15px; border-radius: 8px; margin-bottom: 20px; font-size: 0.9em; }
+        .history table { width: 100%; border-collapse: collapse; margin-top: 10px; }
+        .history td, .history th { padding: 4px; text-align: right; }
+        .history td:first-child, .history th:first-child { text-align: left; }
+        .history .regression td { color: #f44336; font-weight: bold; }
+        .history-chart { height: 160px; position: relative; }
+        .badge { font-size: 0.75em; padding: 2px 6px; border-radius: 3px; background: #b71c1c; color: #fff; margin-left: 8px; }
+        .steps { width: 100%; margin-top: 20px; background: #333; padding: 20px; border-radius: 8px; box-sizing: border-box; font-size: 0.9em; }
+        .steps table { width: 100%; border-collapse: collapse; }
+        .steps td, .steps th { padding: 4px; text-align: right; }
+        .steps td:first-child, .steps th:first-child { text-align: left; }
+        .steps .slow td { color: #f44336; font-weight: bold; }
+        .footer { width: 100%; text-align: center; margin-top: 20px; color: #777; font-size: 0.8em; }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <h1>Reporte de Ejecución: $title</h1>
+
+        <div class="left-panel">
+            <div class="chart-container">
+                <canvas id="resultsChart"></canvas>
+            </div>
+            <div class="stats">
+                <div class="stat-item"><span>Total:</span> <span class="stat-value">$total</span></div>
+                <div class="stat-item"><span class="passed">Pasados:</span> <span class="stat-value passed">$passed</span></div>
+                <div class="stat-item"><span class="failed">Fallados:</span> <span class="stat-value failed">$failed</span></div>
+                <div class="stat-item"><span>Duración Total:</span> <span class="stat-value">${duration}s</span></div>
+$scheduling
+            </div>
+$steps
+$outbound
+        </div>
+
+        <div class="right-panel">
+$history
+            <h2>Detalle de Pruebas ($total)</h2>
+            <div class="test-list">
+""")
+
+FOOTER_TEMPLATE = Template("""
+            </div>
+        </div>
+        <div class="footer">Generado el $generated</div>
+    </div>
+
+    <script>
+        const ctx = document.getElementById('resultsChart').getContext('2d');
+
+        // Plugin to draw text in center
+        const centerTextPlugin = {
+            id: 'centerText',
+            beforeDraw: function(chart) {
+                var width = chart.chartArea.width,
+                    height = chart.chartArea.height,
+                    ctx = chart.ctx;
+
+                ctx.restore();
+                var fontSize = (height / 114).toFixed(2);
+                ctx.font = fontSize + "em sans-serif";
+                ctx.textBaseline = "middle";
+                ctx.fillStyle = "#ffffff";
+
+                var text = "$total",
+                    textX = Math.round((width - ctx.measureText(text).width) / 2) + chart.chartArea.left,
+                    textY = (height / 2) + chart.chartArea.top;
+
+                ctx.fillText(text, textX, textY);
+                ctx.save();
+            }
+        };
+
+        new Chart(ctx, {
+            type: 'doughnut',
+            data: {
+                labels: ['Pasados', 'Fallados'],
+                datasets: [{
+                    data: [$passed, $failed],
+                    backgroundColor: ['#4caf50', '#f44336'],
+                    borderWidth: 0
+                }]
+            },
+            options: {
+                responsive: true,
+                maintainAspectRatio: false,
+                plugins: {
+                    legend: { position: 'bottom', labels: { color: '#fff' } }
+                }
+            },
+            plugins: [centerTextPlugin]
+        });
+    </script>
+</body>
+</html>
+""")
+
+
+def display_test_name(test_name: str) -> str:
+    base_name, _, param_id = test_name.partition("[")
+    if base_name in TEST_NAME_MAPPING:
+        return TEST_NAME_MAPPING[base_name]
+    # Unmapped parametrized tests (e.g. test_outbound_send[qa_documento]) show their id
+    return param_id.rstrip("]") or test_name
+
+
+def display_file_name(file_path: str) -> str:
+    display_name = FILE_NAME_MAPPING.get(file_path)
+    if display_name:
+        return display_name
+    # Format file path to friendly name
+    # e.g., tests/agente/test_login_agente.py -> Login
+    display_name = file_path.split("/")[-1].replace("test_", "").replace(".py", "")
+    if "_" in display_name:
+        display_name = display_name.split("_")[0]
+    return display_name.capitalize()
+
+
+def _safe_name(nodeid: str) -> str:
+    return nodeid.replace("::", "_").replace("/", "_").replace(".py", "")
+
+
+def screenshot_path_for(nodeid: str, screenshots_dir: str = "screenshots") -> str:
+    return os.path.join(screenshots_dir, f"{_safe_name(nodeid)}.png")
+
+
+def trace_name_for(nodeid: str, index: int = 0) -> str:
+    """Playwright trace file of a test (index > 0 for its extra browser contexts)."""
+    return f"{_safe_name(nodeid)}{f'.{index}' if index else ''}.trace.zip"
+
+
+def trace_files_for(nodeid: str, traces_dir: str = "traces") -> list:
+    """Names of the traces kept for a test, plain (.zip) or zstd-compressed (.zip.zst)."""
+    pattern = os.path.join(glob.escape(traces_dir), glob.escape(_safe_name(nodeid)) + "*.trace.zip*")
+    return sorted(os.path.basename(path) for path in glob.glob(pattern))
+
+
+def format_seconds(value) -> str:
+    """A duration for tables and reports: "1.23s", or "-" when it was not measured."""
+    return f"{value:.2f}s" if value is not None else "-"
+
+
+def full_duration(test: dict) -> float:
+    """Setup + call + teardown, matching what the user sees in the list."""
+    return sum(test.get(phase, {}).get("duration", 0) for phase in ("setup", "call", "teardown"))
+
+
+def summarize(data: dict) -> dict:
+    summary = data.get("summary", {})
+    return {
+        "passed": summary.get("passed", 0),
+        "failed": summary.get("failed", 0),
+        "total": summary.get("total", 0),
+        "duration": sum(full_duration(test) for test in data.get("tests", [])),
+    }
+
+
+def group_tests(tests: list) -> dict:
+    """File -> Class -> [tests], preserving execution order."""
+    grouped = {}
+    for test in tests:
+        parts = test["nodeid"].split("::")
+        class_name = parts[1] if len(parts) > 2 else NO_CLASS
+        grouped.setdefault(parts[0], {}).setdefault(class_name, []).append(test)
+    return grouped
+
+
+def _format_logs(logs) -> str:
+    # pytest-json-report stores captured logs as a list of LogRecord dicts
+    if isinstance(logs, list):
+        return "\n".join(f"{record.get('levelname', '')} {record.get('name', '')}: {record.get('msg', '')}" for record in logs)
+    return str(logs or "")
+
+
+def _error_message(test: dict) -> str:
+    if test.get("outcome") not in ("failed", "error"):
+        return ""
+    for phase in ("setup", "call", "teardown"):
+        longrepr = test.get(phase, {}).get("longrepr")
+        if longrepr:
+            return longrepr
+    return "Error desconocido"
+
+
+def _steps_table(step_timings: dict) -> str:
+    """Slowest named steps of the run (by total time), from the step_timings JSON section."""
+    if not step_timings:
+        return ""
+    slowest = sorted(step_timings.items(), key=lambda item: item[1]["total"], reverse=True)[:SLOWEST_STEPS]
+    rows = "".join(
+        f"<tr><td>{html.escape(name)}</td><td>{stats['count']}</td><td>{stats['mean']:.2f}s</td><td>{stats['max']:.2f}s</td></tr>"
+        for name, stats in slowest
+    )
+    return f"""            <div class="steps">
+                <strong>Pasos más lentos</strong>
+                <table><tr><th>Paso</th><th>N</th><th>Prom.</th><th>Máx.</th></tr>{rows}</table>
+            </div>"""
+
+
+def _outbound_table(outbound_latency: dict) -> str:
+    """Outbound send acknowledgement per template (slow ones in red), from the outbound_latency JSON section."""
+    if not outbound_latency or not outbound_latency.get("environments"):
+        return ""
+    sections = ""
+    for env, data in outbound_latency["environments"].items():
+        rows = ""
+        templates = sorted(data["templates"].items(), key=lambda item: item[1]["ack"].get("p50") or 0, reverse=True)
+        for template, group in templates:
+            slow = template in data["slow_templates"]
+            rows += (
+                f'<tr class="{"slow" if slow else ""}"><td>{html.escape(template)}{" 🐢" if slow else ""}</td>'
+                f'<td>{html.escape(group["attachment"])}</td><td>{group["count"]}</td>'
+                f'<td>{format_seconds(group["ack"].get("p50"))}</td><td>{format_seconds(group["ack"].get("p95"))}</td>'
+                f'<td>{format_seconds(group["total"].get("p50"))}</td></tr>'
+            )
+        slow_attachments = ", ".join(data["slow_attachments"]) or "ninguno"
+        sections += f"""
+                <div style="margin-top: 10px;">{html.escape(env)} · adjuntos lentos: {html.escape(slow_attachments)}</div>
+                <table><tr><th>Plantilla</th><th>Adjunto</th><th>N</th><th>Ack p50</th><th>Ack p95</th><th>Total p50</th></tr>{rows}</table>"""
+    threshold = int(outbound_latency["threshold"] * 100)
+    return f"""            <div class="steps">
+                <strong>Envío de Outbound</strong> (ack: clic en ENVIAR OUTBOUND → respuesta del backend; lenta: &gt; +{threshold}% sobre la mediana){sections}
+            </div>"""
+
+
+def _scheduling_stat(scheduling: dict) -> str:
+    """Predicted vs actual makespan when xdist used the duration-aware scheduler."""
+    if not scheduling or scheduling.get("strategy") != "duration" or scheduling.get("actual_makespan") is None:
+        return ""
+    return (
+        f'                <div class="stat-item"><span>Makespan (previsto/real):</span> '
+        f'<span class="stat-value">{scheduling["predicted_makespan"]:.0f}s / {scheduling["actual_makespan"]:.0f}s</span></div>'
+    )
+
+
+def _history_section(history: dict) -> str:
+    """p50/p95 trends against the rolling baseline (utils.history analysis) and the suite duration chart."""
+    if not history or not history.get("tests"):
+        return ""
+    with_baseline = [test for test in history["tests"] if test.get("p50") is not None]
+    rows = ""
+    for test in sorted(with_baseline, key=lambda test: test.get("change") or 0, reverse=True)[:TREND_ROWS]:
+        name = html.escape(display_test_name(test["nodeid"].split("::")[-1]))
+        change = f"{test['change'] * 100:+.0f}%" if test.get("change") is not None else "-"
+        rows += (
+            f'<tr class="{"regression" if test["regression"] else ""}"><td>{name}</td><td>{test["duration"]:.2f}s</td>'
+            f'<td>{test["p50"]:.2f}s</td><td>{test["p95"]:.2f}s</td><td>{change}</td></tr>'
+        )
+    runs = history.get("runs", [])
+    labels = json.dumps([datetime.fromtimestamp(run["started_at"]).strftime("%d/%m %H:%M") for run in runs])
+    durations = json.dumps([round(run["duration"] or 0, 1) for run in runs])
+    threshold = int(history["threshold"] * 100)
+    return f"""            <div class="history">
+                <strong>Tendencias</strong> (línea base: {history["baseline_runs"]} ejecuciones previas de {html.escape(history["environment"])}) ·
+                <span class="{"failed" if history["regressions"] else "passed"}">{history["regressions"]} regresiones (&gt; +{threshold}% sobre p50)</span>
+                <div class="history-chart"><canvas id="historyChart"></canvas></div>
+                <table><tr><th>Test</th><th>Ahora</th><th>p50</th><th>p95</th><th>Δ p50</th></tr>{rows}</table>
+            </div>
+            <script>
+                new Chart(document.getElementById('historyChart').getContext('2d'), {{
+                    type: 'line',
+                    data: {{ labels: {labels}, datasets: [{{ label: 'Duración de la suite (s)', data: {durations}, borderColor: '#03a9f4', tension: 0.2 }}] }},
+                    options: {{ responsive: true, maintainAspectRatio: false, plugins: {{ legend: {{ labels: {{ color: '#fff' }} }} }},
+                               scales: {{ x: {{ ticks: {{ color: '#aaa' }} }}, y: {{ ticks: {{ color: '#aaa' }} }} }} }}
+                }});
+            </script>"""
+
+
+def _write_timeline(out, timeline: dict):
+    """Flame-graph style bars: one row per nesting level, x axis is time since the test started."""
+    spans = timeline.get("spans") or []
+    if not spans:
+        return
+    total = timeline.get("duration") or max(span["start"] + span["duration"] for span in spans) or 1
+    rows = max(span["depth"] for span in spans) + 1
+    out.write(f"""
+                            <details style="margin-top: 5px; border: 1px solid #444; border-radius: 4px; padding: 5px;">
+                                <summary style="cursor: pointer; color: #aaa;">⏱️ Línea de Tiempo ({len(spans)} acciones · {html.escape(str(timeline.get("worker", "")))})</summary>
+                                <div class="timeline" style="height: {rows * TIMELINE_ROW_HEIGHT}px;">
+""")
+    for span in spans:
+        left = span["start"] / total * 100
+        width = max(span["duration"] / total * 100, 0.2)
+        label = html.escape(span["name"], quote=True)
+        out.write(
+            f'<div class="timeline-span {span["kind"]}" style="left: {left:.2f}%; width: {width:.2f}%; '
+            f'top: {span["depth"] * TIMELINE_ROW_HEIGHT}px;" title="{label} · {span["duration"]:.2f}s">{label}</div>'
+        )
+    out.write("""
+                                </div>
+                            </details>
+""")
+
+
+def export_screenshot(path: str, media_dir: str) -> tuple:
+    """
+    Writes a screenshot into media_dir as <sha256>.webp|jpg plus a <sha256>.thumb.* thumbnail
+    and returns both file names. Names depend only on the content, so repeated screenshots
+    (and re-rendered reports) reuse the same files.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()[:20]
+    os.makedirs(media_dir, exist_ok=True)
+    if Image is None:
+        name = f"{digest}.png"
+        if not os.path.exists(os.path.join(media_dir, name)):
+            shutil.copyfile(path, os.path.join(media_dir, name))
+        return name, name
+
+    extension, image_format = ("webp", "WEBP") if IMAGE_FORMAT == "webp" else ("jpg", "JPEG")
+    # WebP method 2 encodes ~40% faster than the default 4 for a few % more bytes
+    options = {"quality": IMAGE_QUALITY, "method": 2} if image_format == "WEBP" else {"quality": IMAGE_QUALITY}
+    full, thumb = f"{digest}.{extension}", f"{digest}.thumb.{extension}"
+    if not (os.path.exists(os.path.join(media_dir, full)) and os.path.exists(os.path.join(media_dir, thumb))):
+        with Image.open(io.BytesIO(data)) as image:
+            image = image.convert("RGB")
+            image.save(os.path.join(media_dir, full), image_format, **options)
+            image.thumbnail((THUMBNAIL_WIDTH, THUMBNAIL_WIDTH * image.height // max(image.width, 1)))
+            image.save(os.path.join(media_dir, thumb), image_format, **options)
+    return full, thumb
+
+
+def _export_screenshots(tests: list, screenshots_dir: str, media_dir: str) -> dict:
+    """nodeid -> (full, thumbnail) for every test with a screenshot, converted in parallel."""
+    paths = {
+        test["nodeid"]: screenshot_path_for(test["nodeid"], screenshots_dir)
+        for test in tests if os.path.exists(screenshot_path_for(test["nodeid"], screenshots_dir))
+    }
+    if not paths:
+        return {}
+    with ThreadPoolExecutor(max_workers=MEDIA_WORKERS) as executor:
+        exported = executor.map(lambda path: export_screenshot(path, media_dir), paths.values())
+        return dict(zip(paths, exported))
+
+
+def _write_test(out, test: dict, counter: int, screenshot: tuple = None, trend: dict = None, traces_dir: str = "traces"):
+    status = test["outcome"]
+    name = html.escape(display_test_name(test["nodeid"].split("::")[-1]))
+    if trend and trend.get("regression"):
+        name += f'<span class="badge">🐢 {trend["change"] * 100:+.0f}% vs p50</span>'
+    logs = _format_logs(test.get("call", {}).get("log"))
+    error_msg = _error_message(test)
+
+    out.write(f"""
+                    <div class="test-item {status}">
+                        <div class="test-header" onclick="this.parentElement.querySelector('.details-container').style.display = this.parentElement.querySelector('.details-container').style.display === 'block' ? 'none' : 'block'">
+                            <span class="test-name">#{counter} {name}</span>
+                            <span class="test-duration">{full_duration(test):.2f}s</span>
+                        </div>
+                        <div class="details-container" style="display: none; margin-top: 10px;">
+""")
+    if error_msg:
+        out.write(f'<div style="color: #ff8a80; margin-bottom: 10px; padding: 10px; background: #2a1a1a; border-radius: 4px;"><strong>Error:</strong><br>{html.escape(error_msg)}</div>')
+    if logs:
+        out.write(f"""
+                            <details style="margin-top: 5px; border: 1px solid #444; border-radius: 4px; padding: 5px;">
+                                <summary style="cursor: pointer; color: #aaa;">📄 Logs de Ejecución</summary>
+                                <pre style="background: #111; padding: 10px; overflow-x: auto; color: #ccc; margin-top: 5px; white-space: pre-wrap;">{html.escape(logs)}</pre>
+                            </details>
+""")
+    else:
+        out.write('<div style="color: #555; font-style: italic; margin-top: 5px;">No logs captured</div>')
+
+    for send in test.get("metadata", {}).get("outbound", []):
+        out.write(
+            f'<div style="margin-top: 5px; color: #aaa;">📤 Envío {html.escape(send["template"])}: '
+            f'ack {format_seconds(send.get("ack"))} (HTTP {send.get("status") or "-"}), '
+            f'modal de éxito {format_seconds(send.get("confirmed"))}, wizard completo {format_seconds(send.get("total"))}</div>'
+        )
+
+    _write_timeline(out, test.get("metadata", {}).get("timeline", {}))
+
+    # Traces are uploaded next to index.html under traces/, so the links are relative
+    for trace in trace_files_for(test["nodeid"], traces_dir):
+        hint = "descomprimir con <code>zstd -d</code> y abrir" if trace.endswith(".zst") else "abrir"
+        out.write(f"""
+                            <div style="margin-top: 5px; color: #aaa;">🎞️ <a href="traces/{html.escape(trace)}" style="color: #64b5f6;">Trace de Playwright</a>
+                                ({hint} con <code>playwright show-trace</code> o en trace.playwright.dev)</div>
+""")
+
+    if screenshot:
+        full, thumb = screenshot
+        out.write(f"""
+                            <details style="margin-top: 5px; border: 1px solid #444; border-radius: 4px; padding: 5px;">
+                                <summary style="cursor: pointer; color: #aaa;">📸 Captura de Pantalla</summary>
+                                <div style="margin-top: 10px; text-align: center;">
+                                    <a href="{full}" target="_blank"><img src="{thumb}" loading="lazy" decoding="async" width="{THUMBNAIL_WIDTH}" style="max-width: 100%; border: 1px solid #555; border-radius: 4px;"></a>
+                                </div>
+                            </details>
+""")
+    out.write("""
+                        </div>
+                    </div>
+""")
+
+
+def render_report(json_path: str, output_path: str, profile: str, environment: str, screenshots_dir: str = "screenshots",
+                  history: dict = None, traces_dir: str = "traces", media_url: str = MEDIA_DIR) -> dict:
+    """
+    Writes the HTML report for a pytest-json-report file and returns its summary stats.
+    `history` is the utils.history analysis of this run (trends section and regression badges).
+    Traces found in `traces_dir` are linked as traces/<name>, relative to the report; screenshots
+    are exported to media/ next to output_path and linked under `media_url` (where they are published).
+    """
+    with open(json_path, "r") as f:
+        data = json.load(f)
+    summary = summarize(data)
+    media_dir = os.path.join(os.path.dirname(os.path.abspath(output_path)), MEDIA_DIR)
+    screenshots = {
+        nodeid: (f"{media_url}/{full}", f"{media_url}/{thumb}")
+        for nodeid, (full, thumb) in _export_screenshots(data.get("tests", []), screenshots_dir, media_dir).items()
+    }
+    title = html.escape(f"{profile.capitalize()} [{environment}]")
+    trends = {test["nodeid"]: test for test in (history or {}).get("tests", [])}
+
+    with open(output_path, "w", encoding="utf-8") as out:
+        out.write(HEAD_TEMPLATE.substitute(
+            title=title, total=summary["total"], passed=summary["passed"], failed=summary["failed"],
+            duration=f"{summary['duration']:.2f}", scheduling=_scheduling_stat(data.get("scheduling")),
+            steps=_steps_table(data.get("step_timings")),
+            outbound=_outbound_table(data.get("outbound_latency")),
+            history=_history_section(history),
+        ))
+
+        for file_path, classes in group_tests(data.get("tests", [])).items():
+            test_counter = 1
+            out.write(f"""
+                <details style="margin-bottom: 15px; border: 1px solid #444; border-radius: 5px; overflow: hidden;">
+                    <summary style="background: #252525; padding: 10px; cursor: pointer; font-weight: bold; color: #ddd;">📂 {html.escape(display_file_name(file_path))}</summary>
+                    <div style="padding: 10px; background: #2d2d2d;">
+""")
+            for class_name, tests in classes.items():
+                if class_name != NO_CLASS:
+                    out.write(f"""
+                        <details style="margin-bottom: 10px; margin-left: 10px; border-left: 2px solid #555;">
+                            <summary style="padding: 5px 10px; cursor: pointer; font-weight: bold; color: #aaa;">📦 {html.escape(class_name)}</summary>
+                            <div style="padding-left: 15px;">
+""")
+                else:
+                    out.write('<div style="margin-left: 10px;">')
+
+                for test in tests:
+                    _write_test(out, test, test_counter, screenshots.get(test["nodeid"]), trends.get(test["nodeid"]), traces_dir)
+                    test_counter += 1
+
+                out.write("</div></details>" if class_name != NO_CLASS else "</div>")
+            out.write("</div></details>")
+
+        out.write(FOOTER_TEMPLATE.substitute(
+            generated=datetime.now().strftime("%d/%m/%Y %H:%M:%S"),
+            total=summary["total"], passed=summary["passed"], failed=summary["failed"],
+        ))
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera el reporte HTML a partir del JSON de pytest-json-report")
+    parser.add_argument("json_report", help="Archivo generado con --json-report")
+    parser.add_argument("-o", "--output", default="index.html")
+    parser.add_argument("--profile", default="agente")
+    parser.add_argument("--env", default="pantera")
+    parser.add_argument("--screenshots-dir", default="screenshots")
+    parser.add_argument("--traces-dir", default="traces")
+    parser.add_argument("--history-db", help="Histórico SQLite local donde registrar la ejecución (sección de tendencias)")
+    parser.add_argument("--run-id", default=datetime.now().strftime("%Y%m%d-%H%M%S"))
+    args = parser.parse_args()
+    history = None
+    if args.history_db:
+        from utils.history import HistoryStore
+        with open(args.json_report) as f:
+            report = json.load(f)
+        with HistoryStore(args.history_db) as store:
+            store.record_run(args.run_id, args.env, args.profile, report)
+            history = store.analyze(args.run_id)
+    summary = render_report(args.json_report, args.output, args.profile, args.env, args.screenshots_dir, history, args.traces_dir)
+    print(f"Reporte generado en {args.output}: {summary['passed']}/{summary['total']} pasados")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+CPU time and memory of a test process and the browsers it drives.
+
+Most of a worker's cost is not in Python but in the Playwright driver and the
+Chromium processes under it, which exit (and take their counters with them)
+when the browser is recycled. ResourceMonitor samples the whole process tree
+from a background thread and remembers the last CPU time seen for every
+process, so the total survives browser restarts, along with the peak RSS of
+the tree. Without the optional psutil package it falls back to getrusage(),
+which only sees this process and the children it already waited for. On
+Windows without psutil neither is available and the figures stay at zero.
+"""
+import os
+import threading
+import time
+
+try:
+    import resource
+except ImportError:
+    # Windows
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+MONITOR_AVAILABLE = psutil is not None or resource is not None
+
+RESOURCE_SAMPLE_INTERVAL = float(os.getenv("RESOURCE_SAMPLE_INTERVAL", 1.0))
+
+
+class ResourceMonitor:
+    def __init__(self, interval: float = None, children: bool = True):
+        self.interval = RESOURCE_SAMPLE_INTERVAL if interval is None else interval
+        # False for an xdist controller, whose children are the workers (measured on their own)
+        self.children = children
+        self.started = time.perf_counter()
+        self.peak_rss = 0
+        self.peak_processes = 0
+        # (pid, create_time) -> last user+system seconds seen for that process
+        self._cpu = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def sample(self):
+        if psutil is None:
+            return
+        root = psutil.Process()
+        rss, seen = 0, {}
+        for process in [root] + (root.children(recursive=True) if self.children else []):
+            try:
+                with process.oneshot():
+                    times = process.cpu_times()
+                    seen[(process.pid, process.create_time())] = times.user + times.system
+                    rss += process.memory_info().rss
+            except psutil.Error:
+                continue
+        with self._lock:
+            self._cpu.update(seen)
+            self.peak_rss = max(self.peak_rss, rss)
+            self.peak_processes = max(self.peak_processes, len(seen))
+
+    def cpu_seconds(self) -> float:
+        """CPU time used so far by the process tree (monotonic, for before/after deltas)."""
+        if psutil is None:
+            if resource is None:
+                return 0.0
+            who = (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN) if self.children else (resource.RUSAGE_SELF,)
+            usage = [resource.getrusage(item) for item in who]
+            return sum(item.ru_utime + item.ru_stime for item in usage)
+        self.sample()
+        with self._lock:
+            return sum(self._cpu.values())
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def start(self):
+        self.sample()
+        if psutil is not None and self.interval > 0:
+            self._thread = threading.Thread(target=self._run, name="resource-monitor", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def usage(self) -> dict:
+        """Wall time since start, CPU seconds and peak RSS (MB) of the process tree."""
+        cpu = self.cpu_seconds()
+        if psutil is not None:
+            peak_rss, source = self.peak_rss, "psutil"
+        elif resource is not None:
+            # ru_maxrss is in KB on Linux; only this process is visible
+            peak_rss, source = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024, "getrusage"
+        else:
+            peak_rss, source = 0, None
+        return {
+            "wall": round(time.perf_counter() - self.started, 3),
+            "cpu": round(cpu, 3),
+            "peak_rss_mb": round(peak_rss / 2 ** 20, 1),
+            "processes": self.peak_processes if psutil is not None else None,
+            "source": source,
+        }
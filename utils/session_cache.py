@@ -0,0 +1,130 @@
+import base64
+import json
+import os
+import re
+import time
+from playwright.sync_api import BrowserContext, Page
+from config.config import Config
+from utils.logger import get_logger
+
+JWT_PATTERN = re.compile(r"^[A-Za-z0-9_-]+\.([A-Za-z0-9_-]+)\.[A-Za-z0-9_-]+$")
+
+# Restores the sessionStorage captured at login time, which storage_state() does not persist
+SESSION_STORAGE_SCRIPT = """
+(function(entries, origin) {
+    if (window.location.origin !== origin) return;
+    for (const [key, value] of Object.entries(entries)) {
+        if (window.sessionStorage.getItem(key) === null) window.sessionStorage.setItem(key, value);
+    }
+})(%s, %s);
+"""
+
+
+class SessionCache:
+    """
+    Caches authenticated Playwright storage states on disk, keyed by
+    (environment, user), so only one UI login per user is needed.
+
+    Each entry is a storage_state file plus a small meta file with the save
+    time and the sessionStorage snapshot. An entry is considered valid while
+    it is younger than the TTL and no JWT found in it has expired.
+    """
+
+    def __init__(self, cache_dir: str = None, ttl: int = None):
+        self.logger = get_logger(self.__class__.__name__)
+        self.cache_dir = cache_dir or Config.AUTH_CACHE_DIR
+        self.ttl = Config.AUTH_CACHE_TTL if ttl is None else ttl
+
+    def _paths(self, env: str, user: str):
+        safe_user = re.sub(r"[^A-Za-z0-9_.-]", "_", user)
+        base = os.path.join(self.cache_dir, env, safe_user)
+        return f"{base}.json", f"{base}.meta.json"
+
+    @staticmethod
+    def _write_atomic(path: str, data: dict):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _jwt_expiry(value: str):
+        """Returns the 'exp' claim of a JWT string, or None if value is not a JWT."""
+        match = JWT_PATTERN.match(value.strip('"'))
+        if not match:
+            return None
+        payload = match.group(1)
+        try:
+            claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+            return claims.get("exp") if isinstance(claims, dict) else None
+        except Exception:
+            return None
+
+    def _token_expired(self, state: dict, meta: dict) -> bool:
+        values = [item["value"] for origin in state.get("origins", []) for item in origin.get("localStorage", [])]
+        values += list(meta.get("session_storage", {}).values())
+        # Keep a one minute margin so the token does not expire in the middle of a test
+        deadline = time.time() + 60
+        for value in values:
+            expiry = self._jwt_expiry(value) if isinstance(value, str) else None
+            if expiry is not None and expiry < deadline:
+                return True
+        return False
+
+    def load(self, env: str, user: str):
+        """Returns (storage_state_path, meta) for a valid entry, or (None, None)."""
+        state_path, meta_path = self._paths(env, user)
+        try:
+            with open(state_path) as f:
+                state = json.load(f)
+            with open(meta_path) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None, None
+        try:
+            age = time.time() - meta["saved_at"]
+            token_expired = self._token_expired(state, meta)
+        except (KeyError, TypeError, AttributeError):
+            # Valid JSON but not a cache entry (truncated by hand, older format...)
+            self.logger.warning(f"Cached session for {user}@{env} is corrupt, discarding it")
+            self.invalidate(env, user)
+            return None, None
+
+        if age > self.ttl:
+            self.logger.info(f"Cached session for {user}@{env} expired by TTL ({age:.0f}s old)")
+            self.invalidate(env, user)
+            return None, None
+        if token_expired:
+            self.logger.info(f"Cached session for {user}@{env} has an expired token")
+            self.invalidate(env, user)
+            return None, None
+        return state_path, meta
+
+    def save(self, page: Page, env: str, user: str):
+        state_path, meta_path = self._paths(env, user)
+        os.makedirs(os.path.dirname(state_path), exist_ok=True)
+        try:
+            session_storage = page.evaluate("() => Object.assign({}, window.sessionStorage)")
+        except Exception:
+            session_storage = {}
+        self._write_atomic(state_path, page.context.storage_state())
+        self._write_atomic(meta_path, {
+            "saved_at": time.time(),
+            "origin": page.evaluate("() => window.location.origin"),
+            "session_storage": session_storage,
+        })
+        self.logger.info(f"Session for {user}@{env} cached at {state_path}")
+
+    def invalidate(self, env: str, user: str):
+        for path in self._paths(env, user):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    @staticmethod
+    def restore_session_storage(context: BrowserContext, meta: dict):
+        if meta and meta.get("session_storage"):
+            context.add_init_script(
+                SESSION_STORAGE_SCRIPT % (json.dumps(meta["session_storage"]), json.dumps(meta.get("origin", "")))
+            )
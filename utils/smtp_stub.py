@@ -0,0 +1,120 @@
+"""
+Local SMTP stand-in (aiosmtpd) to exercise EmailSender without Gmail.
+
+Accepts every message, keeps who/what/when in memory and can add an
+artificial per-message latency. Run it in the background and point the
+sender at it:
+
+    python -m utils.smtp_stub --port 8025
+    SMTP_SERVER=127.0.0.1 SMTP_PORT=8025 SMTP_STARTTLS=false SMTP_SENDER=qa@example.com \
+        python -m utils.email_sender --count 200
+"""
+import argparse
+import asyncio
+import socket
+import threading
+import time
+from email import message_from_bytes
+from aiosmtpd.controller import Controller
+from utils.logger import get_logger
+
+
+def plain_text(message) -> str:
+    """First text/plain part of a parsed email (the whole payload for non-multipart ones)."""
+    for part in message.walk():
+        if part.get_content_type() == "text/plain":
+            payload = part.get_payload(decode=True) or b""
+            return payload.decode(part.get_content_charset() or "utf-8", errors="replace")
+    return ""
+
+
+class RecordingHandler:
+    def __init__(self, latency: float = 0.0, on_message=None):
+        self.latency = latency
+        # Called with every accepted message (record + "body"), e.g. to turn it into a mock chat
+        self.on_message = on_message
+        self.messages = []
+        self.sessions = set()
+        self._lock = threading.Lock()
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        message = message_from_bytes(envelope.original_content or envelope.content)
+        record = {
+            "from": envelope.mail_from,
+            "to": list(envelope.rcpt_tos),
+            "subject": message["Subject"],
+            "message_id": message["Message-ID"],
+            "received_at": time.time(),
+        }
+        with self._lock:
+            self.sessions.add(id(session))
+            self.messages.append(record)
+        if self.on_message is not None:
+            self.on_message(dict(record, body=plain_text(message)))
+        return "250 Message accepted for delivery"
+
+
+class SmtpStub:
+    def __init__(self, host: str = "127.0.0.1", port: int = 8025, latency: float = 0.0, on_message=None):
+        self.logger = get_logger(self.__class__.__name__)
+        self.handler = RecordingHandler(latency, on_message)
+        self.controller = Controller(self.handler, hostname=host, port=port)
+
+    @classmethod
+    def on_free_port(cls, host: str = "127.0.0.1", latency: float = 0.0, on_message=None) -> "SmtpStub":
+        """
+        A stub on a currently unused port, so one left running on 8025 is not disturbed.
+        aiosmtpd cannot listen on port 0, so the port is picked by binding a throwaway socket.
+        """
+        with socket.socket() as sock:
+            sock.bind((host, 0))
+            port = sock.getsockname()[1]
+        return cls(host, port, latency, on_message)
+
+    @property
+    def port(self) -> int:
+        return self.controller.port
+
+    @property
+    def messages(self) -> list:
+        return self.handler.messages
+
+    @property
+    def connections(self) -> int:
+        """SMTP sessions that delivered at least one message (= connections the sender opened)."""
+        return len(self.handler.sessions)
+
+    def start(self):
+        self.controller.start()
+        self.logger.info(f"SMTP stub listening on {self.controller.hostname}:{self.controller.port}")
+        return self
+
+    def stop(self):
+        self.controller.stop()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor SMTP local que acepta y registra todos los emails")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--latency", type=float, default=0.0, help="Segundos de demora por mensaje")
+    args = parser.parse_args()
+    with SmtpStub(args.host, args.port, args.latency) as stub:
+        try:
+            while True:
+                time.sleep(10)
+                print(f"{len(stub.messages)} mensajes recibidos en {stub.connections} conexiones")
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
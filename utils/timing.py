@@ -0,0 +1,87 @@
+"""
+Per-test timeline of page-object actions and named steps.
+
+BasePage records every action (click, fill, goto...) and every step() block
+as a span on the process-wide `recorder`; conftest starts a timeline when a
+test begins and attaches it to the test's pytest-json-report metadata.
+Recording is a perf_counter() call and a list append, so it stays on in
+every run.
+"""
+import time
+from contextlib import contextmanager
+
+# Upper bound of spans kept per test, so a runaway loop cannot bloat the JSON report
+MAX_SPANS = 1000
+
+
+class TimingRecorder:
+    def __init__(self):
+        self.tags = {}
+        self._origin = None
+        self._spans = []
+        self._depth = 0
+        self._dropped = 0
+
+    def start_test(self, nodeid: str, worker: str, environment: str):
+        self.tags = {"nodeid": nodeid, "worker": worker, "env": environment}
+        self._origin = time.perf_counter()
+        self._spans = []
+        self._depth = 0
+        self._dropped = 0
+
+    @contextmanager
+    def span(self, name: str, kind: str = "action"):
+        """Times the enclosed block; nested spans get a larger depth (flame graph rows)."""
+        start = time.perf_counter()
+        depth = self._depth
+        self._depth += 1
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self._depth = depth
+            if self._origin is not None:
+                if len(self._spans) < MAX_SPANS:
+                    self._spans.append({
+                        "name": name,
+                        "kind": kind,
+                        "start": round(start - self._origin, 4),
+                        "duration": round(end - start, 4),
+                        "depth": depth,
+                    })
+                else:
+                    self._dropped += 1
+
+    def finish_test(self) -> dict:
+        """Returns the timeline of the current test (tags + spans in start order) and stops recording."""
+        if self._origin is None:
+            return {}
+        timeline = dict(self.tags)
+        timeline["duration"] = round(time.perf_counter() - self._origin, 4)
+        timeline["spans"] = sorted(self._spans, key=lambda span: (span["start"], span["depth"]))
+        if self._dropped:
+            timeline["dropped_spans"] = self._dropped
+        self._origin = None
+        self._spans = []
+        return timeline
+
+
+recorder = TimingRecorder()
+
+
+def aggregate_steps(timelines: list) -> dict:
+    """Step name -> count/total/mean/max seconds over every timeline (named steps only)."""
+    stats = {}
+    for timeline in timelines:
+        for span in timeline.get("spans", []):
+            if span["kind"] != "step":
+                continue
+            entry = stats.setdefault(span["name"], {"count": 0, "total": 0.0, "max": 0.0})
+            entry["count"] += 1
+            entry["total"] += span["duration"]
+            entry["max"] = max(entry["max"], span["duration"])
+    for entry in stats.values():
+        entry["mean"] = round(entry["total"] / entry["count"], 4)
+        entry["total"] = round(entry["total"], 4)
+        entry["max"] = round(entry["max"], 4)
+    return stats
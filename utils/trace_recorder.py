@@ -0,0 +1,103 @@
+import os
+import shutil
+import time
+import zipfile
+from playwright.sync_api import BrowserContext, Error as PlaywrightError
+from config.config import Config
+from utils.logger import get_logger
+from utils.report import trace_name_for
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class TraceRecorder:
+    """
+    Playwright tracing in per-test chunks.
+
+    Tracing is started once on every context the BrowserPool hands out; each
+    test records into its own chunk (contexts shared by several tests, like the
+    outbound session, get one chunk per test). When the test ends the chunk is
+    written to `output_dir` only if it failed (mode "retain-on-failure") or
+    always (mode "on"); otherwise it is dropped without touching the disk.
+    Kept traces are recompressed with zstd when the package is available.
+    """
+
+    def __init__(self, mode: str = "retain-on-failure", output_dir: str = "traces", compression: str = None):
+        self.logger = get_logger(self.__class__.__name__)
+        self.mode = mode
+        self.output_dir = output_dir
+        self.compression = (compression or Config.TRACE_COMPRESSION) if zstandard else "none"
+        self._contexts = []
+        self._recording = set()
+        self._nodeid = None
+
+    def attach(self, context: BrowserContext):
+        context.tracing.start(screenshots=True, snapshots=True, sources=True)
+        self._contexts.append(context)
+        if self._nodeid:
+            self._start_chunk(context)
+
+    def detach(self, context: BrowserContext):
+        if context in self._contexts:
+            self._contexts.remove(context)
+        self._recording.discard(id(context))
+
+    def _start_chunk(self, context: BrowserContext):
+        try:
+            context.tracing.start_chunk(title=self._nodeid)
+            self._recording.add(id(context))
+        except PlaywrightError as e:
+            self.logger.warning(f"Could not start trace chunk for {self._nodeid}: {e}")
+
+    def begin_test(self, nodeid: str):
+        # A chunk left open (skipped test) is discarded before the new one starts
+        self.end_test(failed=False)
+        self._nodeid = nodeid
+        for context in self._contexts:
+            self._start_chunk(context)
+
+    def end_test(self, failed: bool) -> list:
+        """Closes the current chunks; returns the paths of the traces written for this test."""
+        keep = self.mode == "on" or (failed and self.mode == "retain-on-failure")
+        paths = []
+        recording = [context for context in self._contexts if id(context) in self._recording]
+        for index, context in enumerate(recording):
+            self._recording.discard(id(context))
+            try:
+                if not keep:
+                    context.tracing.stop_chunk()
+                    continue
+                path = os.path.join(self.output_dir, trace_name_for(self._nodeid, index))
+                os.makedirs(self.output_dir, exist_ok=True)
+                context.tracing.stop_chunk(path=path)
+                paths.append(self._compress(path))
+            except PlaywrightError as e:
+                self.logger.warning(f"Could not save trace for {self._nodeid}: {e}")
+        self._nodeid = None
+        return paths
+
+    def _compress(self, path: str) -> str:
+        """
+        Rewrites the trace zip with stored (uncompressed) entries and zstd-compresses the
+        whole file: zstd then sees the redundancy across snapshots, which per-entry deflate
+        cannot. `zstd -d` gives back a zip that `playwright show-trace` opens as is.
+        """
+        if self.compression != "zstd":
+            return path
+        start = time.perf_counter()
+        stored_path = f"{path}.stored"
+        with zipfile.ZipFile(path) as source, zipfile.ZipFile(stored_path, "w", zipfile.ZIP_STORED) as stored:
+            for entry in source.infolist():
+                with source.open(entry) as data, stored.open(entry.filename, "w", force_zip64=True) as copy:
+                    shutil.copyfileobj(data, copy)
+        compressor = zstandard.ZstdCompressor(level=Config.TRACE_ZSTD_LEVEL)
+        with open(stored_path, "rb") as source, open(f"{path}.zst", "wb") as target:
+            compressor.copy_stream(source, target)
+        size, compressed = os.path.getsize(path), os.path.getsize(f"{path}.zst")
+        os.remove(stored_path)
+        os.remove(path)
+        self.logger.info(f"Trace {path}.zst: {size} -> {compressed} bytes in {time.perf_counter() - start:.2f}s")
+        return f"{path}.zst"